@@ -1,7 +1,6 @@
 import os
 from utils.functions import (
     data_input_from_csv,
-    sum_results,
     pickle_output,
     filter_data_input,
     data_input_from_dict,
@@ -9,7 +8,7 @@ from utils.functions import (
 )
 from utils.data_processing import Data_Processing
 from utils.plot import Plotter
-from utils.result_writer import Result_Writer
+from utils.result_writer import Result_Sink, Result_Writer
 
 
 global_path = os.getcwd()
@@ -26,6 +25,16 @@ data_input = data_input_from_csv_mt(
 
 filtered_data = filter_data_input(data_in=data_input, limit=(30, 70))
 sum_nodemaps_to_results = {}
+
+# the summary rows are appended to a single file while the nodemaps are analyzed
+result_sink = Result_Sink(
+    file_path=os.path.join(
+        Data_Processing(specimen_name=specimen_name, side=side).output_path_results,
+        f"{specimen_name}_{side}_Summary.csv",
+    ),
+    key_index="Cycles",
+)
+
 input_list = list(filtered_data)
 
 
@@ -65,17 +74,9 @@ for item in input_list:
         strain_treshold=0.68, num_colors=120, num_colorbars=3, colormap="viridis"
     )
 
-    Result_Writer(Result=analysis).write_to_csv()
+    result_sink.write(Result_Writer(Result=analysis).get_results_row())
 
-summary = sum_results(
-    specimen_name=specimen_name,
-    side=side,
-    result_path=os.path.join(
-        global_path, "02_results", f"{specimen_name}", f"{side}", "02_Data_Evaluation"
-    ),
-    delete_single_files=True,
-    key_index="Cycles",
-)
+result_sink.close()
 
 specimen_name_to_results = {f"{specimen_name}_{side}": sum_nodemaps_to_results}
 
@@ -86,5 +87,3 @@ pickle_output(
     which=specimen_name_to_results,
 )
 print("done")
-
-
@@ -1,7 +1,7 @@
+import argparse
 import os
 from utils.functions import (
     data_input_from_csv,
-    sum_results,
     pickle_output,
     filter_data_input,
     data_input_from_dict,
@@ -9,8 +9,26 @@ from utils.functions import (
 )
 from utils.data_processing import Data_Processing
 from utils.plot import Plotter
-from utils.result_writer import Result_Writer
-
+from utils.result_writer import Result_Sink, Result_Writer
+from utils.tracking import Stage_Tracker
+
+parser = argparse.ArgumentParser(description="Plastic zone analysis of the FE example")
+parser.add_argument(
+    "--roi-margin",
+    type=float,
+    default=10,
+    help="only grid this many mm in front of, above and below the crack tip. Nodemaps whose contour touches the "
+    "region are analyzed again on the full window. Negative: always the full window",
+)
+parser.add_argument(
+    "--which-contours",
+    nargs="+",
+    default=["Whole"],
+    choices=["Whole", "Upper", "Lower"],
+)
+args = parser.parse_args()
+roi_margin = args.roi_margin if args.roi_margin >= 0 else None
+which_contours = args.which_contours
 
 global_path = os.getcwd()
 specimen_name = "fe"
@@ -28,34 +46,55 @@ data_input = data_input_from_csv_fe(
 filtered_data = filter_data_input(data_in=data_input, limit=(30, 170))
 sum_nodemaps_to_results = {}
 
+# the summary rows are appended to a single file while the nodemaps are analyzed
+result_sink = Result_Sink(
+    file_path=os.path.join(
+        Data_Processing(specimen_name=specimen_name, side=side).output_path_results,
+        f"{specimen_name}_{side}_Summary.csv",
+    ),
+    key_index="Crack Tip X[mm]",
+)
+
 
 input_list = list(filtered_data)
 
 
-for item in input_list:
-
+def analyze(item, roi_margin=None):
     analysis = Data_Processing(
         specimen_name=specimen_name,
         side=side,
         nodemap_name=item,
         specimen_type=specimen_type,
     )
-    mask = analysis.mask_data(
+    analysis.mask_data(
         crack_tip_x=data_input[item][0],
         crack_tip_y=data_input[item][1],
         strain_treshold=0.68,
         crack_tip_tolerance=0.1,
         reduce_x_window=(0, 15),
         reduce_y_window=(180, 180),
+        roi_margin=roi_margin,
+        which_contours=which_contours,
     )
-
-    evaluate = analysis.evaluate_contours(
-        which_contours=["Whole"], secondary_crack_treshold=80
+    analysis.evaluate_contours(
+        which_contours=which_contours, secondary_crack_treshold=80
     )
+    return analysis
+
+
+for item in input_list:
+
+    analysis = analyze(item, roi_margin)
+    if Stage_Tracker().is_clipped(analysis):
+        # the plastic zone may reach beyond the region, e.g. at high loads
+        print(
+            f"Contour of {item} touches the region of interest of {roi_margin} mm, analyzed on the full window."
+        )
+        analysis = analyze(item)
 
     sum_nodemaps_to_results.update(analysis.nodemap_to_results)
 
-    plotter = Plotter(Result=analysis, which_contours=["Whole"])
+    plotter = Plotter(Result=analysis, which_contours=which_contours)
     plotter.plot_contour(
         plot_contour=True,
         plot_extreme_points=True,
@@ -67,17 +106,9 @@ for item in input_list:
         strain_treshold=0.68, num_colors=120, num_colorbars=3, colormap="viridis"
     )
 
-    Result_Writer(Result=analysis).write_to_csv()
+    result_sink.write(Result_Writer(Result=analysis).get_results_row())
 
-summary = sum_results(
-    specimen_name=specimen_name,
-    side=side,
-    result_path=os.path.join(
-        global_path, "02_results", f"{specimen_name}", f"{side}", "02_Data_Evaluation"
-    ),
-    delete_single_files=True,
-    key_index="Crack Tip X[mm]",
-)
+result_sink.close()
 
 specimen_name_to_results = {f"{specimen_name}_{side}": sum_nodemaps_to_results}
 
@@ -88,4 +119,3 @@ pickle_output(
     which=specimen_name_to_results,
 )
 print("done")
-
@@ -0,0 +1,295 @@
+import argparse
+
+from utils.functions import filter_data_input, input_format_to_loader
+from utils.batch import run_batch
+from utils.nodemap_cache import Nodemap_Cache
+from utils.stage_index import load_stage_index
+
+
+def build_parser(description: str = None):
+    """
+    Arguments shared by the command line tools - specimen, crack tip input and analysis parameters.
+    """
+
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--specimen-name", required=True)
+    parser.add_argument("--side", default="right", choices=["left", "right"])
+    parser.add_argument("--specimen-type", required=True, choices=["Biax", "MT", "FE"])
+    parser.add_argument(
+        "--input", required=True, help="file containing the crack tip positions"
+    )
+    parser.add_argument(
+        "--input-format",
+        default="csv",
+        choices=list(input_format_to_loader),
+        help="csv: data_input_from_csv, mt: data_input_from_csv_mt, fe: data_input_from_csv_fe, "
+        "dict: data_input_from_dict",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="default: number of cores"
+    )
+    parser.add_argument(
+        "--threads",
+        type=int,
+        default=1,
+        help="threads within each nodemap - interpolation and contour extraction",
+    )
+    parser.add_argument("--strain-treshold", type=float, default=0.68)
+    parser.add_argument("--crack-tip-tolerance", type=float, default=0.1)
+    parser.add_argument("--reduce-x-window", nargs=2, type=float, default=(0, 0))
+    parser.add_argument("--reduce-y-window", nargs=2, type=float, default=(0, 0))
+    parser.add_argument(
+        "--roi-margin",
+        type=float,
+        default=None,
+        help="only grid this many mm in front of, above and below the crack tip. Nodemaps whose contour touches the "
+        "region are analyzed again on the full window",
+    )
+    parser.add_argument(
+        "--contour-retrieval",
+        default="tree",
+        choices=["tree", "external"],
+        help="external: only outer contours, no hierarchy",
+    )
+    parser.add_argument(
+        "--contour-backend",
+        default="pixel",
+        choices=["pixel", "subpixel", "mesh"],
+        help="subpixel: marching squares iso-line between the grid points. "
+        "mesh: iso-line on the node triangulation, no grid",
+    )
+    parser.add_argument(
+        "--grid-step",
+        type=float,
+        default=None,
+        help="interpolation grid spacing in mm, default: 0.02 for FE, 0.01 otherwise",
+    )
+    parser.add_argument(
+        "--which-contours",
+        nargs="+",
+        default=["Whole"],
+        choices=["Whole", "Upper", "Lower"],
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help="float32 strain field and contours, grid axes only, no pixel contours in the results",
+    )
+    parser.add_argument(
+        "--tile-size",
+        type=int,
+        default=None,
+        help="interpolate in tiles of the given number of grid points into a temporary file, for grids larger than "
+        "the memory. Bounds the interpolation and the strain field, the pixel contours still need 2 bytes per grid "
+        "point",
+    )
+    parser.add_argument(
+        "--tile-path", default=None, help="folder of the temporary grid files"
+    )
+    parser.add_argument("--secondary-crack-treshold", type=float, default=80)
+    parser.add_argument("--key-index", default="Filename")
+    parser.add_argument("--no-plots", action="store_true")
+    parser.add_argument(
+        "--plot-every",
+        type=int,
+        default=1,
+        metavar="N",
+        help="only plot every N-th nodemap, 0: only those given by --plot-nodemaps",
+    )
+    parser.add_argument(
+        "--plot-nodemaps", nargs="+", default=None, help="nodemaps plotted in any case"
+    )
+    parser.add_argument("--plot-dpi", type=int, default=300)
+    parser.add_argument(
+        "--plot-format", default="png", help="file format of the figures, e.g. png, pdf"
+    )
+    parser.add_argument(
+        "--defer-plots",
+        action="store_true",
+        help="queue the plots and draw them with pz_render.py, see utils/render.py",
+    )
+    parser.add_argument(
+        "--plot-full-nodemap",
+        action="store_true",
+        help="draw the whole nodemap instead of the window around the contour",
+    )
+    parser.add_argument(
+        "--nodemap-cache",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="PATH",
+        help="cache the parsed nodemaps as binary files, optionally in the given folder",
+    )
+    return parser
+
+
+def parse_arguments(args=None):
+    parser = build_parser(
+        description="Evaluate the plastic zone of all nodemaps of a specimen in parallel."
+    )
+    parser.add_argument(
+        "--limit",
+        nargs=2,
+        type=float,
+        default=None,
+        help="only analyze nodemaps with abs(crack tip x) within the limits",
+    )
+    parser.add_argument(
+        "--range",
+        nargs=3,
+        action="append",
+        default=None,
+        metavar=("COLUMN", "LOW", "HIGH"),
+        help="only analyze stages with LOW <= COLUMN <= HIGH, e.g. cycles, force, cracklength or x. "
+        "none: no limit. Can be repeated, see utils/stage_index.py",
+    )
+    parser.add_argument(
+        "--stride",
+        type=int,
+        default=None,
+        metavar="N",
+        help="only analyze every N-th of the selected stages",
+    )
+    parser.add_argument(
+        "--summary-format",
+        default="csv",
+        choices=["csv", "parquet"],
+        help="parquet requires pyarrow",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="skip nodemaps already processed with the same parameters, see utils/manifest.py",
+    )
+    parser.add_argument(
+        "--render-workers",
+        type=int,
+        default=0,
+        help="with --defer-plots, draw the queued plots in a pool of the given size during the run",
+    )
+    parser.add_argument(
+        "--track",
+        action="store_true",
+        help="process the stages one after another, each within the contour of the previous stage, see "
+        "utils/tracking.py",
+    )
+    parser.add_argument(
+        "--track-margin",
+        type=float,
+        default=1.0,
+        help="margin in mm around the tracked contour",
+    )
+    parser.add_argument(
+        "--columnar",
+        action="store_true",
+        help="write descriptors (.parquet) and contours (.arrow) next to the pickle, requires pyarrow",
+    )
+    return parser.parse_args(args)
+
+
+def analysis_parameters(args):
+    """
+    Keyword arguments of run_batch and run_live given by the arguments of build_parser.
+    """
+
+    if args.no_plots:
+        plot_contour_parameters = None
+        plot_nodemap_parameters = None
+    else:
+        plot_contour_parameters = {
+            "plot_contour": True,
+            "plot_extreme_points": True,
+            "window_x": (2, 2),
+            "window_y": (2, 2),
+            "dpi": args.plot_dpi,
+            "file_format": args.plot_format,
+        }
+        plot_nodemap_parameters = {
+            "strain_treshold": args.strain_treshold,
+            "num_colors": 120,
+            "num_colorbars": 3,
+            "colormap": "viridis",
+            "window_x": None if args.plot_full_nodemap else (2, 2),
+            "window_y": None if args.plot_full_nodemap else (2, 2),
+            "dpi": args.plot_dpi,
+            "file_format": args.plot_format,
+        }
+
+    return {
+        "specimen_name": args.specimen_name,
+        "side": args.side,
+        "specimen_type": args.specimen_type,
+        "mask_parameters": {
+            "strain_treshold": args.strain_treshold,
+            "crack_tip_tolerance": args.crack_tip_tolerance,
+            "reduce_x_window": tuple(args.reduce_x_window),
+            "reduce_y_window": tuple(args.reduce_y_window),
+            "roi_margin": args.roi_margin,
+            "contour_retrieval": args.contour_retrieval,
+            "contour_backend": args.contour_backend,
+            "grid_step": args.grid_step,
+            "low_memory": args.low_memory,
+            "tile_size": args.tile_size,
+            "tile_path": args.tile_path,
+        },
+        "evaluate_parameters": {
+            "which_contours": args.which_contours,
+            "secondary_crack_treshold": args.secondary_crack_treshold,
+        },
+        "plot_contour_parameters": plot_contour_parameters,
+        "plot_nodemap_parameters": plot_nodemap_parameters,
+        "plot_every": args.plot_every,
+        "plot_nodemaps": args.plot_nodemaps,
+        "defer_plots": args.defer_plots,
+        "key_index": args.key_index,
+        "workers": args.workers,
+        "threads": args.threads,
+        "nodemap_cache": (
+            Nodemap_Cache(cache_path=args.nodemap_cache or None)
+            if args.nodemap_cache is not None
+            else None
+        ),
+    }
+
+
+def main(args=None):
+    args = parse_arguments(args)
+
+    if args.range is not None or args.stride is not None:
+        stage_index = load_stage_index(
+            input_file=args.input,
+            input_format=args.input_format,
+            specimen_name=args.specimen_name,
+            side=args.side,
+            specimen_type=args.specimen_type,
+            workers=args.workers,
+        )
+        column_to_range = {
+            column: tuple(
+                None if limit.lower() == "none" else float(limit) for limit in limits
+            )
+            for column, *limits in args.range or []
+        }
+        data_input = stage_index.to_data_input(
+            stage_index.select(stride=args.stride, **column_to_range)
+        )
+    else:
+        data_input = input_format_to_loader[args.input_format](args.input)
+    if args.limit is not None:
+        data_input = filter_data_input(data_in=data_input, limit=tuple(args.limit))
+
+    run_batch(
+        data_input=data_input,
+        summary_format=args.summary_format,
+        columnar=args.columnar,
+        resume=args.resume,
+        render_workers=args.render_workers,
+        track=args.track,
+        track_margin=args.track_margin,
+        **analysis_parameters(args),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+import argparse
+
+from utils.campaign import load_campaign, run_campaign
+
+
+def parse_arguments(args=None):
+    parser = argparse.ArgumentParser(
+        description="Evaluate the plastic zone of several specimens and sides with one shared pool of workers."
+    )
+    parser.add_argument(
+        "config", help="campaign config, .toml or .yaml - see utils/campaign.py"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="default: workers of the config, otherwise number of cores",
+    )
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_arguments(args)
+    run_campaign(load_campaign(args.config), workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
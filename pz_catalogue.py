@@ -0,0 +1,59 @@
+import argparse
+import os
+import time
+
+from utils.catalogue import build_catalogue
+from utils.data_processing import Data_Processing
+
+
+def parse_arguments(args=None):
+    parser = argparse.ArgumentParser(
+        description="Catalogue the header metadata of all nodemaps of a specimen without reading their data."
+    )
+    parser.add_argument("--specimen-name", required=True)
+    parser.add_argument("--side", default="right", choices=["left", "right"])
+    parser.add_argument(
+        "--keywords",
+        nargs="+",
+        default=None,
+        help="header keywords, e.g. cycles force. default: all keywords of the headers",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="default: number of cores"
+    )
+    parser.add_argument(
+        "--format",
+        default="csv",
+        choices=["csv", "parquet"],
+        help="parquet requires pyarrow",
+    )
+    parser.add_argument(
+        "--output",
+        default=None,
+        help="default: <specimen>_Catalogue.<format> in 02_Data_Evaluation",
+    )
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_arguments(args)
+
+    paths = Data_Processing(specimen_name=args.specimen_name, side=args.side)
+    output_file = args.output or os.path.join(
+        paths.output_path_results, f"{args.specimen_name}_Catalogue.{args.format}"
+    )
+
+    start = time.perf_counter()
+    catalogue = build_catalogue(
+        nodemap_path=paths.nodemap_path,
+        keywords=args.keywords,
+        workers=args.workers,
+        output_file=output_file,
+    )
+    print(
+        f"Catalogued {len(catalogue)} nodemaps in {time.perf_counter() - start:.1f} s: {output_file}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+from pz_batch import analysis_parameters, build_parser, input_format_to_loader
+from utils.live import run_live
+
+
+def parse_arguments(args=None):
+    parser = build_parser(
+        description="Evaluate the plastic zone of new nodemaps while the test is running."
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=5.0,
+        help="seconds between two polls of the nodemap folder",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=None,
+        help="stop if no new nodemap arrived for the given seconds, default: run until Ctrl+C",
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=3,
+        help="retries of a nodemap whose processing failed before it is skipped",
+    )
+    parser.set_defaults(workers=2)
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_arguments(args)
+
+    run_live(
+        input_file=args.input,
+        input_loader=input_format_to_loader[args.input_format],
+        poll_interval=args.poll_interval,
+        idle_timeout=args.idle_timeout,
+        max_retries=args.max_retries,
+        **analysis_parameters(args),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+import argparse
+
+from utils.render import Render_Queue, render_queue
+
+
+def parse_arguments(args=None):
+    parser = argparse.ArgumentParser(
+        description="Draw the plots queued by pz_batch.py or pz_live.py with --defer-plots."
+    )
+    parser.add_argument("--specimen-name", required=True)
+    parser.add_argument("--side", default="right", choices=["left", "right"])
+    parser.add_argument(
+        "--nodemaps", nargs="+", default=None, help="default: the whole queue"
+    )
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument(
+        "--keep", action="store_true", help="keep the drawn entries in the queue"
+    )
+    parser.add_argument("--plot-dpi", type=int, default=None, help="default: as queued")
+    parser.add_argument("--plot-format", default=None, help="default: as queued")
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    args = parse_arguments(args)
+
+    plot_parameters = {}
+    if args.plot_dpi is not None:
+        plot_parameters["dpi"] = args.plot_dpi
+    if args.plot_format is not None:
+        plot_parameters["file_format"] = args.plot_format
+
+    queue = Render_Queue.of_specimen(args.specimen_name, args.side)
+    rendered = render_queue(
+        queue,
+        nodemap_names=args.nodemaps,
+        workers=args.workers,
+        keep=args.keep,
+        **plot_parameters,
+    )
+    print(f"Rendered {len(rendered)} nodemaps, {len(queue)} left in the queue.")
+
+
+if __name__ == "__main__":
+    main()
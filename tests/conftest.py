@@ -0,0 +1,33 @@
+import os
+import sys
+
+import pytest
+
+# the scripts and utils are imported from the root of the repository
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from example_data import analyze, examples, link_examples
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """
+    Empty working directory with the examples linked in, so the results are written to a temporary 02_results.
+    """
+
+    link_examples(tmp_path)
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def default_results(tmp_path_factory):
+    """
+    key_to_results of both examples analyzed with the default parameters, per example.
+    """
+
+    folder = tmp_path_factory.mktemp("default")
+    link_examples(folder)
+    with pytest.MonkeyPatch.context() as monkeypatch:
+        monkeypatch.chdir(folder)
+        return {example: analyze(example).key_to_results for example in examples}
@@ -0,0 +1,170 @@
+import contextlib
+import io
+import os
+import tracemalloc
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from utils.data_processing import Data_Processing
+from utils.triangulation_cache import Triangulation_Cache
+from utils.functions import data_input_from_csv, data_input_from_csv_mt
+
+repo_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# specimen_name, specimen_type, loader and crack tip file of the examples in data_examples
+examples = {
+    "biax": (
+        "dic_cruciform_specimen",
+        "Biax",
+        data_input_from_csv,
+        "Cruciform_5.csv",
+    ),
+    "mt": (
+        "dic_mt_specimen",
+        "MT",
+        data_input_from_csv_mt,
+        "MT160_45_MDIC.csv",
+    ),
+}
+
+mask_defaults = {
+    "strain_treshold": 0.68,
+    "crack_tip_tolerance": 0.1,
+    "reduce_x_window": (0, 2),
+    "reduce_y_window": (6, 6),
+}
+
+which_contours = ["Whole", "Upper", "Lower"]
+
+# descriptors compared between the analysis modes
+descriptors = [
+    "Area PZ[mm²]",
+    "Height",
+    "Lenght",
+    "Contour lenght[mm]",
+    "Angle[°]",
+    "COG_X[mm]",
+    "COG_Y[mm]",
+    "Ext_Left",
+    "Ext_Right",
+    "Ext_Bottom",
+    "Ext_Top",
+]
+
+
+def link_examples(folder):
+    """
+    Link the examples into folder, so an analysis run in folder writes its results to folder/02_results.
+    """
+
+    os.symlink(
+        os.path.join(repo_path, "data_examples"), os.path.join(folder, "data_examples")
+    )
+
+
+def example_input(example: str):
+    """
+    Crack tip input of an example, {nodemap_name: (crack_tip_x, crack_tip_y)}.
+    """
+
+    specimen_name, _, loader, input_file = examples[example]
+    return loader(os.path.join(repo_path, "data_examples", specimen_name, input_file))
+
+
+def analyze(
+    example: str,
+    processing_parameters: dict = None,
+    trace_memory: bool = False,
+    **mask_parameters,
+):
+    """
+    Analysis of the nodemap of an example, after evaluate_contours. The processing_parameters are passed to
+    Data_Processing, e.g. nodemap_cache or threads. The mask_parameters overwrite mask_defaults.
+
+    With trace_memory, the nodemap is read and triangulated beforehand and (analysis, peak) is returned - the peak
+    in bytes of the memory allocated by mask_data and evaluate_contours, traced with tracemalloc. The grid is
+    interpolated in blocks of 2**16 points, so the temporary weights are small against the grid.
+    """
+
+    specimen_name, specimen_type, _, _ = examples[example]
+    ((nodemap_name, (crack_tip_x, crack_tip_y)),) = example_input(example).items()
+    processing_parameters = dict(processing_parameters or {})
+    with contextlib.redirect_stdout(io.StringIO()):
+        if trace_memory:
+            reader = Data_Processing(
+                specimen_name=specimen_name,
+                side="right",
+                nodemap_name=nodemap_name,
+                specimen_type=specimen_type,
+            )
+            reader.get_meta_attributes()
+            nodemap_file = reader.load_nodemap(
+                meta_keywords=getattr(reader, "meta_attributes_to_keywords", None)
+            )
+            cache = Triangulation_Cache(block_size=1 << 16)
+            cache.get_delaunay(nodemap_file.coor_x, nodemap_file.coor_y)
+            processing_parameters.update(
+                preloaded_nodemap=nodemap_file, triangulation_cache=cache
+            )
+
+        analysis = Data_Processing(
+            specimen_name=specimen_name,
+            side="right",
+            nodemap_name=nodemap_name,
+            specimen_type=specimen_type,
+            **processing_parameters,
+        )
+        analysis.get_meta_attributes()
+        if trace_memory:
+            tracemalloc.start()
+        try:
+            analysis.mask_data(
+                crack_tip_x=crack_tip_x,
+                crack_tip_y=crack_tip_y,
+                **{**mask_defaults, **mask_parameters},
+            )
+            analysis.evaluate_contours(
+                which_contours=which_contours, secondary_crack_treshold=80
+            )
+            if trace_memory:
+                return analysis, tracemalloc.get_traced_memory()[1]
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+    return analysis
+
+
+def assert_descriptors(results: dict, expected: dict, rel: float = 1e-9):
+    """
+    Compare the descriptors of key_to_results of two analyses.
+    """
+
+    assert results.keys() == expected.keys()
+    for key in expected:
+        for descriptor in descriptors:
+            assert results[key][descriptor] == pytest.approx(
+                expected[key][descriptor], rel=rel, abs=rel
+            ), f"{key} {descriptor}"
+
+
+def constructed_analysis(specimen_type: str, strain_treshold: float, strains=None):
+    """
+    Analysis on a grid of 60 x 40 points over 6 x 4 mm with the crack tip at (2, 0.1), without a nodemap. The strain
+    field is random if not given.
+    """
+
+    analysis = Data_Processing(specimen_name="constructed", side="right")
+    analysis.specimen_type = specimen_type
+    x_int, y_int = np.linspace(0, 6, 60), np.linspace(-2, 2, 40)
+    if strains is None:
+        strains = np.random.default_rng(6).uniform(0, 1, (len(y_int), len(x_int)))
+    analysis.griddata = (x_int[np.newaxis, :], y_int[:, np.newaxis], strains)
+    analysis.nodemap_file = SimpleNamespace(coor_x=x_int)
+    analysis.crack_tip_x, analysis.crack_tip_y = 2.0, 0.1
+    analysis.crack_tip_tolerance = 0.1
+    analysis.reduce_x_window = (0, 1.5)
+    analysis.reduce_y_window = (1.2, 0.8)
+    analysis.strain_treshold = strain_treshold
+    return analysis
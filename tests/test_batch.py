@@ -0,0 +1,66 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+from example_data import example_input, mask_defaults, repo_path, which_contours
+from utils.batch import run_batch
+
+
+@pytest.fixture
+def stages_with_broken(tmp_path, monkeypatch):
+    """
+    Three stages made of the Biax example, the second one is not a readable nodemap.
+    """
+
+    ((nodemap_name, crack_tip),) = example_input("biax").items()
+    source = os.path.join(
+        repo_path, "data_examples", "dic_cruciform_specimen", "nodemaps", nodemap_name
+    )
+    folder = tmp_path / "data_examples" / "dic_cruciform_specimen" / "nodemaps"
+    folder.mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    data_input = {}
+    for index in range(3):
+        stage_name = nodemap_name.replace("580928", str(580928 + index))
+        if index == 1:
+            (folder / stage_name).write_text("not a nodemap\n")
+        else:
+            os.symlink(source, folder / stage_name)
+        data_input[stage_name] = crack_tip
+    return data_input
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_failing_nodemap_is_skipped(stages_with_broken, workers):
+    good, broken, last = stages_with_broken
+    parameters = {
+        "data_input": stages_with_broken,
+        "specimen_name": "dic_cruciform_specimen",
+        "side": "right",
+        "specimen_type": "Biax",
+        "workers": workers,
+        "resume": True,
+        "mask_parameters": mask_defaults,
+        "evaluate_parameters": {
+            "which_contours": which_contours,
+            "secondary_crack_treshold": 80,
+        },
+    }
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        summary, results = run_batch(**parameters)
+
+    assert f"Processing of {broken} failed" in output.getvalue()
+    assert list(summary.index) == [good, last]
+    assert set(results) == {good, last}
+
+    # the failed nodemap is not recorded in the manifest and processed again
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        run_batch(**parameters)
+
+    assert "2 of 3 nodemaps taken from the manifest" in output.getvalue()
+    assert f"Processing of {broken} failed" in output.getvalue()
@@ -0,0 +1,136 @@
+import contextlib
+import io
+
+import pytest
+
+from example_data import assert_descriptors, example_input, which_contours
+from utils import data_processing
+from utils.batch import process_nodemap
+from utils.campaign import load_campaign, run_campaign
+
+campaign_toml = """
+workers = 1
+
+[defaults]
+evaluate_parameters = {which_contours = ["Whole", "Upper", "Lower"], secondary_crack_treshold = 80}
+
+[defaults.mask_parameters]
+strain_treshold = 0.68
+crack_tip_tolerance = 0.1
+reduce_x_window = [0, 2]
+reduce_y_window = [6, 6]
+
+[[specimens]]
+specimen_name = "dic_cruciform_specimen"
+specimen_type = "Biax"
+input = "data_examples/dic_cruciform_specimen/Cruciform_5.csv"
+"""
+
+campaign_yaml = """
+workers: 1
+defaults:
+  evaluate_parameters: {which_contours: [Whole, Upper, Lower], secondary_crack_treshold: 80}
+  mask_parameters:
+    strain_treshold: 0.68
+    crack_tip_tolerance: 0.1
+    reduce_x_window: [0, 2]
+    reduce_y_window: [6, 6]
+specimens:
+  - specimen_name: dic_cruciform_specimen
+    specimen_type: Biax
+    input: data_examples/dic_cruciform_specimen/Cruciform_5.csv
+"""
+
+
+def test_campaign_matches_default(workdir, default_results):
+    config_file = workdir / "campaign.toml"
+    config_file.write_text(campaign_toml)
+    campaign = load_campaign(str(config_file))
+    assert campaign["defaults"]["evaluate_parameters"]["which_contours"] == (
+        which_contours
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        specimen_to_results = run_campaign(campaign)
+
+    ((nodemap_name, _),) = example_input("biax").items()
+    results = specimen_to_results["dic_cruciform_specimen_right"][nodemap_name]
+    assert_descriptors(results, default_results["biax"])
+
+
+def test_yaml_matches_toml(tmp_path):
+    pytest.importorskip("yaml")
+    (tmp_path / "campaign.toml").write_text(campaign_toml)
+    (tmp_path / "campaign.yaml").write_text(campaign_yaml)
+
+    assert load_campaign(str(tmp_path / "campaign.yaml")) == load_campaign(
+        str(tmp_path / "campaign.toml")
+    )
+
+
+campaign_both_sides = """
+workers = 1
+
+[defaults]
+evaluate_parameters = {which_contours = ["Whole", "Upper", "Lower"], secondary_crack_treshold = 80}
+
+[defaults.mask_parameters]
+strain_treshold = 0.68
+crack_tip_tolerance = 0.1
+reduce_x_window = [0, 2]
+reduce_y_window = [6, 6]
+
+[[specimens]]
+specimen_name = "dic_mt_specimen"
+specimen_type = "MT"
+input_format = "mt"
+input = "MT160_45_MDIC.csv"
+sides = ["left", "right"]
+"""
+
+
+def test_both_sides_from_one_read(workdir, monkeypatch):
+    # a second stage that cannot be read does not stop the campaign
+    source = workdir / "data_examples" / "dic_mt_specimen" / "MT160_45_MDIC.csv"
+    (workdir / "MT160_45_MDIC.csv").write_text(
+        source.read_text().rstrip("\n") + "\n82,  MT160_46.txt,31.5,-4.9,0,0,43\n"
+    )
+    (workdir / "campaign.toml").write_text(campaign_both_sides)
+    campaign = load_campaign(str(workdir / "campaign.toml"))
+    ((nodemap_name, crack_tip),) = example_input("mt").items()
+
+    reads = []
+    input_data = data_processing.InputData
+
+    def counted_input_data(nodemap, **kwargs):
+        reads.append(nodemap.name)
+        return input_data(nodemap, **kwargs)
+
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output), contextlib.redirect_stderr(output):
+        with monkeypatch.context() as patch:
+            patch.setattr(data_processing, "InputData", counted_input_data)
+            specimen_to_results = run_campaign(campaign)
+
+    assert reads.count(nodemap_name) == 1
+    assert "Processing of 43-MT160_46.txt of dic_mt_specimen failed" in (
+        output.getvalue()
+    )
+
+    for side in ["left", "right"]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected, _ = process_nodemap(
+                nodemap_name=nodemap_name,
+                crack_tip=crack_tip,
+                specimen_name="dic_mt_specimen",
+                side=side,
+                specimen_type="MT",
+                mask_parameters=campaign["defaults"]["mask_parameters"],
+                evaluate_parameters=campaign["defaults"]["evaluate_parameters"],
+            )
+        results = specimen_to_results[f"dic_mt_specimen_{side}"]
+        # the crack of the example is on the right, no contour is found on the left
+        assert results.keys() == expected.keys()
+        for key in expected:
+            assert_descriptors(results[key], expected[key])
+    assert specimen_to_results["dic_mt_specimen_right"]
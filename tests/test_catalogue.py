@@ -0,0 +1,87 @@
+import os
+
+import pandas as pd
+import pytest
+
+from example_data import repo_path
+from utils.catalogue import build_catalogue, read_nodemap_header
+
+mt_nodemaps = os.path.join(repo_path, "data_examples", "dic_mt_specimen", "nodemaps")
+biax_nodemaps = os.path.join(
+    repo_path, "data_examples", "dic_cruciform_specimen", "nodemaps"
+)
+biax_nodemap = "cycles_580928_max_load_num_246_idx_22_7_dic_results_0_1.txt"
+
+
+def test_header_matches_crackpy():
+    crackpy = pytest.importorskip("crackpy.fracture_analysis.data_processing")
+    from crackpy.structure_elements.data_files import Nodemap
+
+    input_data = crackpy.InputData(Nodemap(name="43-MT160_45.txt", folder=mt_nodemaps))
+    header = read_nodemap_header(
+        os.path.join(mt_nodemaps, "43-MT160_45.txt"), ["cycles", "force", "cracklength"]
+    )
+
+    assert header == {
+        "cycles": input_data.cycles,
+        "force": input_data.force,
+        "cracklength": input_data.cracklength,
+    }
+
+
+def test_strings_and_empty_values_are_kept():
+    header = read_nodemap_header(os.path.join(biax_nodemaps, biax_nodemap))
+
+    assert header["experimental_data_min_or_max"] == "MAX_LOAD"
+    assert header["experimental_data_cycles"] == 580928
+    assert header["camera_focal_length"] is None
+    assert header["project_creation_time"] == "09.02.2024 13:56"
+    # section titles and the column line are skipped
+    assert "Process data" not in header and "Calibration data" not in header
+    assert not any(keyword.startswith("ID;") for keyword in header)
+
+
+def test_only_the_header_is_read(tmp_path):
+    data_file = tmp_path / "nodemap.txt"
+    data_file.write_text(
+        "# cycles : value_element : 1000\n"
+        "# force : value_element : 5.5\n"
+        "1; not; a; number\n"
+        "# cycles : value_element : 2000\n"
+    )
+
+    assert read_nodemap_header(str(data_file)) == {"cycles": 1000, "force": 5.5}
+    assert read_nodemap_header(str(data_file), ["force", "missing"]) == {"force": 5.5}
+
+
+@pytest.mark.parametrize("workers, chunk_size", [(1, 256), (2, 1)])
+def test_catalogue_of_nodemaps(tmp_path, workers, chunk_size):
+    for cycles, state in [(1000, "MAX_LOAD"), (2000, 3.5)]:
+        (tmp_path / f"stage_{cycles}.txt").write_text(
+            f"# cycles : value_element : {cycles}\n# state : value_element : {state}\n"
+        )
+    (tmp_path / "notes.csv").write_text("# cycles : value_element : 0\n")
+    output_file = str(tmp_path / "catalogue.csv")
+
+    catalogue = build_catalogue(
+        nodemap_path=str(tmp_path),
+        nodemap_names=["stage_1000.txt", "missing.txt", "stage_2000.txt"],
+        workers=workers,
+        chunk_size=chunk_size,
+        output_file=output_file,
+    )
+
+    assert list(catalogue.index) == ["stage_1000.txt", "missing.txt", "stage_2000.txt"]
+    assert catalogue["cycles"].tolist()[::2] == [1000, 2000]
+    assert catalogue.loc["missing.txt"].isna().all()
+    # a column mixing strings and numbers is written as strings
+    assert catalogue["state"].tolist()[::2] == ["MAX_LOAD", "3.5"]
+    pd.testing.assert_frame_equal(
+        pd.read_csv(output_file, index_col="Filename"), catalogue
+    )
+
+    # only the .txt files of the folder by default
+    assert list(build_catalogue(nodemap_path=str(tmp_path), workers=1).index) == [
+        "stage_1000.txt",
+        "stage_2000.txt",
+    ]
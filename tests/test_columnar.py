@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from example_data import analyze
+from utils.functions import columnar_output, load_contours
+
+
+def test_columnar_round_trip(workdir):
+    pytest.importorskip("pyarrow")
+    nodemap_to_results = analyze("biax").nodemap_to_results
+    ((nodemap_name, key_to_results),) = nodemap_to_results.items()
+
+    descriptor_file, contour_file = columnar_output(
+        specimen_name="dic_cruciform_specimen",
+        side="right",
+        result_path=str(workdir),
+        which={"dic_cruciform_specimen_right": nodemap_to_results},
+    )
+    descriptors = pd.read_parquet(descriptor_file).set_index("Contour")
+    contours = load_contours(contour_file)
+
+    assert list(descriptors.index) == list(key_to_results)
+    assert contours["Contour"].to_pylist() == list(key_to_results)
+    assert set(contours["Nodemap"].to_pylist()) == {nodemap_name}
+    for row, (contour, results) in enumerate(key_to_results.items()):
+        assert descriptors.loc[contour, "Area PZ[mm²]"] == results["Area PZ[mm²]"]
+        assert descriptors.loc[contour, "Threshold"] == results["Threshold"]
+        # the extreme points are split into two columns
+        x_left, y_left = results["Ext_Left"]
+        assert descriptors.loc[contour, "Ext_Left_X[mm]"] == x_left
+        assert descriptors.loc[contour, "Ext_Left_Y[mm]"] == y_left
+
+        x_coords, y_coords = results["Largest contour [mm]"]
+        assert contours["X"][row].values.type == "float"
+        np.testing.assert_array_equal(
+            contours["X"][row].values.to_numpy(), np.float32(x_coords)
+        )
+        np.testing.assert_array_equal(
+            contours["Y"][row].values.to_numpy(), np.float32(y_coords)
+        )
@@ -0,0 +1,48 @@
+import pytest
+
+from example_data import analyze, examples
+
+
+def area_error(example, reference, **mask_parameters):
+    """
+    Relative error of the area of the whole plastic zone against the reference results. Only the whole plastic zone
+    is compared, the mesh and the grid cut the windows of the other regions at different points.
+    """
+
+    area = analyze(example, **mask_parameters).key_to_results["Whole"]["Area PZ[mm²]"]
+    return area / reference["Whole"]["Area PZ[mm²]"] - 1
+
+
+@pytest.mark.parametrize("grid_step", [None, 0.05])
+@pytest.mark.parametrize("example", list(examples))
+def test_subpixel_area_closer_to_mesh_than_pixel(workdir, example, grid_step):
+    # the mesh contour is not rasterized, it is the reference for both grid backends
+    reference = analyze(example, contour_backend="mesh").key_to_results
+    grid = {} if grid_step is None else {"grid_step": grid_step}
+
+    pixel = area_error(example, reference, contour_backend="pixel", **grid)
+    subpixel = area_error(example, reference, contour_backend="subpixel", **grid)
+
+    assert abs(subpixel) < abs(pixel)
+    if grid_step is None:
+        assert abs(subpixel) < 0.02
+
+
+@pytest.mark.parametrize("example", list(examples))
+def test_subpixel_on_coarse_grid_within_documented_error(
+    workdir, default_results, example
+):
+    # the error stated in README.md for --grid-step 0.05
+    results = analyze(
+        example, contour_backend="subpixel", grid_step=0.05
+    ).key_to_results
+    expected = default_results[example]
+
+    assert results.keys() == expected.keys()
+    for key in expected:
+        assert results[key]["Area PZ[mm²]"] == pytest.approx(
+            expected[key]["Area PZ[mm²]"], rel=0.15
+        ), key
+        assert results[key]["Contour lenght[mm]"] == pytest.approx(
+            expected[key]["Contour lenght[mm]"], rel=0.3
+        ), key
@@ -0,0 +1,25 @@
+import pandas as pd
+import pytest
+
+from utils.functions import crack_tips_to_dict, filter_data_input
+
+
+@pytest.mark.parametrize("limit", [(30, 70), (None, 70), (30, None), (None, None)])
+def test_dict_and_dataframe_filtered_alike(limit):
+    crack_tips = pd.DataFrame(
+        {"x": [10.0, -30.0, 30.5, -45.0, 69.9, 70.0, 85.0], "y": 0.5},
+        index=pd.Index([f"stage_{i}.txt" for i in range(7)], name="Filename"),
+    )
+
+    filtered = filter_data_input(data_in=crack_tips_to_dict(crack_tips), limit=limit)
+
+    assert filtered == crack_tips_to_dict(
+        filter_data_input(data_in=crack_tips, limit=limit)
+    )
+    assert all(
+        (limit[0] is None or abs(x) > limit[0])
+        and (limit[1] is None or abs(x) < limit[1])
+        for x, _ in filtered.values()
+    )
+    # the order of the input is kept
+    assert list(filtered) == [name for name in crack_tips.index if name in filtered]
@@ -0,0 +1,39 @@
+import numpy as np
+
+from example_data import analyze
+
+
+def test_grid_is_written_as_float32(workdir):
+    analysis, peak = analyze("biax", trace_memory=True, low_memory=True)
+    strains = analysis.griddata[2]
+
+    assert strains.dtype == np.float32
+    # no float64 grid is allocated on the way - the peak stays below the size of a single float64 grid
+    assert peak < strains.size * np.dtype(np.float64).itemsize
+
+
+def test_contours_in_mm_are_float32(workdir):
+    analysis = analyze("biax", low_memory=True)
+
+    for results in analysis.key_to_results.values():
+        x_coords, y_coords = results["Largest contour [mm]"]
+        assert np.asarray(x_coords).dtype == np.float32
+        assert np.asarray(y_coords).dtype == np.float32
+
+
+def test_release_drops_grid_and_weights(workdir):
+    analysis = analyze("biax", low_memory=True)
+    cache = analysis.triangulation_cache
+    weights_key = cache.weights_key(
+        analysis.nodedata[0],
+        analysis.nodedata[1],
+        analysis.griddata[0][0],
+        analysis.griddata[1][:, 0],
+    )
+    # e.g. cached by an analysis of the same grid without low_memory
+    cache._store_weights(weights_key, (np.empty((1, 3)), np.empty((1, 3))))
+
+    analysis.release()
+
+    assert analysis.griddata is None
+    assert weights_key not in cache.key_to_weights
@@ -0,0 +1,107 @@
+import os
+import pickle
+
+from utils.manifest import Result_Manifest
+
+
+def read_records(manifest_file):
+    records = []
+    with open(manifest_file, "rb") as handle:
+        while True:
+            try:
+                records.append(pickle.load(handle))
+            except EOFError:
+                return records
+
+
+def make_nodemap(folder, name="nodemap_1.txt", content="1 2 3\n"):
+    data_file = os.path.join(folder, name)
+    with open(data_file, "w") as handle:
+        handle.write(content)
+    return data_file
+
+
+def test_round_trip(tmp_path):
+    manifest_file = os.path.join(tmp_path, "Manifest.pickle")
+    data_file = make_nodemap(tmp_path)
+    parameter_hash = Result_Manifest.hash_parameters(crack_tip=(1.0, 2.0))
+    results = ({"nodemap_1.txt": {"Whole": {"Area PZ[mm²]": 0.5}}}, {"Area": 0.5})
+
+    with Result_Manifest(manifest_file) as manifest:
+        assert not manifest.is_done("nodemap_1.txt", data_file, parameter_hash)
+        manifest.add("nodemap_1.txt", data_file, parameter_hash, *results)
+
+    manifest = Result_Manifest(manifest_file)
+    assert manifest.is_done("nodemap_1.txt", data_file, parameter_hash)
+    assert manifest.get_results("nodemap_1.txt") == results
+    assert not manifest.is_done(
+        "nodemap_1.txt",
+        data_file,
+        Result_Manifest.hash_parameters(crack_tip=(1.0, 2.5)),
+    )
+    make_nodemap(tmp_path, content="1 2 4\n")
+    assert not manifest.is_done("nodemap_1.txt", data_file, parameter_hash)
+    manifest.close()
+
+
+def test_refreshed_stamp_is_recorded_and_compacted(tmp_path):
+    manifest_file = os.path.join(tmp_path, "Manifest.pickle")
+    data_file = make_nodemap(tmp_path)
+    parameter_hash = Result_Manifest.hash_parameters(crack_tip=(1.0, 2.0))
+    with Result_Manifest(manifest_file) as manifest:
+        manifest.add("nodemap_1.txt", data_file, parameter_hash, {}, {})
+
+    # same content, new modification time
+    stat = os.stat(data_file)
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    stamp = [stat.st_mtime_ns + 10**9, stat.st_size]
+
+    manifest = Result_Manifest(manifest_file)
+    assert manifest.is_done("nodemap_1.txt", data_file, parameter_hash)
+    assert [record["stamp"] for record in read_records(manifest_file)][-1] == stamp
+    manifest.close()
+
+    records = read_records(manifest_file)
+    assert len(records) == 1
+    assert records[0]["stamp"] == stamp
+    assert Result_Manifest(manifest_file).is_done(
+        "nodemap_1.txt", data_file, parameter_hash
+    )
+
+
+def test_superseded_records_are_compacted_on_load(tmp_path):
+    manifest_file = os.path.join(tmp_path, "Manifest.pickle")
+    data_file = make_nodemap(tmp_path)
+    manifest = Result_Manifest(manifest_file)
+    for crack_tip in [(1.0, 2.0), (1.0, 2.5)]:
+        parameter_hash = Result_Manifest.hash_parameters(crack_tip=crack_tip)
+        manifest.add("nodemap_1.txt", data_file, parameter_hash, {}, {})
+    # no close - e.g. a crashed run
+    manifest.file.close()
+    assert len(read_records(manifest_file)) == 2
+
+    manifest = Result_Manifest(manifest_file)
+    records = read_records(manifest_file)
+    assert len(records) == 1
+    assert manifest.is_done("nodemap_1.txt", data_file, parameter_hash)
+    manifest.close()
+
+
+def test_cut_off_record_is_dropped(tmp_path):
+    manifest_file = os.path.join(tmp_path, "Manifest.pickle")
+    parameter_hash = Result_Manifest.hash_parameters(crack_tip=(1.0, 2.0))
+    with Result_Manifest(manifest_file) as manifest:
+        for name in ["nodemap_0.txt", "nodemap_1.txt"]:
+            manifest.add(name, make_nodemap(tmp_path, name), parameter_hash, {}, {})
+    with open(manifest_file, "r+b") as handle:
+        handle.truncate(os.path.getsize(manifest_file) - 10)
+
+    manifest = Result_Manifest(manifest_file)
+    assert manifest.is_done(
+        "nodemap_0.txt", os.path.join(tmp_path, "nodemap_0.txt"), parameter_hash
+    )
+    assert not manifest.is_done(
+        "nodemap_1.txt", os.path.join(tmp_path, "nodemap_1.txt"), parameter_hash
+    )
+    manifest.close()
+    assert len(read_records(manifest_file)) == 1
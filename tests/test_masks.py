@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from example_data import constructed_analysis
+
+
+def stacked_masks(analysis):
+    """
+    The masks as built by np.all over the full-size predicates, before they were built in place.
+    """
+
+    xi, yi = np.meshgrid(analysis.griddata[0][0], analysis.griddata[1][:, 0])
+    thresholded_strains = analysis.griddata[2] > analysis.strain_treshold
+    x_max = analysis.nodemap_file.coor_x.max()
+    in_front_of_ct_x = xi > abs(analysis.crack_tip_x) - analysis.crack_tip_tolerance
+    x_window = (in_front_of_ct_x, xi < x_max - analysis.reduce_x_window[1])
+    y_window = (
+        yi < analysis.crack_tip_y + analysis.reduce_y_window[0],
+        yi > analysis.crack_tip_y - analysis.reduce_y_window[1],
+    )
+    upper_half = yi <= analysis.crack_tip_y
+    lower_half = yi >= analysis.crack_tip_y
+
+    if analysis.specimen_type == "Biax":
+        whole = [*x_window, *y_window]
+        upper = [*x_window, lower_half, y_window[0]]
+        lower = [*x_window, upper_half, y_window[1]]
+    if analysis.specimen_type == "MT":
+        whole = [*x_window]
+        upper = [*x_window, lower_half]
+        lower = [*x_window, upper_half]
+    if analysis.specimen_type == "FE":
+        whole = [in_front_of_ct_x]
+        upper = [*x_window, lower_half]
+        lower = [*x_window, upper_half]
+    return {
+        key: 1 * np.all([thresholded_strains, *predicates], axis=0)
+        for key, predicates in [("Whole", whole), ("Upper", upper), ("Lower", lower)]
+    }
+
+
+@pytest.mark.parametrize("specimen_type", ["Biax", "MT", "FE"])
+@pytest.mark.parametrize("strain_treshold", [0.3, 0.68])
+def test_masks_match_stacked_predicates(workdir, specimen_type, strain_treshold):
+    analysis = constructed_analysis(specimen_type, strain_treshold)
+    expected = stacked_masks(analysis)
+    buffer = np.empty(analysis.griddata[2].shape, dtype=bool)
+
+    for key, mask in expected.items():
+        # the buffer is reused from region to region
+        built = analysis.build_mask(key, out=buffer)
+        assert built.dtype == np.uint8
+        np.testing.assert_array_equal(built, mask, err_msg=key)
+
+
+def test_threshold_of_find_contours_is_used(workdir):
+    analysis = constructed_analysis("MT", 0.68)
+    analysis.find_contours(strain_treshold=0.3, which_contours=["Whole"])
+
+    assert analysis.strain_treshold == 0.3
+    np.testing.assert_array_equal(
+        analysis.build_mask("Whole"), stacked_masks(analysis)["Whole"]
+    )
@@ -0,0 +1,45 @@
+import numpy as np
+import pytest
+from scipy.spatial import Delaunay
+
+from example_data import analyze, examples
+from utils.mesh_contours import find_iso_lines, polygon_properties
+
+
+def test_iso_line_of_cone_is_circle():
+    # strain falling off linearly from the center, the iso-line at 0.7 is the circle of radius 0.3
+    rng = np.random.default_rng(10)
+    x_coordinates, y_coordinates = rng.uniform(0, 1, (2, 20000))
+    values = 1 - np.hypot(x_coordinates - 0.5, y_coordinates - 0.5)
+    triangles = Delaunay(np.column_stack((x_coordinates, y_coordinates))).simplices
+
+    (iso_line,) = find_iso_lines(
+        triangles, x_coordinates, y_coordinates, values, level=0.7
+    )
+    area, perimeter, (cog_x, cog_y) = polygon_properties(iso_line)
+
+    radii = np.hypot(iso_line[:, 0] - 0.5, iso_line[:, 1] - 0.5)
+    np.testing.assert_allclose(radii, 0.3, atol=2e-3)
+    assert area == pytest.approx(np.pi * 0.3**2, rel=5e-3)
+    assert perimeter == pytest.approx(2 * np.pi * 0.3, rel=5e-3)
+    assert (cog_x, cog_y) == pytest.approx((0.5, 0.5), abs=1e-3)
+
+
+@pytest.mark.parametrize("example", list(examples))
+def test_grid_contours_converge_to_mesh(workdir, example):
+    # the iso-line on the triangulation is the limit of the gridded iso-line for a vanishing grid step
+    mesh_area = analyze(example, contour_backend="mesh").key_to_results["Whole"][
+        "Area PZ[mm²]"
+    ]
+    fine, coarse = (
+        abs(
+            analyze(
+                example, contour_backend="subpixel", grid_step=grid_step
+            ).key_to_results["Whole"]["Area PZ[mm²]"]
+            - mesh_area
+        )
+        for grid_step in (0.01, 0.05)
+    )
+
+    assert fine < 0.02 * mesh_area
+    assert fine < coarse / 2
@@ -0,0 +1,88 @@
+import os
+import shutil
+
+import numpy as np
+import pytest
+from crackpy.fracture_analysis.data_processing import InputData
+from crackpy.structure_elements.data_files import Nodemap
+
+from example_data import analyze, assert_descriptors, example_input, repo_path
+from utils import nodemap_cache as nodemap_cache_module
+from utils.nodemap_cache import NODEMAP_COLUMNS, Nodemap_Cache
+
+
+@pytest.fixture
+def nodemap_copy(tmp_path):
+    ((nodemap_name, _),) = example_input("mt").items()
+    nodemap_path = tmp_path / "nodemaps"
+    nodemap_path.mkdir()
+    shutil.copy(
+        os.path.join(
+            repo_path, "data_examples", "dic_mt_specimen", "nodemaps", nodemap_name
+        ),
+        nodemap_path,
+    )
+    return nodemap_name, str(nodemap_path)
+
+
+def test_round_trip(tmp_path, nodemap_copy):
+    nodemap_name, nodemap_path = nodemap_copy
+    nodemap_cache = Nodemap_Cache(cache_path=str(tmp_path / "cache"))
+    expected = InputData(Nodemap(name=nodemap_name, folder=nodemap_path))
+
+    parsed = nodemap_cache.load(nodemap_name, nodemap_path)
+    cached = nodemap_cache.load(nodemap_name, nodemap_path)
+
+    # the second load is a memory map of the cache
+    assert isinstance(cached.coor_x, np.memmap)
+    for column in NODEMAP_COLUMNS:
+        if (
+            getattr(expected, column, None) is None
+            or len(getattr(expected, column)) == 0
+        ):
+            continue
+        np.testing.assert_array_equal(
+            getattr(parsed, column), getattr(expected, column)
+        )
+        np.testing.assert_array_equal(
+            getattr(cached, column), getattr(expected, column)
+        )
+    for attribute in expected.meta_attributes:
+        assert getattr(cached, attribute) == getattr(expected, attribute)
+
+
+def test_changed_source_is_parsed_again(tmp_path, nodemap_copy):
+    nodemap_name, nodemap_path = nodemap_copy
+    nodemap_cache = Nodemap_Cache(cache_path=str(tmp_path / "cache"))
+    data_file = os.path.join(nodemap_path, nodemap_name)
+    nodemap_cache.load(nodemap_name, nodemap_path)
+    assert nodemap_cache._read_entry(data_file) is not None
+
+    stat = os.stat(data_file)
+    os.utime(data_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert nodemap_cache._read_entry(data_file) is None
+    nodemap_cache.load(nodemap_name, nodemap_path)
+    assert nodemap_cache._read_entry(data_file) is not None
+
+
+@pytest.mark.parametrize("example", ["biax", "mt"])
+def test_cached_analysis_parses_once(workdir, default_results, monkeypatch, example):
+    nodemap_cache = Nodemap_Cache(cache_path=str(workdir / "cache"))
+    reads = []
+    input_data = nodemap_cache_module.InputData
+
+    def counted_input_data(nodemap=None, **kwargs):
+        if nodemap is not None:
+            reads.append(nodemap.name)
+        return input_data(nodemap, **kwargs)
+
+    monkeypatch.setattr(nodemap_cache_module, "InputData", counted_input_data)
+    for _ in range(2):
+        # parsed and cached, then read from the cache
+        analysis = analyze(
+            example, processing_parameters={"nodemap_cache": nodemap_cache}
+        )
+        assert_descriptors(analysis.key_to_results, default_results[example])
+
+    ((nodemap_name, _),) = example_input(example).items()
+    assert reads == [nodemap_name]
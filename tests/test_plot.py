@@ -0,0 +1,87 @@
+import os
+
+import numpy as np
+import pytest
+from matplotlib import pyplot as plt, tri
+
+from example_data import analyze
+from utils.plot import Plotter, render_payload, window_triangulation
+
+
+def draw(triangulation, strains, x_lim, y_lim):
+    fig, axs = plt.subplots(figsize=(3, 3), dpi=100)
+    axs.tricontourf(triangulation, strains, np.linspace(0, 0.68, 120), extend="max")
+    axs.set_xlim(*x_lim)
+    axs.set_ylim(*y_lim)
+    axs.set_axis_off()
+    fig.subplots_adjust(0, 0, 1, 1)
+    fig.canvas.draw()
+    image = np.asarray(fig.canvas.buffer_rgba()).copy()
+    plt.close(fig)
+    return image
+
+
+@pytest.fixture
+def biax(workdir):
+    return analyze("biax")
+
+
+def test_window_triangulation_matches_full_field(biax):
+    triangulation = biax.triangulation_cache.get_triangulation(
+        biax.nodemap_file.coor_x, biax.nodemap_file.coor_y
+    )
+    strains = biax.nodemap_file.eps_vm * 100
+    results = biax.key_to_results["Whole"]
+    x_lim = (results["Ext_Left"][0] - 2, results["Ext_Right"][0] + 2)
+    y_lim = (results["Ext_Bottom"][1] - 2, results["Ext_Top"][1] + 2)
+
+    clipped = window_triangulation(triangulation, x_lim, y_lim)
+    # the cached triangulation is not modified and most triangles are masked
+    assert triangulation.mask is None
+    assert clipped.mask.sum() > 0.9 * len(clipped.triangles)
+
+    x_grid, y_grid = np.meshgrid(np.linspace(*x_lim, 200), np.linspace(*y_lim, 200))
+    expected = tri.LinearTriInterpolator(triangulation, strains)(x_grid, y_grid)
+    field = tri.LinearTriInterpolator(clipped, strains)(x_grid, y_grid)
+    np.testing.assert_array_equal(field.mask, expected.mask)
+    np.testing.assert_allclose(field.compressed(), expected.compressed())
+
+    # and the drawn figure within the window
+    np.testing.assert_array_equal(
+        draw(clipped, strains, x_lim, y_lim),
+        draw(triangulation, strains, x_lim, y_lim),
+    )
+
+
+def test_direct_nodemap_plot_does_not_grid(biax):
+    plotter = Plotter(Result=biax, which_contours=["Whole"])
+    plotter.plot_contour_on_nodemap(window_x=(2, 2), window_y=(2, 2), dpi=50)
+
+    # tricontourf on the cached triangulation, no strain field is interpolated to a grid
+    assert plotter.payload["background"] is None
+    assert os.path.exists(
+        os.path.join(biax.output_path_nodemaps, "Whole", f"{biax.nodemap_name}.png")
+    )
+
+
+def test_deferred_background_is_limited_to_the_window(biax):
+    results = biax.key_to_results["Whole"]
+    payload = render_payload(
+        biax,
+        which_contours=["Whole"],
+        plot_nodemap_parameters={"window_x": (2, 2), "window_y": (2, 2)},
+    )
+    x_int, y_int, strains = payload["background"]
+    assert strains.dtype == np.float32
+    assert x_int[0] >= results["Ext_Left"][0] - 2.1
+    assert x_int[-1] <= results["Ext_Right"][0] + 2.1
+    assert y_int[0] >= results["Ext_Bottom"][1] - 2.1
+    assert y_int[-1] <= results["Ext_Top"][1] + 2.1
+
+    # no window - the whole nodemap on a bounded grid
+    _, _, strains = render_payload(
+        biax, which_contours=["Whole"], plot_nodemap_parameters={}
+    )["background"]
+    assert strains.size <= 1 << 20
+    # contour plots only - no background at all
+    assert render_payload(biax, which_contours=["Whole"])["background"] is None
@@ -0,0 +1,56 @@
+import contextlib
+import io
+
+import cv2
+import numpy as np
+import pytest
+
+from example_data import constructed_analysis
+
+
+def ring_analysis():
+    """
+    MT analysis of a plastic zone shaped as a ring around (3.2, 0.1) with an island in its hole.
+    """
+
+    x_int, y_int = np.linspace(0, 6, 60), np.linspace(-2, 2, 40)
+    radius = np.hypot(x_int[np.newaxis, :] - 3.2, y_int[:, np.newaxis] - 0.1)
+    strains = np.where(((radius > 0.6) & (radius < 1.2)) | (radius < 0.25), 1.0, 0.0)
+    return constructed_analysis("MT", 0.5, strains=strains)
+
+
+def find_contours(analysis, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return analysis.find_contours(**kwargs)[0]
+
+
+def test_external_retrieval_keeps_outer_contours():
+    analysis = ring_analysis()
+    tree = find_contours(analysis, contour_retrieval="tree")["Whole"]
+    external = find_contours(analysis, contour_retrieval="external")["Whole"]
+
+    # outer border of the ring, border of its hole and the island
+    assert len(tree["Contour"]) == 3
+    assert tree["Hierarchy"].shape == (1, 3, 4)
+    # only the outer border of the ring, the island lies inside its hole
+    assert len(external["Contour"]) == 1
+    assert external["Hierarchy"].shape == (1, 1, 4)
+
+    # the same contour is evaluated
+    largest = max(tree["Contour"], key=cv2.contourArea)
+    np.testing.assert_array_equal(
+        analysis.select_contour(external["Contour"])[0], largest
+    )
+
+
+def test_regions_are_extracted_on_access():
+    key_to_contour = find_contours(ring_analysis(), which_contours=["Whole", "Upper"])
+
+    assert key_to_contour.extracted() == []
+    key_to_contour["Upper"]
+    assert key_to_contour.extracted() == ["Upper"]
+    with pytest.raises(KeyError):
+        key_to_contour["Lower"]
+
+    key_to_contour.extract(threads=2)
+    assert sorted(key_to_contour.extracted()) == ["Upper", "Whole"]
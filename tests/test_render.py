@@ -0,0 +1,74 @@
+import contextlib
+import io
+import os
+
+import pytest
+
+import pz_render
+from example_data import analyze
+from utils.render import Render_Queue, queue_plots
+
+
+@pytest.fixture
+def queue(workdir):
+    """
+    Render queue of the Biax example with two entries, the nodemap and a renamed copy of it.
+    """
+
+    analysis = analyze("biax")
+    queue = Render_Queue.of_specimen(analysis.specimen_name, analysis.side)
+    parameters = {
+        "which_contours": ["Whole"],
+        "plot_contour_parameters": {"window_x": (2, 2), "window_y": (2, 2)},
+        "plot_nodemap_parameters": {"window_x": (2, 2), "window_y": (2, 2)},
+    }
+    queue_plots(analysis, queue, **parameters)
+    entry = queue.get(analysis.nodemap_name)
+    queue.put(
+        "copy.txt", {**entry["payload"], "nodemap_name": "copy.txt"}, **parameters
+    )
+    return analysis, queue
+
+
+def render(*arguments):
+    with contextlib.redirect_stdout(io.StringIO()):
+        pz_render.main(
+            [
+                "--specimen-name",
+                "dic_cruciform_specimen",
+                "--plot-dpi",
+                "30",
+                *arguments,
+            ]
+        )
+
+
+def plot_files(analysis, nodemap_name):
+    return [
+        os.path.join(analysis.output_path_contours, "Whole", f"{nodemap_name}.png"),
+        os.path.join(analysis.output_path_nodemaps, "Whole", f"{nodemap_name}.png"),
+    ]
+
+
+def test_render_drains_the_queue(queue):
+    analysis, queue = queue
+    assert queue.names() == sorted([analysis.nodemap_name, "copy.txt"])
+
+    render("--nodemaps", "copy.txt")
+    assert queue.names() == [analysis.nodemap_name]
+    assert all(map(os.path.exists, plot_files(analysis, "copy.txt")))
+    assert not any(map(os.path.exists, plot_files(analysis, analysis.nodemap_name)))
+
+    render()
+    assert len(queue) == 0
+    assert all(map(os.path.exists, plot_files(analysis, analysis.nodemap_name)))
+
+
+def test_keep_leaves_the_queue(queue):
+    analysis, queue = queue
+
+    render("--keep", "--workers", "2")
+
+    assert queue.names() == sorted([analysis.nodemap_name, "copy.txt"])
+    for nodemap_name in queue.names():
+        assert all(map(os.path.exists, plot_files(analysis, nodemap_name)))
@@ -0,0 +1,60 @@
+import pandas as pd
+import pytest
+
+from utils.result_writer import Result_Sink
+
+rows = [
+    {"Filename": "nodemap_1.txt", "Cycles": 1000, "Area PZ[mm²]": 0.5},
+    None,
+    {"Filename": "nodemap_2.txt", "Cycles": 2000, "Area PZ[mm²]": 0.75},
+    # a column that only later rows have
+    {
+        "Filename": "nodemap_3.txt",
+        "Cycles": 3000,
+        "Area PZ[mm²]": 1.0,
+        "Epsmax[%]": 2.0,
+    },
+]
+
+
+@pytest.mark.parametrize("buffer_size", [1, 100])
+def test_csv_round_trip(tmp_path, buffer_size):
+    file_path = str(tmp_path / "Summary.csv")
+    with Result_Sink(
+        file_path=file_path, key_index="Filename", buffer_size=buffer_size
+    ) as sink:
+        for row in rows:
+            sink.write(row)
+    assert sink.num_rows == 3
+
+    summary = pd.read_csv(file_path, index_col=0)
+    assert summary.index.tolist() == ["nodemap_1.txt", "nodemap_2.txt", "nodemap_3.txt"]
+    assert summary["Cycles"].tolist() == [1000, 2000, 3000]
+    assert summary["Area PZ[mm²]"].tolist() == [0.5, 0.75, 1.0]
+    assert summary["Epsmax[%]"].isna().tolist() == [True, True, False]
+
+
+@pytest.mark.parametrize("buffer_size", [1, 100])
+def test_parquet_round_trip(tmp_path, buffer_size):
+    pytest.importorskip("pyarrow")
+    file_path = str(tmp_path / "Summary.parquet")
+    with Result_Sink(file_path=file_path, buffer_size=buffer_size) as sink:
+        for row in rows:
+            sink.write(row)
+
+    summary = pd.read_parquet(file_path)
+    assert summary.columns.tolist() == [
+        "Filename",
+        "Cycles",
+        "Area PZ[mm²]",
+        "Epsmax[%]",
+    ]
+    assert summary["Filename"].tolist() == [
+        "nodemap_1.txt",
+        "nodemap_2.txt",
+        "nodemap_3.txt",
+    ]
+    assert summary["Area PZ[mm²]"].tolist() == [0.5, 0.75, 1.0]
+    assert summary["Epsmax[%]"].isna().tolist() == [True, True, False]
+    # no parts left next to the summary
+    assert [path.name for path in tmp_path.iterdir()] == ["Summary.parquet"]
@@ -0,0 +1,58 @@
+import contextlib
+import io
+
+import pytest
+
+from example_data import (
+    analyze,
+    assert_descriptors,
+    example_input,
+    examples,
+    mask_defaults,
+    which_contours,
+)
+from utils.batch import process_nodemap
+from utils.tracking import Stage_Tracker
+
+
+@pytest.mark.parametrize("example", list(examples))
+def test_roi_margin_grids_only_the_region(workdir, default_results, example):
+    analysis = analyze(example, roi_margin=5)
+    full_window = analyze(example)
+
+    assert analysis.roi_bounds is not None
+    assert analysis.griddata[2].size < full_window.griddata[2].size / 2
+    # the region starts at the crack tip like the analyzed window, so it does not clip the contour there
+    assert analysis.roi_bounds[0] is None
+    assert not Stage_Tracker().is_clipped(analysis)
+    assert_descriptors(analysis.key_to_results, default_results[example])
+
+
+@pytest.mark.parametrize("example", list(examples))
+def test_roi_outside_nodemap_uses_full_window(workdir, default_results, example):
+    analysis = analyze(example, roi=(500, 510, 500, 510))
+
+    assert analysis.roi_bounds is None
+    assert_descriptors(analysis.key_to_results, default_results[example])
+
+
+def test_clipped_contour_uses_full_window(workdir, default_results):
+    ((nodemap_name, crack_tip),) = example_input("biax").items()
+    specimen_name, specimen_type, _, _ = examples["biax"]
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        nodemap_to_results, _ = process_nodemap(
+            nodemap_name=nodemap_name,
+            crack_tip=crack_tip,
+            specimen_name=specimen_name,
+            side="right",
+            specimen_type=specimen_type,
+            mask_parameters={**mask_defaults, "roi_margin": 0.2},
+            evaluate_parameters={
+                "which_contours": which_contours,
+                "secondary_crack_treshold": 80,
+            },
+        )
+
+    assert "Contour clipped by the region of interest" in output.getvalue()
+    assert_descriptors(nodemap_to_results[nodemap_name], default_results["biax"])
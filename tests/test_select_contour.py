@@ -0,0 +1,54 @@
+import cv2
+import numpy as np
+import pytest
+
+from utils.data_processing import Data_Processing
+
+
+def contours_of_squares(*sizes):
+    """
+    Contours of separate filled squares with the given side lengths in pixels, as found by cv2.findContours.
+    """
+
+    mask = np.zeros((20, 20 * len(sizes) + 20), dtype=np.uint8)
+    for index, size in enumerate(sizes):
+        mask[5 : 5 + size, 10 + 20 * index : 10 + 20 * index + size] = 1
+    contours, _ = cv2.findContours(mask, cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE)
+    return contours
+
+
+@pytest.mark.parametrize(
+    "sizes, sec_crack",
+    [
+        # a single zone
+        ((11,), "No"),
+        # area 25 against 100, 75 % smaller than the largest
+        ((11, 6), "Yes"),
+        # area 16 against 100, 84 % smaller - a speck that was flagged before
+        ((11, 5), "No"),
+        # the largest zone is found in any position
+        ((5, 6, 11), "Yes"),
+        ((2, 11, 3), "No"),
+    ],
+)
+def test_secondary_crack_within_threshold(sizes, sec_crack):
+    contours = contours_of_squares(*sizes)
+
+    contour_to_analyze, result = Data_Processing.select_contour(
+        contours, secondary_crack_treshold=80
+    )
+
+    assert cv2.contourArea(contour_to_analyze) == (max(sizes) - 1) ** 2
+    assert result == sec_crack
+
+
+def test_threshold_is_inclusive():
+    # area 25 against 100 - exactly 75 % smaller
+    contours = contours_of_squares(11, 6)
+
+    assert Data_Processing.select_contour(contours, secondary_crack_treshold=75)[1] == (
+        "Yes"
+    )
+    assert Data_Processing.select_contour(contours, secondary_crack_treshold=74)[1] == (
+        "No"
+    )
@@ -0,0 +1,124 @@
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import pz_batch
+from utils.stage_index import Stage_Index
+
+# cycles, force and crack tip x of the stages, the fourth one at minimum load
+stages = [
+    (1000, 31.5, 60.0),
+    (2000, 31.5, 60.5),
+    (3000, 31.5, 61.0),
+    (3500, 0.5, 61.0),
+    (4000, 31.5, 61.5),
+    (5000, 31.5, 62.0),
+    (6000, 31.5, 62.5),
+    (7000, 31.5, 63.0),
+]
+
+
+def write_stages(folder):
+    """
+    Header-only Biax nodemaps of the stages and their crack tip file, the data rows are never read.
+    """
+
+    nodemap_folder = folder / "data_examples" / "stages" / "nodemaps"
+    nodemap_folder.mkdir(parents=True)
+    rows = []
+    for cycles, force, crack_tip_x in stages:
+        nodemap_name = f"cycles_{cycles}_dic_results.txt"
+        min_or_max = "MAX_LOAD" if force > 1 else "MIN_LOAD"
+        (nodemap_folder / nodemap_name).write_text(
+            f"# experimental_data_min_or_max  : inspection_value_element: {min_or_max}\n"
+            f"# experimental_data_cycles      : inspection_value_element: {cycles}\n"
+            f"# experimental_data_load_main_axis_fy: inspection_value_element: {force}\n"
+            f"# experimental_data_crack_tip_x_right: inspection_value_element: {crack_tip_x}\n"
+            "not a data row\n"
+        )
+        rows.append(
+            {
+                "Filename": nodemap_name,
+                "CT x [mm]": crack_tip_x,
+                "CT y [mm]": -12.0,
+                "SymReg Corr x [mm]": 0.0,
+                "SymReg Corr y [mm]": 0.0,
+            }
+        )
+    input_file = folder / "stages.csv"
+    pd.DataFrame(rows).to_csv(input_file)
+    return input_file
+
+
+def selected_cycles(folder, monkeypatch, *arguments):
+    """
+    Cycles of the stages pz_batch passes to run_batch for the given selection arguments.
+    """
+
+    input_file = write_stages(folder)
+    monkeypatch.chdir(folder)
+    passed = {}
+    monkeypatch.setattr(
+        pz_batch, "run_batch", lambda data_input, **kwargs: passed.update(data_input)
+    )
+    with contextlib.redirect_stdout(io.StringIO()):
+        pz_batch.main(
+            [
+                "--specimen-name",
+                "stages",
+                "--specimen-type",
+                "Biax",
+                "--input",
+                str(input_file),
+                "--workers",
+                "1",
+                *arguments,
+            ]
+        )
+    return [int(name.split("_")[1]) for name in passed]
+
+
+@pytest.mark.parametrize(
+    "arguments, cycles",
+    [
+        (["--range", "cycles", "2000", "6000"], [2000, 3000, 3500, 4000, 5000, 6000]),
+        (["--range", "cycles", "none", "2500"], [1000, 2000]),
+        # the ranges are combined, max_load is read from the header
+        (
+            ["--range", "cycles", "2000", "none", "--range", "max_load", "1", "1"],
+            [2000, 3000, 4000, 5000, 6000, 7000],
+        ),
+        (["--range", "x", "61", "62", "--stride", "2"], [3000, 4000]),
+        (["--stride", "3"], [1000, 3500, 6000]),
+    ],
+)
+def test_range_and_stride_select_stages(tmp_path, monkeypatch, arguments, cycles):
+    assert selected_cycles(tmp_path, monkeypatch, *arguments) == cycles
+
+
+def test_select_excludes_missing_values():
+    index = Stage_Index(
+        pd.DataFrame(
+            {
+                "stage": np.arange(5),
+                "x": [3.0, 1.0, np.nan, 2.0, 1.0],
+                "force": [10.0, 20.0, 30.0, np.nan, 50.0],
+            },
+            index=[f"stage_{i}" for i in range(5)],
+        )
+    )
+
+    assert list(index.select(x=(1.0, 2.0)).index) == ["stage_1", "stage_3", "stage_4"]
+    assert list(index.select(x=(None, None), force=(None, 40)).index) == [
+        "stage_0",
+        "stage_1",
+    ]
+    assert list(index.select(x=(None, None), order_by="x").index) == [
+        "stage_1",
+        "stage_4",
+        "stage_3",
+        "stage_0",
+    ]
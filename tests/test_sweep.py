@@ -0,0 +1,38 @@
+import pytest
+
+from example_data import analyze, which_contours
+
+
+def test_sweep_matches_separate_analyses(workdir):
+    thresholds = [0.5, 0.68, 1.0]
+    analysis = analyze("biax")
+    sweep = analysis.sweep_thresholds(
+        strain_tresholds=thresholds, which_contours=which_contours
+    )
+
+    for threshold in thresholds:
+        expected = analyze("biax", strain_treshold=threshold).key_to_results
+        for item in which_contours:
+            (row,) = sweep[
+                (sweep["Threshold"] == threshold) & (sweep["Contour"] == item)
+            ].to_dict("records")
+            for descriptor in [
+                "Area PZ[mm²]",
+                "Height",
+                "Lenght",
+                "Contour lenght[mm]",
+                "COG_X[mm]",
+                "COG_Y[mm]",
+            ]:
+                assert row[descriptor] == pytest.approx(
+                    expected[item][descriptor]
+                ), f"{threshold} {item} {descriptor}"
+
+
+def test_lenght_is_the_extent_in_x(workdir):
+    results = analyze("biax").key_to_results["Whole"]
+    x_left, _ = results["Ext_Left"]
+    x_right, _ = results["Ext_Right"]
+
+    assert results["Lenght"] == pytest.approx(x_right - x_left)
+    assert results["Lenght"] < results["Contour lenght[mm]"]
@@ -0,0 +1,52 @@
+import threading
+
+import pytest
+
+from example_data import analyze, assert_descriptors, examples
+from utils.data_processing import Region_Contours
+from utils.triangulation_cache import Triangulation_Cache
+
+
+def run_concurrently(monkeypatch, owner, name, wrap=lambda function: function):
+    """
+    Patch owner.name so its first two calls wait for each other - they fail unless run on two threads at once.
+    Returns the identifiers of the threads of all calls.
+    """
+
+    function = getattr(owner, name)
+    barrier = threading.Barrier(2, timeout=10)
+    thread_ids = []
+    lock = threading.Lock()
+
+    def patched(*args, **kwargs):
+        with lock:
+            thread_ids.append(threading.get_ident())
+            first = len(thread_ids) <= 2
+        if first:
+            barrier.wait()
+        return function(*args, **kwargs)
+
+    monkeypatch.setattr(owner, name, wrap(patched))
+    return thread_ids
+
+
+@pytest.mark.parametrize("example", list(examples))
+def test_threads_run_concurrently(workdir, default_results, monkeypatch, example):
+    extract_threads = run_concurrently(monkeypatch, Region_Contours, "_extract")
+    interpolate_threads = run_concurrently(
+        monkeypatch, Triangulation_Cache, "_block_weights", wrap=staticmethod
+    )
+
+    analysis = analyze(
+        example,
+        processing_parameters={
+            "threads": 4,
+            "triangulation_cache": Triangulation_Cache(),
+        },
+    )
+
+    # the regions and the blocks of grid rows are spread over the thread pools, off the main thread
+    for thread_ids in (extract_threads, interpolate_threads):
+        assert len(set(thread_ids)) > 1
+        assert threading.get_ident() not in thread_ids
+    assert_descriptors(analysis.key_to_results, default_results[example])
@@ -0,0 +1,21 @@
+import numpy as np
+
+from example_data import analyze, assert_descriptors
+
+
+def test_strain_field_is_memory_mapped(workdir):
+    analysis, peak = analyze(
+        "biax", trace_memory=True, tile_size=1 << 16, tile_path=str(workdir)
+    )
+    strains = analysis.griddata[2]
+
+    assert isinstance(strains, np.memmap)
+    # only the masks of the pixel backend, 2 bytes per grid point, are held in memory - not the float64 grid
+    assert peak < strains.size * 4
+
+
+def test_contours_are_not_cut_at_tile_borders(workdir, default_results):
+    # tiles of a few rows, so many tile borders cross the plastic zone
+    analysis = analyze("biax", tile_size=10_000, tile_path=str(workdir))
+
+    assert_descriptors(analysis.key_to_results, default_results["biax"])
@@ -0,0 +1,105 @@
+import contextlib
+import io
+import os
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from example_data import assert_descriptors, example_input, repo_path, which_contours
+from utils.batch import run_batch
+from utils.data_processing import Data_Processing
+from utils.tracking import Stage_Tracker
+
+
+@pytest.fixture
+def stage_sequence(tmp_path, monkeypatch):
+    """
+    Stages of a fatigue test made of the Biax example - the same nodemap linked under consecutive cycles, with the
+    crack tip moved forward, backward and by a jump.
+    """
+
+    ((nodemap_name, (crack_tip_x, crack_tip_y)),) = example_input("biax").items()
+    source = os.path.join(
+        repo_path, "data_examples", "dic_cruciform_specimen", "nodemaps", nodemap_name
+    )
+    folder = tmp_path / "data_examples" / "dic_cruciform_specimen" / "nodemaps"
+    folder.mkdir(parents=True)
+    monkeypatch.chdir(tmp_path)
+
+    data_input = {}
+    for index, shift in enumerate([0, 0.1, 0.2, -0.5, 3.0, 0]):
+        # the cycles are the second part of the name
+        stage_name = nodemap_name.replace("580928", str(580928 + index))
+        os.symlink(source, folder / stage_name)
+        data_input[stage_name] = (crack_tip_x + shift, crack_tip_y)
+    return data_input
+
+
+def test_tracking_grids_only_the_region(stage_sequence, monkeypatch):
+    parameters = {
+        "data_input": stage_sequence,
+        "specimen_name": "dic_cruciform_specimen",
+        "side": "right",
+        "specimen_type": "Biax",
+        "workers": 1,
+        "mask_parameters": {
+            "strain_treshold": 0.68,
+            "crack_tip_tolerance": 0.1,
+            "reduce_x_window": (0, 2),
+            "reduce_y_window": (6, 6),
+        },
+        "evaluate_parameters": {
+            "which_contours": which_contours,
+            "secondary_crack_treshold": 80,
+        },
+    }
+    with contextlib.redirect_stdout(io.StringIO()):
+        _, expected = run_batch(**parameters)
+
+        # name, region of interest and grid points of every analysis
+        analyses = []
+        evaluate_contours = Data_Processing.evaluate_contours
+
+        def record(self, *args, **kwargs):
+            analyses.append(
+                (self.nodemap_name, self.roi_bounds is not None, self.griddata[2].size)
+            )
+            return evaluate_contours(self, *args, **kwargs)
+
+        monkeypatch.setattr(Data_Processing, "evaluate_contours", record)
+        _, results = run_batch(**parameters, track=True)
+
+    # every stage once, the clipped stage twice
+    assert len(analyses) == len(stage_sequence) + 1
+    first, *_, jump, _ = stage_sequence
+    # the first stage and the stage after the jump of the crack tip (clipped) are analyzed on the full window
+    full_window = [(name, size) for name, roi, size in analyses if not roi]
+    assert [name for name, _ in full_window] == [first, jump]
+    full_size = full_window[0][1]
+    for name, roi, size in analyses:
+        if roi:
+            assert size < full_size / 3, name
+
+    assert results.keys() == expected.keys()
+    for nodemap_name in expected:
+        assert expected[nodemap_name]
+        assert_descriptors(results[nodemap_name], expected[nodemap_name])
+
+
+def test_single_column_grid_is_clipped():
+    x_int, y_int = np.meshgrid([10.0], [1.0, 1.01, 1.02])
+    analysis = SimpleNamespace(
+        roi_bounds=(9.0, 11.0, None, None),
+        griddata=(x_int, y_int),
+        key_to_results={
+            "Whole": {
+                "Ext_Left": (10.0, 1.01),
+                "Ext_Right": (10.0, 1.01),
+                "Ext_Bottom": (10.0, 1.0),
+                "Ext_Top": (10.0, 1.02),
+            }
+        },
+    )
+
+    assert Stage_Tracker().is_clipped(analysis)
@@ -0,0 +1,422 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed, wait
+
+import pandas as pd
+
+from utils.data_processing import Data_Processing
+from utils.functions import columnar_output, pickle_output
+from utils.manifest import Result_Manifest
+from utils.nodemap_cache import Nodemap_Cache
+from utils.plot import Plotter
+from utils.render import Render_Queue, queue_plots, render_entry
+from utils.result_writer import Result_Sink, Result_Writer
+from utils.tracking import Stage_Tracker
+
+
+def process_nodemap(
+    nodemap_name: str = None,
+    crack_tip: tuple = None,
+    specimen_name: str = "not defined",
+    side: str = None,
+    specimen_type: str = None,
+    mask_parameters: dict = None,
+    evaluate_parameters: dict = None,
+    plot_contour_parameters: dict = None,
+    plot_nodemap_parameters: dict = None,
+    nodemap_cache: Nodemap_Cache = None,
+    render_queue: str = None,
+    threads: int = 1,
+    tracker: Stage_Tracker = None,
+    preloaded_nodemap=None,
+):
+    """
+    Analyze a single nodemap - the body of the loop in the driver scripts.
+
+    Parameters
+    ----------
+    nodemap_name : str
+            self-explaining
+    crack_tip : tuple (float, float)
+            crack tip position x and y as given by the data_input_from_csv_* functions
+    specimen_name, side, specimen_type : str
+            see Data_Processing
+    mask_parameters : dict
+            keyword arguments passed to Data_Processing.mask_data, except the crack tip position. If the contour is
+            clipped by the region of roi_margin, the nodemap is analyzed again on the full window.
+    evaluate_parameters : dict
+            keyword arguments passed to Data_Processing.evaluate_contours
+    plot_contour_parameters, plot_nodemap_parameters : dict, default = None
+            keyword arguments passed to Plotter.plot_contour and Plotter.plot_contour_on_nodemap. The respective plot
+            is skipped if None.
+    nodemap_cache : Nodemap_Cache, default = None
+            binary cache of the parsed nodemaps, see Data_Processing
+    render_queue : str, default = None
+            folder of a Render_Queue. If given, the plots are queued instead of drawn.
+    threads : int, default = 1
+            number of threads within the nodemap, see Data_Processing
+    tracker : Stage_Tracker, default = None
+            if given, only the region of interest of the tracker is analyzed. If the contour is clipped by the
+            region, the nodemap is analyzed again on the full window. The tracker is updated with the result.
+    preloaded_nodemap : InputData or Cached_Nodemap, default = None
+            nodemap already read, see Data_Processing
+
+    Returns
+    ----------
+    nodemap_to_results : dict
+        results of Data_Processing.evaluate_contours
+    res_dict : dict
+        summary row of Result_Writer.get_results_row, None if no contour was detected
+
+    """
+
+    if mask_parameters is None:
+        mask_parameters = {}
+    if evaluate_parameters is None:
+        evaluate_parameters = {}
+
+    # only build the masks of the contours that are evaluated
+    mask_parameters = {
+        "which_contours": evaluate_parameters.get("which_contours"),
+        **mask_parameters,
+    }
+
+    def analyze(roi=None, full_window=False):
+        parameters = (
+            {**mask_parameters, "roi_margin": None} if full_window else mask_parameters
+        )
+        analysis = Data_Processing(
+            specimen_name=specimen_name,
+            side=side,
+            nodemap_name=nodemap_name,
+            specimen_type=specimen_type,
+            nodemap_cache=nodemap_cache,
+            threads=threads,
+            preloaded_nodemap=preloaded_nodemap,
+        )
+        analysis.get_meta_attributes()
+        analysis.mask_data(
+            crack_tip_x=crack_tip[0],
+            crack_tip_y=crack_tip[1],
+            roi=roi,
+            **parameters,
+        )
+        analysis.evaluate_contours(**evaluate_parameters)
+        return analysis
+
+    roi = tracker.roi() if tracker is not None else None
+    analysis = analyze(roi)
+    if (tracker if tracker is not None else Stage_Tracker()).is_clipped(analysis):
+        print(
+            f"Contour clipped by the region of interest, full window for {nodemap_name}."
+        )
+        analysis = analyze(full_window=True)
+    if tracker is not None:
+        tracker.update(analysis)
+
+    which_contours = evaluate_parameters.get("which_contours", ["Whole"])
+    plotted = not (plot_contour_parameters is None and plot_nodemap_parameters is None)
+    if plotted and render_queue is not None:
+        queue_plots(
+            analysis,
+            Render_Queue(render_queue),
+            which_contours=which_contours,
+            plot_contour_parameters=plot_contour_parameters,
+            plot_nodemap_parameters=plot_nodemap_parameters,
+        )
+    elif plotted:
+        plotter = Plotter(Result=analysis, which_contours=which_contours)
+        if plot_contour_parameters is not None:
+            plotter.plot_contour(**plot_contour_parameters)
+        if plot_nodemap_parameters is not None:
+            plotter.plot_contour_on_nodemap(**plot_nodemap_parameters)
+    if mask_parameters.get("low_memory"):
+        analysis.release()
+
+    return analysis.nodemap_to_results, Result_Writer(Result=analysis).get_results_row()
+
+
+def is_plotted(
+    index: int, nodemap_name: str, plot_every: int = 1, plot_nodemaps: list = None
+):
+    """
+    Whether the stage is plotted - every plot_every-th stage in the order of the input and the stages given in
+    plot_nodemaps. plot_every = 0 only plots the stages in plot_nodemaps.
+    """
+
+    if plot_nodemaps is not None and nodemap_name in plot_nodemaps:
+        return True
+    return plot_every > 0 and index % plot_every == 0
+
+
+def run_batch(
+    data_input: dict = None,
+    specimen_name: str = "not defined",
+    side: str = None,
+    specimen_type: str = None,
+    mask_parameters: dict = None,
+    evaluate_parameters: dict = None,
+    plot_contour_parameters: dict = None,
+    plot_nodemap_parameters: dict = None,
+    key_index: str = "Filename",
+    workers: int = None,
+    nodemap_cache: Nodemap_Cache = None,
+    summary_format: str = "csv",
+    columnar: bool = False,
+    resume: bool = False,
+    plot_every: int = 1,
+    plot_nodemaps: list = None,
+    defer_plots: bool = False,
+    render_workers: int = 0,
+    threads: int = 1,
+    track: bool = False,
+    track_margin: float = 1.0,
+):
+    """
+    Analyze all nodemaps of a specimen in parallel. The summary rows are streamed into a single file in the order
+    of data_input while the results arrive, the pickle is written once at the end.
+
+    A nodemap whose processing fails is logged with its traceback and left out, the other nodemaps are processed
+    as usual. It is not recorded in the manifest, so a run with resume processes it again. On Ctrl+C, the pending
+    nodemaps are cancelled and the results so far are written.
+
+    Parameters
+    ----------
+    data_input : dict [filename]: tuple (float, float)
+            crack tip positions as returned by the data_input_from_csv_* functions or filter_data_input
+    specimen_name, side, specimen_type : str
+            see Data_Processing
+    mask_parameters, evaluate_parameters, plot_contour_parameters, plot_nodemap_parameters : dict
+            see process_nodemap
+    key_index : str, default = "Filename"
+            column of the summary that is set as index
+    workers : int, default = None
+            number of worker processes. None uses all cores, 1 runs serially in the current process.
+    nodemap_cache : Nodemap_Cache, default = None
+            binary cache of the parsed nodemaps, see Data_Processing
+    summary_format : str, default = "csv"
+            "csv" or "parquet", format of the summary file, see Result_Sink
+    columnar : bool, default = False
+            write descriptors and contours as columnar files next to the pickle, see columnar_output
+    resume : bool, default = False
+            incremental processing - nodemaps already processed with the same parameters by an earlier run are taken
+            from the manifest {specimen_name}_{side}_Manifest.pickle next to the pickle, only new or changed
+            nodemaps are processed. See Result_Manifest.
+    plot_every : int, default = 1
+            only plot every plot_every-th nodemap of data_input, 0 plots none. Plotting usually takes longer than the
+            analysis itself.
+    plot_nodemaps : list [str], default = None
+            nodemaps that are plotted in any case
+    defer_plots : bool, default = False
+            queue the plots in the Render_Queue of the specimen instead of drawing them in the analysis processes,
+            see utils/render.py. The analysis releases the nodemap right away and is not slowed down by plotting.
+    render_workers : int, default = 0
+            with defer_plots, draw the queued plots in a separate pool of the given size while the analysis is
+            running. If 0, the plots stay in the queue and are drawn later by pz_render.py.
+    threads : int, default = 1
+            number of threads within each nodemap, see Data_Processing. Mainly useful with few workers and large
+            nodemaps - workers * threads should not exceed the number of cores.
+    track : bool, default = False
+            tracking mode - the stages are processed one after another in the order of data_input, each one only
+            within the contour bounds of the previous stage moved by the crack tip advance, see Stage_Tracker. The
+            full window is only analyzed for the first stage and where the contour is clipped. Use with stages in
+            test order; workers is ignored, threads are used.
+    track_margin : float, default = 1.0
+            widening of the tracked contour bounds in mm, see Stage_Tracker
+
+    Returns
+    ----------
+    summary : pd.DataFrame
+        summary of all nodemaps with a detected contour in the order of data_input
+    nodemap_to_results : dict
+        results of all nodemaps
+
+    """
+
+    queue = Render_Queue.of_specimen(specimen_name, side) if defer_plots else None
+    tasks = []
+    for index, (nodemap_name, crack_tip) in enumerate(data_input.items()):
+        plotted = is_plotted(index, nodemap_name, plot_every, plot_nodemaps)
+        tasks.append(
+            {
+                "nodemap_name": nodemap_name,
+                "crack_tip": crack_tip,
+                "specimen_name": specimen_name,
+                "side": side,
+                "specimen_type": specimen_type,
+                "mask_parameters": mask_parameters,
+                "evaluate_parameters": evaluate_parameters,
+                "plot_contour_parameters": plot_contour_parameters if plotted else None,
+                "plot_nodemap_parameters": plot_nodemap_parameters if plotted else None,
+                "nodemap_cache": nodemap_cache,
+                "render_queue": queue.queue_path if queue is not None else None,
+                "threads": threads,
+            }
+        )
+
+    # only used for the output paths
+    paths = Data_Processing(specimen_name=specimen_name, side=side)
+    summary_file = os.path.join(
+        paths.output_path_results, f"{specimen_name}_{side}_Summary.{summary_format}"
+    )
+
+    parameter_hashes = [
+        Result_Manifest.hash_parameters(
+            crack_tip=task["crack_tip"],
+            specimen_type=specimen_type,
+            mask_parameters=mask_parameters,
+            evaluate_parameters=evaluate_parameters,
+        )
+        for task in tasks
+    ]
+    data_files = [
+        os.path.join(paths.nodemap_path, task["nodemap_name"]) for task in tasks
+    ]
+
+    manifest = None
+    is_done = [False] * len(tasks)
+    if resume:
+        manifest = Result_Manifest(
+            os.path.join(
+                paths.output_path_pickle, f"{specimen_name}_{side}_Manifest.pickle"
+            )
+        )
+        is_done = [
+            manifest.is_done(task["nodemap_name"], data_file, parameter_hash)
+            for task, data_file, parameter_hash in zip(
+                tasks, data_files, parameter_hashes
+            )
+        ]
+        print(f"{sum(is_done)} of {len(tasks)} nodemaps taken from the manifest.")
+    new_indices = [index for index, done in enumerate(is_done) if not done]
+
+    index_to_results = {}
+    failed = []
+    render_executor = None
+    render_futures = []
+    if queue is not None and render_workers > 0:
+        render_executor = ProcessPoolExecutor(max_workers=render_workers)
+    executor = None
+    with Result_Sink(file_path=summary_file, key_index=key_index) as sink:
+        written = 0
+
+        def flush(final=False):
+            # the rows are written in the order of data_input as soon as all earlier nodemaps are finished
+            nonlocal written
+            while written < len(tasks) and (
+                final or written in index_to_results or written in failed
+            ):
+                if written in index_to_results:
+                    sink.write(index_to_results[written][1])
+                written += 1
+
+        def collect(index, nodemap_to_results, res_dict):
+            # only this process writes to the sink and the manifest
+            task = tasks[index]
+            if manifest is not None and not is_done[index]:
+                manifest.add(
+                    task["nodemap_name"],
+                    data_files[index],
+                    parameter_hashes[index],
+                    nodemap_to_results=nodemap_to_results,
+                    res_dict=res_dict,
+                )
+            index_to_results[index] = (nodemap_to_results, res_dict)
+            if (
+                render_executor is not None
+                and not is_done[index]
+                and os.path.exists(queue.entry_path(task["nodemap_name"]))
+            ):
+                render_futures.append(
+                    render_executor.submit(
+                        render_entry, queue.queue_path, task["nodemap_name"]
+                    )
+                )
+            flush()
+
+        def fail(index):
+            # called within the except clause, logs the traceback of the current exception
+            print(f"Processing of {tasks[index]['nodemap_name']} failed:")
+            traceback.print_exc()
+            failed.append(index)
+            flush()
+
+        try:
+            for index, done in enumerate(is_done):
+                if done:
+                    collect(index, *manifest.get_results(tasks[index]["nodemap_name"]))
+
+            if workers == 1 or track:
+                tracker = Stage_Tracker(margin=track_margin) if track else None
+                for index in new_indices:
+                    try:
+                        results = process_nodemap(**tasks[index], tracker=tracker)
+                    except Exception:
+                        fail(index)
+                        continue
+                    collect(index, *results)
+            else:
+                executor = ProcessPoolExecutor(max_workers=workers or os.cpu_count())
+                future_to_index = {
+                    executor.submit(process_nodemap, **tasks[index]): index
+                    for index in new_indices
+                }
+                for future in as_completed(future_to_index):
+                    index = future_to_index[future]
+                    try:
+                        results = future.result()
+                    except Exception:
+                        fail(index)
+                        continue
+                    collect(index, *results)
+
+        except KeyboardInterrupt:
+            # the results so far are kept, the manifest resumes the rest
+            print("Stopped.")
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if render_executor is not None:
+                wait(render_futures)
+                render_executor.shutdown()
+            if manifest is not None:
+                manifest.close()
+            flush(final=True)
+
+    sum_nodemaps_to_results = {}
+    rows = []
+    for index in sorted(index_to_results):
+        nodemap_to_results, res_dict = index_to_results[index]
+        sum_nodemaps_to_results.update(nodemap_to_results)
+        if res_dict is not None:
+            rows.append(res_dict)
+
+    summary = pd.DataFrame(rows)
+    if not summary.empty:
+        summary = summary.set_index(key_index, drop=False)
+
+    pickle_output(
+        specimen_name=specimen_name,
+        side=side,
+        result_path=paths.output_path_pickle,
+        which={f"{specimen_name}_{side}": sum_nodemaps_to_results},
+    )
+    if columnar:
+        columnar_output(
+            specimen_name=specimen_name,
+            side=side,
+            result_path=paths.output_path_pickle,
+            which={f"{specimen_name}_{side}": sum_nodemaps_to_results},
+        )
+    print(
+        f"Processed {len(index_to_results) - sum(is_done)} of {len(tasks)} nodemaps of {specimen_name}_{side}."
+    )
+    if failed:
+        print(
+            f"Failed: {', '.join(tasks[index]['nodemap_name'] for index in failed)} - processed again with resume."
+        )
+
+    return summary, sum_nodemaps_to_results
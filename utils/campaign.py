@@ -0,0 +1,326 @@
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from utils.batch import is_plotted, process_nodemap
+from utils.data_processing import Data_Processing
+from utils.functions import filter_data_input, input_format_to_loader, pickle_output
+from utils.nodemap_cache import Nodemap_Cache
+from utils.result_writer import Result_Sink
+
+# parameters of a specimen if neither given by the specimen nor by the defaults of the campaign
+specimen_defaults = {
+    "specimen_type": None,
+    "input": None,
+    "input_format": "csv",
+    "sides": ["right"],
+    "limit": None,
+    "key_index": "Filename",
+    "summary_format": "csv",
+    "mask_parameters": {},
+    "evaluate_parameters": {},
+    "plot_contour_parameters": None,
+    "plot_nodemap_parameters": None,
+    "plot_every": 1,
+    "plot_nodemaps": None,
+}
+
+# parameters given as tables, merged key by key with the defaults
+nested_parameters = [
+    "mask_parameters",
+    "evaluate_parameters",
+    "plot_contour_parameters",
+    "plot_nodemap_parameters",
+]
+
+
+def load_campaign(config_file: str = None):
+    """
+    Read a campaign config from a .toml file or a .yaml file, the latter requires PyYAML. .toml requires tomli on
+    Python < 3.11. See run_campaign for the content.
+    """
+
+    if config_file.endswith(".toml"):
+        try:
+            import tomllib
+        except ImportError:
+            # Python < 3.11
+            import tomli as tomllib
+
+        with open(config_file, "rb") as handle:
+            return tomllib.load(handle)
+    if config_file.endswith((".yaml", ".yml")):
+        import yaml
+
+        with open(config_file, "r") as handle:
+            return yaml.safe_load(handle)
+    raise ValueError(f"campaign config must be a .toml or .yaml file: {config_file}")
+
+
+def specimen_parameters(campaign: dict = None):
+    """
+    Parameters of every specimen of the campaign - the specimen entry over the defaults of the campaign over
+    specimen_defaults. The tables of nested_parameters are merged key by key.
+    """
+
+    defaults = campaign.get("defaults", {})
+    specimens = []
+    for specimen in campaign["specimens"]:
+        parameters = {**specimen_defaults, **defaults, **specimen}
+        for key in nested_parameters:
+            if defaults.get(key) is not None or specimen.get(key) is not None:
+                parameters[key] = {
+                    **(defaults.get(key) or {}),
+                    **(specimen.get(key) or {}),
+                }
+        specimens.append(parameters)
+    return specimens
+
+
+def process_nodemap_sides(side_to_task: dict = None):
+    """
+    Analyze a nodemap for one or both sides of the specimen. The nodemap is read once and analyzed for every side.
+
+    Parameters
+    ----------
+    side_to_task : dict [side]: dict
+            keyword arguments of batch.process_nodemap per side, all for the same nodemap
+
+    Returns
+    ----------
+    side_to_results : dict [side]: tuple (dict, dict)
+        nodemap_to_results and res_dict of process_nodemap per side
+
+    """
+
+    task = next(iter(side_to_task.values()))
+    reader = Data_Processing(
+        specimen_name=task["specimen_name"],
+        side=task["side"],
+        nodemap_name=task["nodemap_name"],
+        specimen_type=task["specimen_type"],
+        nodemap_cache=task["nodemap_cache"],
+    )
+    reader.get_meta_attributes()
+    # the metadata keywords are only defined for Biax, as in mask_data
+    preloaded_nodemap = reader.load_nodemap(
+        meta_keywords=getattr(reader, "meta_attributes_to_keywords", None)
+    )
+    return {
+        side: process_nodemap(**task, preloaded_nodemap=preloaded_nodemap)
+        for side, task in side_to_task.items()
+    }
+
+
+def run_campaign(
+    campaign: dict = None,
+    workers: int = None,
+):
+    """
+    Analyze all specimens of a campaign with one shared pool of worker processes. Every specimen and side gets its
+    own summary and pickle in its output tree under 02_results, as written by batch.run_batch. If both sides of a
+    specimen are requested, each nodemap is read once and analyzed for the left and the right side in the same task.
+    A nodemap whose processing fails is logged with its traceback and left out, the other nodemaps are processed as
+    usual. On Ctrl+C, the pending nodemaps are cancelled and the results so far are written.
+
+    The campaign is a dict as read by load_campaign, e.g. from toml:
+
+        workers = 4
+        threads = 1
+        nodemap_cache = true            # or the folder of the cache
+
+        [defaults]                      # for all specimens
+        specimen_type = "MT"
+        input_format = "mt"
+        evaluate_parameters = {which_contours = ["Whole", "Upper", "Lower"]}
+
+        [defaults.mask_parameters]
+        reduce_x_window = [0, 2]
+        reduce_y_window = [6, 6]
+
+        [[specimens]]
+        specimen_name = "dic_mt_specimen"
+        input = "data_examples/dic_mt_specimen/MT160_45_MDIC.csv"   # or {left = "...", right = "..."}
+        sides = ["left", "right"]
+        limit = [30, 70]
+
+    The parameters of a specimen are listed in specimen_defaults, see run_batch for their meaning. input is either one
+    crack tip file for all sides or one file per side.
+
+    Parameters
+    ----------
+    campaign : dict
+            self-explaining
+    workers : int, default = None
+            number of worker processes, overrides the workers of the campaign. None uses all cores, 1 runs serially
+            in the current process.
+
+    Returns
+    ----------
+    specimen_to_results : dict [str]: dict
+        results of all nodemaps per f"{specimen_name}_{side}"
+
+    """
+
+    workers = workers or campaign.get("workers") or os.cpu_count()
+    threads = campaign.get("threads", 1)
+    nodemap_cache = campaign.get("nodemap_cache", False)
+    if nodemap_cache is True:
+        nodemap_cache = Nodemap_Cache()
+    elif nodemap_cache:
+        nodemap_cache = Nodemap_Cache(cache_path=nodemap_cache)
+    else:
+        nodemap_cache = None
+
+    tasks = []
+    key_to_output = {}
+    for specimen in specimen_parameters(campaign):
+        specimen_name = specimen["specimen_name"]
+        loader = input_format_to_loader[specimen["input_format"]]
+
+        side_to_input = {}
+        for side in specimen["sides"]:
+            input_file = specimen["input"]
+            if isinstance(input_file, dict):
+                input_file = input_file[side]
+            data_input = loader(input_file)
+            if specimen["limit"] is not None:
+                data_input = filter_data_input(
+                    data_in=data_input, limit=tuple(specimen["limit"])
+                )
+            side_to_input[side] = data_input
+
+            paths = Data_Processing(specimen_name=specimen_name, side=side)
+            key_to_output[(specimen_name, side)] = {
+                "summary_file": os.path.join(
+                    paths.output_path_results,
+                    f"{specimen_name}_{side}_Summary.{specimen['summary_format']}",
+                ),
+                "key_index": specimen["key_index"],
+                "result_path": paths.output_path_pickle,
+            }
+
+        # one task per nodemap, in the order of the first side
+        nodemap_names = list(
+            dict.fromkeys(
+                name for data_input in side_to_input.values() for name in data_input
+            )
+        )
+        for index, nodemap_name in enumerate(nodemap_names):
+            plotted = is_plotted(
+                index, nodemap_name, specimen["plot_every"], specimen["plot_nodemaps"]
+            )
+            tasks.append(
+                {
+                    side: {
+                        "nodemap_name": nodemap_name,
+                        "crack_tip": data_input[nodemap_name],
+                        "specimen_name": specimen_name,
+                        "side": side,
+                        "specimen_type": specimen["specimen_type"],
+                        "mask_parameters": specimen["mask_parameters"],
+                        "evaluate_parameters": specimen["evaluate_parameters"],
+                        "plot_contour_parameters": (
+                            specimen["plot_contour_parameters"] if plotted else None
+                        ),
+                        "plot_nodemap_parameters": (
+                            specimen["plot_nodemap_parameters"] if plotted else None
+                        ),
+                        "nodemap_cache": nodemap_cache,
+                        "threads": threads,
+                    }
+                    for side, data_input in side_to_input.items()
+                    if nodemap_name in data_input
+                }
+            )
+
+    sinks = {
+        key: Result_Sink(
+            file_path=output["summary_file"], key_index=output["key_index"]
+        )
+        for key, output in key_to_output.items()
+    }
+    key_to_results = {key: {} for key in key_to_output}
+
+    index_to_results = {}
+    failed = []
+    written = 0
+
+    def flush(final=False):
+        # the rows are written in the order of the input as soon as all earlier tasks are finished
+        nonlocal written
+        while written < len(tasks) and (
+            final or written in index_to_results or written in failed
+        ):
+            for side, (nodemap_to_results, res_dict) in index_to_results.get(
+                written, {}
+            ).items():
+                key = (tasks[written][side]["specimen_name"], side)
+                key_to_results[key].update(nodemap_to_results)
+                sinks[key].write(res_dict)
+            written += 1
+
+    def fail(index):
+        # called within the except clause, logs the traceback of the current exception
+        task = next(iter(tasks[index].values()))
+        print(
+            f"Processing of {task['nodemap_name']} of {task['specimen_name']} failed:"
+        )
+        traceback.print_exc()
+        failed.append(index)
+        flush()
+
+    executor = None
+    try:
+        if workers == 1:
+            for index, task in enumerate(tasks):
+                try:
+                    index_to_results[index] = process_nodemap_sides(task)
+                except Exception:
+                    fail(index)
+                    continue
+                flush()
+        else:
+            executor = ProcessPoolExecutor(max_workers=workers)
+            future_to_index = {
+                executor.submit(process_nodemap_sides, task): index
+                for index, task in enumerate(tasks)
+            }
+            for future in as_completed(future_to_index):
+                index = future_to_index[future]
+                try:
+                    index_to_results[index] = future.result()
+                except Exception:
+                    fail(index)
+                    continue
+                flush()
+
+    except KeyboardInterrupt:
+        print("Stopped.")
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        flush(final=True)
+        for sink in sinks.values():
+            sink.close()
+
+    for (specimen_name, side), nodemap_to_results in key_to_results.items():
+        pickle_output(
+            specimen_name=specimen_name,
+            side=side,
+            result_path=key_to_output[(specimen_name, side)]["result_path"],
+            which={f"{specimen_name}_{side}": nodemap_to_results},
+        )
+        print(
+            f"Processed {len(nodemap_to_results)} nodemaps of {specimen_name}_{side}."
+        )
+    if failed:
+        print(f"Failed: {len(failed)} of {len(tasks)} nodemaps.")
+
+    return {
+        f"{specimen_name}_{side}": nodemap_to_results
+        for (specimen_name, side), nodemap_to_results in key_to_results.items()
+    }
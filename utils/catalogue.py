@@ -0,0 +1,151 @@
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import pandas as pd
+
+# prefix of values exported from the test and inspection software, e.g. "inspection_value_element: MAX_LOAD" or
+# "value_element       : 437398.5"
+VALUE_PREFIX = re.compile(r"^\w*value_element\s*:")
+
+
+def parse_header_value(value: str):
+    """
+    Value of a header line as float if possible, otherwise as string. Empty values and "None" are None.
+    """
+
+    value = VALUE_PREFIX.sub("", value.strip()).strip()
+    if value in ("", "None"):
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        return value
+
+
+def read_nodemap_header(data_file: str = None, keywords: list = None):
+    """
+    Read the metadata of a nodemap from its "#"-prefixed header, "# keyword : value" per line. Reading stops at the
+    first data row, or as soon as all keywords are found, so the data itself is never parsed. Unlike the header
+    reader of crackpy, string values like "MAX_LOAD" or dates are kept.
+
+    Parameters
+    ----------
+    data_file : str
+            path of the nodemap
+    keywords : list [str], default = None
+            keywords to read. If None, all keywords of the header are read.
+
+    Returns
+    ----------
+    header : dict [keyword]: float or str
+        values of the found keywords
+
+    """
+
+    missing = None if keywords is None else set(keywords)
+    header = {}
+    if missing is not None and not missing:
+        return header
+    with open(data_file, "r", errors="ignore") as input_data:
+        for line in input_data:
+            if not line.startswith("#"):
+                break
+            keyword, separator, value = line[1:].partition(":")
+            keyword = keyword.strip()
+            # section titles and the column line are no "keyword : value" pairs
+            if not separator or not keyword or " " in keyword:
+                continue
+            if missing is not None:
+                if keyword not in missing:
+                    continue
+                missing.discard(keyword)
+            header[keyword] = parse_header_value(value)
+            if missing is not None and not missing:
+                break
+    return header
+
+
+def _read_headers(data_files: list, keywords: list = None):
+    return [
+        read_nodemap_header(data_file, keywords) if os.path.exists(data_file) else {}
+        for data_file in data_files
+    ]
+
+
+def build_catalogue(
+    nodemap_path: str = None,
+    nodemap_names: list = None,
+    keywords: list = None,
+    workers: int = None,
+    chunk_size: int = 256,
+    output_file: str = None,
+):
+    """
+    Catalogue of the metadata of all nodemaps in a folder, one row per nodemap. Only the headers are read, see
+    read_nodemap_header, in chunks of nodemaps distributed over worker processes.
+
+    Parameters
+    ----------
+    nodemap_path : str
+            folder containing the nodemaps
+    nodemap_names : list [str], default = None
+            nodemaps to catalogue. If None, all .txt files of the folder are catalogued.
+    keywords : list [str], default = None
+            header keywords forming the columns. If None, all keywords found in the headers.
+    workers : int, default = None
+            number of worker processes, default: number of cores. 1 runs in the current process.
+    chunk_size : int, default = 256
+            number of nodemaps read per task
+    output_file : str, default = None
+            write the catalogue to the given .csv or .parquet file, the latter requires pyarrow
+
+    Returns
+    ----------
+    catalogue : pd.DataFrame
+        metadata indexed by the nodemap name. Missing nodemaps or keywords are NaN.
+
+    """
+
+    if nodemap_names is None:
+        nodemap_names = sorted(
+            entry.name
+            for entry in os.scandir(nodemap_path)
+            if entry.is_file() and entry.name.endswith(".txt")
+        )
+    data_files = [os.path.join(nodemap_path, name) for name in nodemap_names]
+    chunks = [
+        data_files[start : start + chunk_size]
+        for start in range(0, len(data_files), chunk_size)
+    ]
+    read_chunk = partial(_read_headers, keywords=keywords)
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(chunks) <= 1:
+        headers = [header for chunk in chunks for header in read_chunk(chunk)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            headers = [
+                header
+                for chunk_headers in executor.map(read_chunk, chunks)
+                for header in chunk_headers
+            ]
+
+    catalogue = pd.DataFrame.from_records(
+        headers,
+        index=pd.Index(nodemap_names, name="Filename"),
+        columns=keywords,
+    )
+    # columns mixing numbers and strings are written as strings
+    for column in catalogue.columns[catalogue.dtypes == object]:
+        catalogue[column] = catalogue[column].map(
+            lambda value: value if pd.isna(value) else str(value)
+        )
+
+    if output_file is not None:
+        if output_file.endswith(".parquet"):
+            catalogue.to_parquet(output_file)
+        else:
+            catalogue.to_csv(output_file)
+    return catalogue
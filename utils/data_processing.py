@@ -1,13 +1,237 @@
+import copy
 import math
-import matplotlib
+import tempfile
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
 from crackpy.structure_elements.data_files import Nodemap
 from crackpy.fracture_analysis.data_processing import InputData
-from scipy.interpolate import griddata
 import cv2
 import os
 import numpy as np
+import pandas as pd
+from skimage import measure
 
-matplotlib.use("tKAgg")
+from utils.mesh_contours import find_iso_lines, polygon_properties
+from utils.nodemap_cache import Nodemap_Cache
+from utils.triangulation_cache import Triangulation_Cache, triangulation_cache
+
+contour_retrieval_to_mode = {
+    "tree": cv2.RETR_TREE,
+    "external": cv2.RETR_EXTERNAL,
+}
+
+contour_backends = ["pixel", "subpixel", "mesh"]
+
+
+class Region_Contours(Mapping):
+    def __init__(
+        self,
+        analysis=None,
+        which_contours=None,
+        contour_retrieval: str = "tree",
+        contour_backend: str = "pixel",
+    ):
+        """
+        Contours of the plastic zone per region, extracted on first access and memoised. Behaves like the dictionary
+        {region: {"Contour": contours, "Hierarchy": hierarchy}} of the detected contours. Grid and threshold are
+        taken from the analysis when the mapping is created, so later calls of mask_data or find_contours do not
+        change the contours of an existing mapping.
+
+        Parameters
+        ----------
+        analysis : Data_Processing
+                analysis holding the gridded strain field and the window parameters
+        which_contours : list [str], default = None
+                regions that can be extracted. Can only be "Whole", "Upper" or "Lower". If None, all three.
+        contour_retrieval : str, default = "tree"
+                "tree" retrieves all contours with their full hierarchy (cv2.RETR_TREE), "external" only the outer
+                contours (cv2.RETR_EXTERNAL) - sufficient if holes within the plastic zone and the hierarchy are not
+                needed. Only used by the pixel backend.
+        contour_backend : str, default = "pixel"
+                "pixel" traces the boundary pixels of the thresholded mask with cv2.findContours, the contours are
+                integer pixel indices. "subpixel" interpolates the iso-line of the strain field at the threshold with
+                marching squares (skimage.measure.find_contours), the contours are float pixel coordinates. Both
+                return contours of shape (n, 1, 2) with x first. "mesh" extracts the iso-line directly on the
+                triangulation of the nodes without a grid, the contours are in mm. No hierarchy is returned by the
+                subpixel and mesh backends.
+
+        """
+
+        if which_contours is None:
+            which_contours = ["Whole", "Upper", "Lower"]
+        self.analysis = analysis
+        self.which_contours = list(which_contours)
+        self.mode = contour_retrieval_to_mode[contour_retrieval]
+        if contour_backend not in contour_backends:
+            raise ValueError(f"contour_backend must be one of {contour_backends}")
+        self.contour_backend = contour_backend
+        self.strain_treshold = analysis.strain_treshold
+        if contour_backend == "mesh":
+            self.key_to_window = analysis.get_region_bounds()
+            self.strains = analysis.nodedata
+        else:
+            self.key_to_window = analysis.get_region_windows()
+            self.strains = analysis.griddata[2]
+        self.thresholded_strains = None
+        self.buffer = None
+        self.key_to_contour = {}
+
+    def __getitem__(self, key):
+        if key not in self.which_contours:
+            raise KeyError(key)
+        if key not in self.key_to_contour:
+            self._prepare()
+            self.key_to_contour[key] = self._extract(key, buffer=self.buffer)
+        return self.key_to_contour[key]
+
+    def _prepare(self):
+        if self.contour_backend == "pixel" and self.thresholded_strains is None:
+            # shared by all regions, one buffer is reused since findContours does not keep the image
+            self.thresholded_strains = np.greater(self.strains, self.strain_treshold)
+            self.buffer = np.empty(self.thresholded_strains.shape, dtype=bool)
+
+    def _extract(self, key, buffer=None):
+        if self.contour_backend == "subpixel":
+            return {
+                "Contour": self.find_subpixel_contours(self.key_to_window[key]),
+                "Hierarchy": None,
+            }
+        if self.contour_backend == "mesh":
+            return {
+                "Contour": self.find_mesh_contours(self.key_to_window[key]),
+                "Hierarchy": None,
+            }
+        mask = self.analysis.build_mask(
+            key,
+            thresholded_strains=self.thresholded_strains,
+            out=buffer,
+            window=self.key_to_window[key],
+        )
+        contours, hierarchy = cv2.findContours(mask, self.mode, cv2.CHAIN_APPROX_NONE)
+        return {"Contour": contours, "Hierarchy": hierarchy}
+
+    def extract(self, keys=None, threads: int = 1):
+        """
+        Extract the contours of several regions at once, concurrently on a thread pool if threads > 1 - OpenCV,
+        scikit-image and numpy release the GIL. Each thread masks into its own buffer.
+
+        Parameters
+        ----------
+        keys : list [str], default = None
+                regions to be extracted. If None, all regions.
+        threads : int, default = 1
+                number of threads
+
+        """
+
+        if keys is None:
+            keys = self.which_contours
+        keys = [
+            key
+            for key in keys
+            if key in self.which_contours and key not in self.key_to_contour
+        ]
+        if threads <= 1 or len(keys) <= 1:
+            for key in keys:
+                self[key]
+            return
+
+        self._prepare()
+        with ThreadPoolExecutor(max_workers=min(threads, len(keys))) as executor:
+            for key, contours in zip(keys, executor.map(self._extract, keys)):
+                self.key_to_contour[key] = contours
+
+    def find_subpixel_contours(self, window):
+        """
+        Iso-lines of the strain field at the threshold within the window of a region. The strain field outside the
+        window, outside the nodemap and on a one pixel frame around the grid is set to a large negative value, so
+        every iso-line is closed and runs through the outermost pixels above the threshold where it is cut by the
+        window.
+
+        Parameters
+        ----------
+        window : tuple (slice, slice)
+                columns and rows of the region, see Data_Processing.get_region_windows
+
+        Returns
+        ----------
+        contours : list [arr (n, 1, 2)]
+            closed contours in float pixel coordinates (x, y) of the grid
+
+        """
+
+        columns, rows = window
+        if rows is None:
+            rows = slice(None)
+        strains = self.strains[rows, columns]
+
+        # finite, since marching squares interpolates towards the outside value - -inf would give NaN coordinates
+        field = np.full((self.strains.shape[0] + 2, self.strains.shape[1] + 2), -1e30)
+        field[1:-1, 1:-1][rows, columns] = np.where(
+            np.isfinite(strains), strains, -1e30
+        )
+
+        contours = []
+        for contour in measure.find_contours(field, level=self.strain_treshold):
+            # find_contours returns (row, col) of the padded field, closed contours repeat the first point
+            contour = contour[:-1, ::-1] - 1
+            contours.append(contour.astype(np.float32).reshape(-1, 1, 2))
+        return contours
+
+    def find_mesh_contours(self, bounds):
+        """
+        Iso-lines of the nodal strains at the threshold within the bounds of a region, extracted on the cached
+        Delaunay triangulation of the nodes. The region is cut by taking the minimum of the strain above the
+        threshold and the distances to the bounds, so the iso-line of this field at zero runs along the bounds where
+        the plastic zone extends beyond them.
+
+        Parameters
+        ----------
+        bounds : tuple (float, float, float, float)
+                x_min, x_max, y_min, y_max of the region, see Data_Processing.get_region_bounds
+
+        Returns
+        ----------
+        contours : list [arr (n, 1, 2)]
+            closed contours in mm
+
+        """
+
+        x_coordinates, y_coordinates, strains = self.strains
+        x_min, x_max, y_min, y_max = bounds
+
+        field = strains - self.strain_treshold
+        for distance in (
+            None if x_min is None else x_coordinates - x_min,
+            None if x_max is None else x_max - x_coordinates,
+            None if y_min is None else y_coordinates - y_min,
+            None if y_max is None else y_max - y_coordinates,
+        ):
+            if distance is not None:
+                field = np.minimum(field, distance)
+
+        _, delaunay = self.analysis.triangulation_cache.get_delaunay(
+            x_coordinates, y_coordinates
+        )
+        return [
+            iso_line.reshape(-1, 1, 2)
+            for iso_line in find_iso_lines(
+                delaunay.simplices, x_coordinates, y_coordinates, field
+            )
+        ]
+
+    def __iter__(self):
+        return iter(self.which_contours)
+
+    def __len__(self):
+        return len(self.which_contours)
+
+    def extracted(self):
+        """
+        Regions whose contours were already extracted.
+        """
+
+        return list(self.key_to_contour)
 
 
 class Data_Processing:
@@ -17,6 +241,10 @@ class Data_Processing:
         side: str = None,
         nodemap_name: str = None,
         specimen_type: str = None,
+        triangulation_cache: Triangulation_Cache = triangulation_cache,
+        nodemap_cache: Nodemap_Cache = None,
+        threads: int = 1,
+        preloaded_nodemap=None,
     ):
         """
         Parameter for analyzing the plastic zone based on either FE or DIC data.
@@ -31,6 +259,17 @@ class Data_Processing:
                 self-explaining
         specimen_type : str
                 specimen type, can be either "Biax", "MT" or "FE". Defines how the input data are proceeded.
+        triangulation_cache : Triangulation_Cache
+                cache for the triangulation of the node coordinates and the interpolation weights. By default, one
+                cache is shared by all instances, so nodemaps with identical node coordinates are triangulated once.
+        nodemap_cache : Nodemap_Cache, default = None
+                binary cache of the parsed nodemaps. If None, the text nodemaps are parsed on every read.
+        threads : int, default = 1
+                number of threads used within the nodemap - for the interpolation to the grid and for the contour
+                extraction of the regions. Useful for single large nodemaps, e.g. in live mode.
+        preloaded_nodemap : InputData or Cached_Nodemap, default = None
+                nodemap already read, e.g. for the other side of the specimen. mask_data works on a shallow copy
+                instead of reading the nodemap file again, see load_nodemap.
 
         """
 
@@ -39,7 +278,14 @@ class Data_Processing:
         self.side = side
         self.nodemap_name = nodemap_name
         self.specimen_type = specimen_type
+        self.triangulation_cache = triangulation_cache
+        self.nodemap_cache = nodemap_cache
+        self.threads = threads
+        self.preloaded_nodemap = preloaded_nodemap
 
+        self.nodemap_path = os.path.join(
+            global_path, "data_examples", self.specimen_name, "nodemaps"
+        )
         self.output_path = os.path.join(
             global_path, "02_results", self.specimen_name, self.side
         )
@@ -99,6 +345,37 @@ class Data_Processing:
 
             return self.meta_attributes_to_keywords
 
+    def load_nodemap(self, meta_keywords: dict = None):
+        """
+        Read the nodemap from the binary nodemap cache if available, otherwise parse the text file with crackpy. A
+        preloaded nodemap is copied instead.
+
+        Parameters
+        ----------
+        meta_keywords : dict, default = None
+                metadata keywords to read from the nodemap header
+
+        Returns
+        ----------
+        nodemap_file : InputData or Cached_Nodemap
+            nodemap data and metadata
+
+        """
+
+        if self.preloaded_nodemap is not None:
+            # mask_data replaces the coordinates of its nodemap, e.g. by the flipped ones of the left side
+            return copy.copy(self.preloaded_nodemap)
+
+        if self.nodemap_cache is not None:
+            return self.nodemap_cache.load(
+                nodemap_name=self.nodemap_name,
+                nodemap_path=self.nodemap_path,
+                meta_keywords=meta_keywords,
+            )
+
+        self.nodemap = Nodemap(name=self.nodemap_name, folder=self.nodemap_path)
+        return InputData(self.nodemap, meta_keywords=meta_keywords)
+
     def mask_data(
         self,
         crack_tip_x: float = None,
@@ -108,6 +385,15 @@ class Data_Processing:
         crack_tip_tolerance: float = 0.1,
         reduce_x_window: tuple = (0, 0),
         reduce_y_window: tuple = (0, 0),
+        roi_margin: float = None,
+        roi: tuple = None,
+        which_contours=None,
+        contour_retrieval: str = "tree",
+        contour_backend: str = "pixel",
+        grid_step: float = None,
+        low_memory: bool = False,
+        tile_size: int = None,
+        tile_path: str = None,
     ):
         """
         Mask plastic zone within nodemap files for given crack tip x and y coordinates.
@@ -132,15 +418,55 @@ class Data_Processing:
                 example: total window is defined by x.min=20, x.max=28, y.min=4, y.max=10
                 applying both masks reduce_x_window = (2,3) and reduce_y_window = (1,1.5) narrows down the analyzed
                 coordinates to (20+2, 28-3,  4+1, 10-1.5) --> new window is x.min=22, x.max=25, y.min=5, y.max=8.5
-
+        roi_margin : float, default = None
+                if given, only a region of interest around the crack tip is gridded instead of the whole specimen.
+                The region spans from the crack tip (minus crack_tip_tolerance) to roi_margin in mm in front of it
+                and roi_margin in mm above and below it. The contour must lie completely inside the region, so
+                choose the margin larger than the expected plastic zone.
+        roi : tuple (float, float, float, float), default = None
+                region of interest relative to the crack tip, (x_min, x_max, y_min, y_max) in mm. Like roi_margin, but
+                with arbitrary bounds, e.g. the bounds of the contour of the previous stage, see tracking.Stage_Tracker.
+                Overrides roi_margin. Not used by the mesh backend. If the region does not overlap the nodemap, the
+                full window is used.
+        which_contours : list [str], default = None
+                list of contours to be detected. Can only be "Whole", "Upper" or "Lower". If None, all three are
+                detected. Only the masks of the given contours are built.
+        contour_retrieval : str, default = "tree"
+                "tree" retrieves all contours with their hierarchy, "external" only the outer contours without
+                holes. See Region_Contours.
+        contour_backend : str, default = "pixel"
+                "pixel" detects the contours on the boundary pixels of the thresholded grid, "subpixel" interpolates
+                the iso-line at strain_treshold between the grid points. The subpixel contours are smoother and
+                shorter than the pixel contours. They do not compensate a coarser grid_step, see README.md for the
+                measured error. See Region_Contours.
+                "mesh" skips the interpolation grid and extracts the iso-line on the triangulation of the nodes,
+                griddata is None then.
+        grid_step : float, default = None
+                spacing of the interpolation grid in mm. If None, 0.02 mm for FE and 0.01 mm for DIC data.
+        low_memory : bool, default = False
+                keep the interpolated strain field as float32 and do not cache the interpolation weights of the grid,
+                see Triangulation_Cache. evaluate_contours then stores the contours in mm as float32 and skips the
+                pixel contour. Use release to free the remaining arrays of the nodemap after the evaluation.
+        tile_size : int, default = None
+                for grids larger than the memory. If given, the strain field is interpolated in tiles of about
+                tile_size grid points into a temporary memory mapped file instead of the memory, without caching the
+                interpolation weights. The tiles are rows of the same grid and the contours are traced on the whole
+                thresholded mask, so they are not cut at tile borders. Only the interpolation and the strain field
+                are bounded: the pixel backend still holds two boolean masks of the grid in memory (2 bytes per grid
+                point instead of 8 for the strain field), the subpixel backend a float64 copy of the strain field
+                within the window of a region. Use the pixel backend for grids larger than the memory.
+        tile_path : str, default = None
+                folder of the temporary file. If None, the temporary folder of the system.
 
         Returns
         ----------
-        key_to_contour : dict
+        key_to_contour : Region_Contours
             dictionary containing the detected contours and corresponsing hierachical information for the whole contour,
-            lower and upper half, assuming that we separate by a straight line throught the crack tip
+            lower and upper half, assuming that we separate by a straight line throught the crack tip. The contours
+            of each region are extracted on first access.
         griddata : tuple (arr, arr, arr)
-            tuple containing the grid where the initial data were mapped. x, y and z = strains.
+            tuple containing the grid where the initial data were mapped. x axis (1, nx) and y axis (ny, 1), which
+            broadcast to the grid as with np.meshgrid(sparse=True), and z = strains (ny, nx).
 
 
         """
@@ -153,16 +479,8 @@ class Data_Processing:
         if self.specimen_type == "Biax":
 
             self.cycles = int(self.nodemap_name.split("_")[1])
-            self.nodemap_path = os.path.join(
-                os.getcwd(),
-                "data_examples",
-                self.specimen_name,
-                "nodemaps",
-            )
-            self.nodemap = Nodemap(name=self.nodemap_name, folder=self.nodemap_path)
-
-            self.nodemap_file = InputData(
-                self.nodemap, meta_keywords=self.meta_attributes_to_keywords
+            self.nodemap_file = self.load_nodemap(
+                meta_keywords=self.meta_attributes_to_keywords
             )
             self.cycles = self.nodemap_file.experimental_data_cycles
             self.force = self.nodemap_file.experimental_data_load_main_axis_fy
@@ -187,15 +505,7 @@ class Data_Processing:
         if self.specimen_type == "MT":
 
             self.nodemap_folder_id = folder_id
-            self.nodemap_path = os.path.join(
-                os.getcwd(),
-                "data_examples",
-                self.specimen_name,
-                "nodemaps",
-            )
-            self.nodemap = Nodemap(name=self.nodemap_name, folder=self.nodemap_path)
-
-            self.nodemap_file = InputData(self.nodemap)
+            self.nodemap_file = self.load_nodemap()
             self.crack_tip_x = crack_tip_x * self.flip
             self.crack_tip_y = crack_tip_y
             self.folder = folder_id
@@ -215,15 +525,7 @@ class Data_Processing:
             strains = self.nodemap_file.eps_vm * 100
 
         if self.specimen_type == "FE":
-            self.nodemap_path = os.path.join(
-                os.getcwd(),
-                "data_examples",
-                self.specimen_name,
-                "nodemaps",
-            )
-            self.nodemap = Nodemap(name=self.nodemap_name, folder=self.nodemap_path)
-
-            self.nodemap_file = InputData(self.nodemap)
+            self.nodemap_file = self.load_nodemap()
 
             self.crack_tip_x = crack_tip_x * self.flip
             self.crack_tip_y = crack_tip_y
@@ -245,144 +547,457 @@ class Data_Processing:
         # prepare image data
         # Mesh Data to Grid
 
-        if self.specimen_type == "FE":
-            x_int = np.arange(
-                start=x_coordinates.min(), stop=x_coordinates.max(), step=0.02
+        self.nodedata = (x_coordinates, y_coordinates, strains)
+        self.low_memory = low_memory
+        self.roi_bounds = None
+
+        if contour_backend == "mesh":
+            # no grid - the contours are extracted on the triangulation of the nodes
+            self.griddata = None
+            return self.find_contours(
+                which_contours=which_contours, contour_backend=contour_backend
             )
-            y_int = np.arange(
-                start=y_coordinates.min(), stop=y_coordinates.max(), step=0.02
+
+        if grid_step is None:
+            grid_step = 0.02 if self.specimen_type == "FE" else 0.01
+
+        x_int = np.arange(
+            start=x_coordinates.min(), stop=x_coordinates.max(), step=grid_step
+        )
+        y_int = np.arange(
+            start=y_coordinates.min(), stop=y_coordinates.max(), step=grid_step
+        )
+
+        if roi is None and roi_margin is not None:
+            roi = (-self.crack_tip_tolerance, roi_margin, -roi_margin, roi_margin)
+        if roi is not None:
+            # crop the grid to the region of interest around the crack tip. The grid keeps the spacing and origin of
+            # the full grid, so the pixel to mm mapping stays the same.
+            roi_x = (abs(self.crack_tip_x) + roi[0], abs(self.crack_tip_x) + roi[1])
+            roi_y = (self.crack_tip_y + roi[2], self.crack_tip_y + roi[3])
+
+            full_x, full_y = (x_int[0], x_int[-1]), (y_int[0], y_int[-1])
+            roi_x_int = x_int[(x_int >= roi_x[0]) & (x_int <= roi_x[1])]
+            roi_y_int = y_int[(y_int >= roi_y[0]) & (y_int <= roi_y[1])]
+            if len(roi_x_int) < 2 or len(roi_y_int) < 2:
+                # e.g. a crack tip outside the nodemap or a region smaller than grid_step
+                print(
+                    f"Region of interest {roi} does not overlap the nodemap {self.nodemap_name}, "
+                    f"the full window is used."
+                )
+                roi = None
+        if roi is not None:
+            x_int, y_int = roi_x_int, roi_y_int
+            # sides where the region of interest cuts the full grid, None if it does not. Nothing behind the crack
+            # tip is analyzed, so the region does not cut there either.
+            self.roi_bounds = tuple(
+                bound if is_cut else None
+                for bound, is_cut in zip(
+                    (*roi_x, *roi_y),
+                    (
+                        roi_x[0]
+                        > max(
+                            full_x[0], abs(self.crack_tip_x) - self.crack_tip_tolerance
+                        ),
+                        roi_x[1] < full_x[1],
+                        roi_y[0] > full_y[0],
+                        roi_y[1] < full_y[1],
+                    ),
+                )
             )
 
-        else:
-            x_int = np.arange(
-                start=x_coordinates.min(), stop=x_coordinates.max(), step=0.01
+        # linear interpolation on the cached triangulation of the nodes - equivalent to griddata(method="linear")
+        if tile_size is not None:
+            if contour_backend == "subpixel":
+                print(
+                    "The subpixel backend copies the strain field into the memory, tile_size only bounds the "
+                    "interpolation."
+                )
+            # the temporary file is removed as soon as the array is released
+            zi = np.memmap(
+                tempfile.TemporaryFile(dir=tile_path),
+                dtype=np.float32 if low_memory else np.float64,
+                mode="w+",
+                shape=(len(y_int), len(x_int)),
+            )
+            self.triangulation_cache.interpolate_tiled(
+                x_coordinates,
+                y_coordinates,
+                strains,
+                x_int,
+                y_int,
+                out=zi,
+                block_size=tile_size,
+                threads=self.threads,
             )
-            y_int = np.arange(
-                start=y_coordinates.min(), stop=y_coordinates.max(), step=0.01
+        else:
+            # low memory - no weights of 36 bytes per grid point are kept in the cache
+            zi = self.triangulation_cache.interpolate(
+                x_coordinates,
+                y_coordinates,
+                strains,
+                x_int,
+                y_int,
+                threads=self.threads,
+                cache_weights=not low_memory,
+                dtype=np.float32 if low_memory else np.float64,
             )
-        xi, yi = np.meshgrid(x_int, y_int)
-        zi = griddata(
-            (x_coordinates, y_coordinates), strains, (xi, yi), method="linear"
+
+        # no dense meshgrids - the axes broadcast to the grid, griddata[0][0] and griddata[1][:, 0] are the axes
+        self.griddata = (
+            x_int[np.newaxis, :],
+            y_int[:, np.newaxis],
+            zi,
+        )
+
+        return self.find_contours(
+            which_contours=which_contours,
+            contour_retrieval=contour_retrieval,
+            contour_backend=contour_backend,
         )
 
-        self.griddata = (xi, yi, zi)
+    def get_region_bounds(self):
+        """
+        Bounds of the whole contour and its upper and lower half in mm - the window of get_region_windows as
+        coordinates, used where no grid exists.
+
+        Returns
+        ----------
+        key_to_bounds : dict [str]: tuple (float, float, float, float)
+            x_min, x_max, y_min, y_max for "Whole", "Upper" and "Lower". None if the region is not limited on that
+            side.
+
+        """
+
+        x_min = abs(self.crack_tip_x) - self.crack_tip_tolerance
+        x_max = self.nodemap_file.coor_x.max() - self.reduce_x_window[1]
+        y_min = self.crack_tip_y - self.reduce_y_window[1]
+        y_max = self.crack_tip_y + self.reduce_y_window[0]
+
+        if self.specimen_type == "Biax":
+            return {
+                "Whole": (x_min, x_max, y_min, y_max),
+                "Upper": (x_min, x_max, self.crack_tip_y, y_max),
+                "Lower": (x_min, x_max, y_min, self.crack_tip_y),
+            }
+        if self.specimen_type == "MT":
+            return {
+                "Whole": (x_min, x_max, None, None),
+                "Upper": (x_min, x_max, self.crack_tip_y, None),
+                "Lower": (x_min, x_max, None, self.crack_tip_y),
+            }
+        if self.specimen_type == "FE":
+            return {
+                "Whole": (x_min, None, None, None),
+                "Upper": (x_min, x_max, self.crack_tip_y, None),
+                "Lower": (x_min, x_max, None, self.crack_tip_y),
+            }
+
+    def get_region_windows(self):
+        """
+        Window of the whole contour and its upper and lower half. The window predicates depend either on x or on y
+        only and the axes are sorted, so every window is a range of columns and a range of rows of the grid.
+
+        Returns
+        ----------
+        key_to_window : dict [str]: tuple (slice, slice)
+            columns and rows of the grid for "Whole", "Upper" and "Lower". The rows are None if the region is not
+            limited in y.
+
+        """
+
+        x_int, y_int = self.griddata[0][0], self.griddata[1][:, 0]
+        x_max = self.nodemap_file.coor_x.max()
 
         # mask data according to given parameters - we only analyze the area in front of the crack tip.
         # A reduction of the window is necessary for DIC data to filter possible artefacts or if the crack tip is
         # too close to any of the borders of the image.
 
-        thresholded_strains = zi > self.strain_treshold
-
-        in_front_of_ct_x = xi > abs(self.crack_tip_x) - self.crack_tip_tolerance
-
-        x_window = (
-            in_front_of_ct_x,
-            (xi < x_coordinates.max() - self.reduce_x_window[1]),
-        )
+        in_front_of_ct_x = x_int > abs(self.crack_tip_x) - self.crack_tip_tolerance
+        x_window = in_front_of_ct_x & (x_int < x_max - self.reduce_x_window[1])
 
         y_window = (
-            (yi < self.crack_tip_y + self.reduce_y_window[0]),
-            (yi > self.crack_tip_y - self.reduce_y_window[1]),
+            (y_int < self.crack_tip_y + self.reduce_y_window[0]),
+            (y_int > self.crack_tip_y - self.reduce_y_window[1]),
         )
 
-        upper_half = yi <= self.crack_tip_y
-        lower_half = yi >= self.crack_tip_y
+        upper_half = y_int <= self.crack_tip_y
+        lower_half = y_int >= self.crack_tip_y
 
-        # create mask for whole contour, lower and upper half and binarize
         if self.specimen_type == "Biax":
-            mask_all = 1 * (
-                np.all(
-                    [
-                        thresholded_strains,
-                        x_window[0],
-                        x_window[1],
-                        y_window[0],
-                        y_window[1],
-                    ],
-                    axis=0,
-                )
-            )
-            mask_lower = 1 * (
-                np.all(
-                    [
-                        thresholded_strains,
-                        x_window[0],
-                        x_window[1],
-                        upper_half,
-                        y_window[1],
-                    ],
-                    axis=0,
-                )
-            )
-            mask_upper = 1 * (
-                np.all(
-                    [
-                        thresholded_strains,
-                        x_window[0],
-                        x_window[1],
-                        lower_half,
-                        y_window[0],
-                    ],
-                    axis=0,
-                )
-            )
+            key_to_predicates = {
+                "Whole": (x_window, y_window[0] & y_window[1]),
+                "Upper": (x_window, lower_half & y_window[0]),
+                "Lower": (x_window, upper_half & y_window[1]),
+            }
         if self.specimen_type == "MT":
-            mask_all = 1 * (
-                np.all([thresholded_strains, x_window[0], x_window[1]], axis=0)
-            )
-            mask_lower = 1 * (
-                np.all(
-                    [thresholded_strains, x_window[0], x_window[1], upper_half], axis=0
-                )
-            )
-            mask_upper = 1 * (
-                np.all(
-                    [thresholded_strains, x_window[0], x_window[1], lower_half], axis=0
-                )
-            )
-
+            key_to_predicates = {
+                "Whole": (x_window, None),
+                "Upper": (x_window, lower_half),
+                "Lower": (x_window, upper_half),
+            }
         if self.specimen_type == "FE":
-            mask_all = 1 * (np.all([thresholded_strains, in_front_of_ct_x], axis=0))
-            mask_lower = 1 * (
-                np.all(
-                    [thresholded_strains, x_window[0], x_window[1], upper_half], axis=0
-                )
-            )
-            mask_upper = 1 * (
-                np.all(
-                    [thresholded_strains, x_window[0], x_window[1], lower_half], axis=0
-                )
+            key_to_predicates = {
+                "Whole": (in_front_of_ct_x, None),
+                "Upper": (x_window, lower_half),
+                "Lower": (x_window, upper_half),
+            }
+
+        return {
+            key: (
+                self.predicate_to_slice(x_predicate),
+                None if y_predicate is None else self.predicate_to_slice(y_predicate),
             )
+            for key, (x_predicate, y_predicate) in key_to_predicates.items()
+        }
 
-        # put in dict
-        masked_dict = {"Whole": mask_all, "Upper": mask_upper, "Lower": mask_lower}
-        self.key_to_contour = {}
-        nodemap_to_contour = {}
-
-        for key, value in masked_dict.items():
-            # plt.imshow(value)
-            # plt.show()
-
-            norm_image = cv2.normalize(
-                value,
-                None,
-                alpha=0,
-                beta=255,
-                norm_type=cv2.NORM_MINMAX,
-                dtype=cv2.CV_8UC1,
-            )
-            contours, hierarchy = cv2.findContours(
-                norm_image, cv2.RETR_TREE, cv2.CHAIN_APPROX_NONE
-            )
-            self.key_to_contour.update(
-                {f"{key}": {"Contour": contours, "Hierarchy": hierarchy}}
-            )
+    @staticmethod
+    def predicate_to_slice(predicate):
+        """
+        Slice of the contiguous range where the predicate on a sorted axis is True.
+        """
+
+        indices = np.flatnonzero(predicate)
+        if len(indices) == 0:
+            return slice(0, 0)
+        return slice(indices[0], indices[-1] + 1)
+
+    def build_mask(self, key: str, thresholded_strains=None, out=None, window=None):
+        """
+        Binary mask of the thresholded strain field within the window of the given region.
+
+        Parameters
+        ----------
+        key : str
+                "Whole", "Upper" or "Lower"
+        thresholded_strains : arr (bool), default = None
+                strain field above the threshold. Computed from the grid if None.
+        out : arr (bool), default = None
+                buffer with the shape of the grid the mask is written into. Allocated if None.
+        window : tuple (slice, slice), default = None
+                columns and rows of the region as returned by get_region_windows. Computed if None.
+
+        Returns
+        ----------
+        mask : arr (uint8)
+            1 within the plastic zone, 0 elsewhere. A view on out, no copy.
+
+        """
+
+        if thresholded_strains is None:
+            thresholded_strains = self.griddata[2] > self.strain_treshold
+        if window is None:
+            window = self.get_region_windows()[key]
+        columns, rows = window
+        if rows is None:
+            rows = slice(None)
+
+        if out is None:
+            out = np.empty(thresholded_strains.shape, dtype=bool)
+        out.fill(False)
+        out[rows, columns] = thresholded_strains[rows, columns]
+        return out.view(np.uint8)
+
+    def find_contours(
+        self,
+        strain_treshold: float = None,
+        which_contours=None,
+        contour_retrieval: str = None,
+        contour_backend: str = None,
+    ):
+        """
+        Mask the gridded strain field and detect the contours of the whole plastic zone and its upper and lower half.
+        Uses the grid and window parameters of the last call of mask_data. The contours of a region are extracted
+        when they are accessed for the first time, e.g. by evaluate_contours, so regions that are never evaluated
+        cost nothing.
+
+        Parameters
+        ----------
+        strain_treshold : float, default = None
+                threshold value for masking the strain field. If None, the threshold given to mask_data is used.
+        which_contours : list [str], default = None
+                list of contours that can be detected. Can only be "Whole", "Upper" or "Lower". If None, all three.
+        contour_retrieval : str, default = None
+                "tree" or "external", see Region_Contours. If None, the mode given to mask_data is used.
+        contour_backend : str, default = None
+                "pixel" or "subpixel", see Region_Contours. If None, the backend given to mask_data is used.
+
+        Returns
+        ----------
+        key_to_contour : Region_Contours
+            see mask_data
+        griddata : tuple (arr, arr, arr)
+            see mask_data
+
+        """
+
+        if strain_treshold is not None:
+            self.strain_treshold = strain_treshold
+        if contour_retrieval is not None:
+            self.contour_retrieval = contour_retrieval
+        if contour_backend is not None:
+            self.contour_backend = contour_backend
+
+        self.key_to_contour = Region_Contours(
+            analysis=self,
+            which_contours=which_contours,
+            contour_retrieval=getattr(self, "contour_retrieval", "tree"),
+            contour_backend=getattr(self, "contour_backend", "pixel"),
+        )
 
-        nodemap_to_contour.update({f"{self.nodemap_name}": self.key_to_contour})
         print(f"Masked data for {self.nodemap_name}")
         print("-------------------------------------")
         return self.key_to_contour, self.griddata
 
+    @staticmethod
+    def select_contour(
+        contours, secondary_crack_treshold: float = 80, contour_area=cv2.contourArea
+    ):
+        """
+        Select the largest of the detected contours and check for secondary cracks. The area of each contour is
+        computed once.
+
+        Parameters
+        ----------
+        contours : tuple [arr]
+                contours as returned by cv2.findContours
+        secondary_crack_treshold: float, [%]
+                see evaluate_contours
+        contour_area : callable, default = cv2.contourArea
+                area of a single contour
+
+        Returns
+        ----------
+        contour_to_analyze : arr
+            largest contour
+        sec_crack : str
+            "Yes" if any other contour is less than secondary_crack_treshold in [%] smaller than the largest one,
+            else "No"
+
+        """
+
+        areas = np.fromiter(
+            (contour_area(contour) for contour in contours),
+            dtype=np.float64,
+            count=len(contours),
+        )
+        largest = int(np.argmax(areas))
+
+        # relative area difference of all other contours to the largest one
+        others = np.delete(areas, largest)
+        sec_crack = "No"
+        if areas[largest] > 0 and np.any(
+            (areas[largest] - others) / areas[largest] * 100 <= secondary_crack_treshold
+        ):
+            sec_crack = "Yes"
+        return contours[largest], sec_crack
+
+    def describe_contour(
+        self, contour_to_analyze, x_int=None, y_int=None, pixelsize: float = None
+    ):
+        """
+        Size descriptors of a single contour in mm.
+
+        Parameters
+        ----------
+        contour_to_analyze : arr (n, 1, 2)
+                contour in integer pixel coordinates as returned by cv2.findContours or in float pixel coordinates
+                as returned by the subpixel backend
+        x_int, y_int : arr
+                grid axes the pixel coordinates refer to
+        pixelsize : float
+                pixels per mm
+
+        Returns
+        ----------
+        descriptors : dict
+            area, contour lenght, height, center of gravity, angle between crack tip and center of gravity, extreme
+            points and the contour in mm
+
+        """
+
+        pixels = contour_to_analyze[:, 0, :]
+        moments = cv2.moments(contour_to_analyze)
+
+        if np.issubdtype(pixels.dtype, np.integer):
+            # convert the pixel coordinates to mm with the grid axes, the center of gravity - cog - is truncated to
+            # the pixel
+            x_coords, y_coords = x_int[pixels[:, 0]], y_int[pixels[:, 1]]
+            cog_x, cog_y = (
+                x_int[int(moments["m10"] / moments["m00"])],
+                y_int[int(moments["m01"] / moments["m00"])],
+            )
+        else:
+            # sub-pixel contour - interpolate between the grid axes
+            x_pixels, y_pixels = np.arange(len(x_int)), np.arange(len(y_int))
+            x_coords = np.interp(pixels[:, 0], x_pixels, x_int)
+            y_coords = np.interp(pixels[:, 1], y_pixels, y_int)
+            cog_x, cog_y = (
+                np.interp(moments["m10"] / moments["m00"], x_pixels, x_int),
+                np.interp(moments["m01"] / moments["m00"], y_pixels, y_int),
+            )
+
+        # extreme points left, bottom and right, top - first occurrence as with argmin and argmax
+        (left, bottom), (right, top) = pixels.argmin(axis=0), pixels.argmax(axis=0)
+
+        return {
+            "Area PZ[mm²]": cv2.contourArea(contour_to_analyze) / (pixelsize**2),
+            "Contour lenght[mm]": cv2.arcLength(contour_to_analyze, closed=True)
+            / pixelsize,
+            # height and lenght are the distances between the outermost top and bottom and left and right points.
+            "Height": abs(y_coords[top] - y_coords[bottom]),
+            "Lenght": abs(x_coords[right] - x_coords[left]),
+            "COG_X[mm]": cog_x,
+            "COG_Y[mm]": cog_y,
+            # angle between crack tip and center of gravity in degree
+            "Angle[°]": math.degrees(
+                math.atan2(cog_y - self.crack_tip_y, cog_x - self.crack_tip_x)
+            ),
+            "Ext_Bottom": (x_coords[bottom], y_coords[bottom]),
+            "Ext_Top": (x_coords[top], y_coords[top]),
+            "Ext_Left": (x_coords[left], y_coords[left]),
+            "Ext_Right": (x_coords[right], y_coords[right]),
+            "Largest contour [mm]": (x_coords, y_coords),
+        }
+
+    def describe_polygon(self, polygon):
+        """
+        Size descriptors of a single contour given in mm, see describe_contour.
+
+        Parameters
+        ----------
+        polygon : arr (n, 1, 2)
+                closed contour in mm as returned by the mesh backend
+
+        Returns
+        ----------
+        descriptors : dict
+            see describe_contour
+
+        """
+
+        x_coords, y_coords = polygon[:, 0, 0], polygon[:, 0, 1]
+        area, contour_lenght, (cog_x, cog_y) = polygon_properties(polygon[:, 0, :])
+        left, right = x_coords.argmin(), x_coords.argmax()
+        bottom, top = y_coords.argmin(), y_coords.argmax()
+
+        return {
+            "Area PZ[mm²]": area,
+            "Contour lenght[mm]": contour_lenght,
+            "Height": abs(y_coords[top] - y_coords[bottom]),
+            "Lenght": abs(x_coords[right] - x_coords[left]),
+            "COG_X[mm]": cog_x,
+            "COG_Y[mm]": cog_y,
+            "Angle[°]": math.degrees(
+                math.atan2(cog_y - self.crack_tip_y, cog_x - self.crack_tip_x)
+            ),
+            "Ext_Bottom": (x_coords[bottom], y_coords[bottom]),
+            "Ext_Top": (x_coords[top], y_coords[top]),
+            "Ext_Left": (x_coords[left], y_coords[left]),
+            "Ext_Right": (x_coords[right], y_coords[right]),
+            "Largest contour [mm]": (x_coords, y_coords),
+        }
+
     def evaluate_contours(
         self, which_contours=None, secondary_crack_treshold: float = 80
     ):
@@ -414,14 +1029,8 @@ class Data_Processing:
         if which_contours is None:
             which_contours = ["Whole"]
         key_to_contour = self.key_to_contour
-        griddata = self.griddata
-        (
-            x_int,
-            y_int,
-        ) = (
-            griddata[0][0],
-            griddata[1][:, 0].flatten(),
-        )
+        if self.threads > 1:
+            key_to_contour.extract(which_contours, threads=self.threads)
         self.list_of_contours = which_contours
         self.secondary_crack_treshold = secondary_crack_treshold
         self.key_to_results = {}
@@ -429,233 +1038,192 @@ class Data_Processing:
         self.contour_detected_list = []
         self.is_contour_detected = None
 
-        for item in self.list_of_contours:
-            count_found_contours = len(key_to_contour[item]["Contour"])
-            print(f"{item} Contour : Found number of contours:{count_found_contours}")
+        if self.specimen_type == "MT":
+            filename = f"{self.nodemap_folder_id}_{self.nodemap_name}"
+        else:
+            filename = f"{self.nodemap_name}"
 
-            # case distinguishion for all detected contours. is there no contour, a single contour or multiple?
+        if self.griddata is not None:
+            # convert area and contour lenght in mm - one mm equals xx pixel
+            x_int, y_int = self.griddata[0][0], self.griddata[1][:, 0]
+            pixelsize = (len(x_int) - 1) / (x_int.max() - x_int.min())
+        else:
+            # contours of the mesh backend are already in mm
+            pixelsize = np.nan
+
+        for item in self.list_of_contours:
+            contours = key_to_contour[item]["Contour"]
+            print(f"{item} Contour : Found number of contours:{len(contours)}")
 
-            if count_found_contours == 0:
+            if len(contours) == 0:
                 print("no contours found")
-                sec_crack = "No"
                 self.contour_detected_list.append(False)
                 continue
+            self.contour_detected_list.append(True)
 
+            if self.griddata is not None:
+                contour_to_analyze, sec_crack = self.select_contour(
+                    contours, secondary_crack_treshold=self.secondary_crack_treshold
+                )
+                descriptors = self.describe_contour(
+                    contour_to_analyze, x_int=x_int, y_int=y_int, pixelsize=pixelsize
+                )
             else:
-                self.contour_detected_list.append(True)
-                if count_found_contours == 1:
-                    contour_to_analyze = max(key_to_contour[item]["Contour"], key=len)
-                    sec_crack = "No"
-
-                if count_found_contours > 1:
-                    sec_crack = "Yes"
-                    found_contours = np.arange(0, count_found_contours)
-                    contour_all = sorted(
-                        key_to_contour[item]["Contour"],
-                        key=cv2.contourArea,
-                        reverse=True,
-                    )  # cnt[0] largest cnt[1] second largest
-                    contour_to_analyze = max(
-                        key_to_contour[item]["Contour"], key=cv2.contourArea
-                    )
-                    for k in found_contours:
-                        area_pz = cv2.contourArea(contour_to_analyze)
-                        area = cv2.contourArea(contour_all[k])
-                        area_diff = ((area_pz - area) / area_pz) * 100
-                        if area_diff > self.secondary_crack_treshold:
-                            contour_to_analyze = max(
-                                key_to_contour[item]["Contour"], key=cv2.contourArea
+                contour_to_analyze, sec_crack = self.select_contour(
+                    contours,
+                    secondary_crack_treshold=self.secondary_crack_treshold,
+                    contour_area=lambda contour: polygon_properties(contour[:, 0, :])[
+                        0
+                    ],
+                )
+                descriptors = self.describe_polygon(contour_to_analyze)
+
+            # sum results
+            self.key_to_results.update(
+                {
+                    f"{item}": {
+                        "Cycles": self.cycles,
+                        "Filename": filename,
+                        "Crack Tip X[mm]": self.crack_tip_x,
+                        "Crack Tip Y[mm]": self.crack_tip_y,
+                        "Crack lenght[mm]": self.nodemap_file.cracklength,
+                        "Area PZ[mm²]": descriptors["Area PZ[mm²]"],
+                        "COG_X[mm]": descriptors["COG_X[mm]"],
+                        "COG_Y[mm]": descriptors["COG_Y[mm]"],
+                        "Contour lenght[mm]": descriptors["Contour lenght[mm]"],
+                        "Angle[°]": descriptors["Angle[°]"],
+                        "Epsmax[%]": self.nodemap_file.eps_vm.max(),
+                        "Threshold": self.strain_treshold,
+                        "X_min[mm]": self.nodemap_file.coor_x.min(),
+                        "X_max[mm]": self.nodemap_file.coor_x.max(),
+                        "Y_min[mm]": self.nodemap_file.coor_y.min(),
+                        "Y_max[mm]": self.nodemap_file.coor_y.max(),
+                        "Pixelsize": pixelsize,
+                        "Height": descriptors["Height"],
+                        "Lenght": descriptors["Lenght"],
+                        "Secondary crack": sec_crack,
+                        "Largest Contour [px]": (
+                            contour_to_analyze
+                            if self.griddata is not None and not self.low_memory
+                            else None
+                        ),
+                        "Ext_Bottom": descriptors["Ext_Bottom"],
+                        "Ext_Top": descriptors["Ext_Top"],
+                        "Ext_Left": descriptors["Ext_Left"],
+                        "Ext_Right": descriptors["Ext_Right"],
+                        "Largest contour [mm]": (
+                            tuple(
+                                np.asarray(coords, dtype=np.float32)
+                                for coords in descriptors["Largest contour [mm]"]
                             )
+                            if self.low_memory
+                            else descriptors["Largest contour [mm]"]
+                        ),
+                    }
+                }
+            )
+            self.nodemap_to_results.update({filename: self.key_to_results})
+            self.is_contour_detected = np.any(self.contour_detected_list)
 
-                        else:
-                            contour_to_analyze = max(
-                                key_to_contour[item]["Contour"], key=cv2.contourArea
-                            )
-                            continue
+            print(f"Stored data for {self.nodemap_name}")
+            print("-------------------------------------")
 
-                # Analyze the contours properties
-                area_contour = cv2.contourArea(contour_to_analyze)
+        return self.nodemap_to_results
 
-                # find the coordinates of the extreme points left, right, top and bottom
-                # to convert the pixel coordinates to mm we need the grid and remap.
+    def release(self):
+        """
+        Free the arrays of the nodemap - nodemap file, nodes, grid, contours and the cached interpolation weights of
+        the grid - once the descriptors are extracted.
+        Only the results are kept, so the memory of a campaign does not grow with the number of nodemaps. Call
+        mask_data again before find_contours, sweep_thresholds or plotting.
+        """
 
-                extLeft = tuple(
-                    contour_to_analyze[contour_to_analyze[:, :, 0].argmin()][0]
+        if self.griddata is not None and self.nodedata is not None:
+            # the interpolation weights of the grid of this stage, if cached
+            self.triangulation_cache.discard_weights(
+                self.triangulation_cache.weights_key(
+                    self.nodedata[0],
+                    self.nodedata[1],
+                    self.griddata[0][0],
+                    self.griddata[1][:, 0],
                 )
-                x_left, y_left = x_int[int(extLeft[0])], y_int[int(extLeft[1])]
-                extRight = tuple(
-                    contour_to_analyze[contour_to_analyze[:, :, 0].argmax()][0]
-                )
-                x_right, y_right = x_int[int(extRight[0])], y_int[int(extRight[1])]
-                extTop = tuple(
-                    contour_to_analyze[contour_to_analyze[:, :, 1].argmax()][0]
-                )
-                x_top, y_top = x_int[int(extTop[0])], y_int[int(extTop[1])]
-                extBot = tuple(
-                    contour_to_analyze[contour_to_analyze[:, :, 1].argmin()][0]
-                )
-                x_bottom, y_bottom = x_int[int(extBot[0])], y_int[int(extBot[1])]
+            )
+        self.nodemap_file = None
+        self.nodedata = None
+        self.griddata = None
+        self.key_to_contour = None
+
+    def sweep_thresholds(
+        self,
+        strain_tresholds: list = None,
+        which_contours=None,
+        secondary_crack_treshold: float = 80,
+    ):
+        """
+        Evaluate the contours for several strain thresholds on the grid of the last call of mask_data. The strain
+        field is interpolated only once, so a sweep costs little more than a single evaluation. The results of the
+        last call of mask_data and evaluate_contours are kept.
 
-                # height and lenght are the distances between the outermost top and bottom and left and right points.
-                pz_height = abs(y_top - y_bottom)
-                pz_lenght = abs(x_right - x_left)
+        Parameters
+        ----------
+        strain_tresholds : list [float]
+                threshold values for masking the strain field
+        which_contours : list [str]
+                list of contours to be evaluated. Can only be "Whole", "Upper" or "Lower"
+        secondary_crack_treshold: float, [%]
+                see evaluate_contours
 
-                # center of gravity - cog
-                moments = cv2.moments(contour_to_analyze)
-                cog_x, cog_y = (
-                    x_int[int(moments["m10"] / moments["m00"])],
-                    y_int[int(moments["m01"] / moments["m00"])],
-                )
+        Returns
+        ----------
+        sweep : pd.DataFrame
+            one row per threshold and contour containing area, height, length and center of gravity. NaN if no
+            contour was detected.
 
-                # convert area and contour lenght in mm - one mm equals xx pixel
-                pixelsize = len(x_int) / (x_int.max() - x_int.min())
-                area_pz = area_contour / (pixelsize**2)
-                contour_lenght_pz = (
-                    cv2.arcLength(contour_to_analyze, closed=True)
-                ) / pixelsize
+        """
 
-                # calculate angle between crack tip and center of gravity in degree
-                angle_ct_to_cog = math.degrees(
-                    math.atan2(cog_y - self.crack_tip_y, cog_x - self.crack_tip_x)
-                )
+        if which_contours is None:
+            which_contours = ["Whole"]
 
-                # convert largest contour pixel coordinates into x-y coordinates
-
-                pixel_to_x_coords = [x_int[v[0][0]] for v in contour_to_analyze]
-                pixel_to_y_coords = [y_int[v[0][1]] for v in contour_to_analyze]
-
-                # sum results
-
-                if self.specimen_type == "Biax":
-                    self.key_to_results.update(
-                        {
-                            f"{item}": {
-                                "Cycles": self.cycles,
-                                "Filename": self.nodemap_name,
-                                "Crack Tip X[mm]": self.crack_tip_x,
-                                "Crack Tip Y[mm]": self.crack_tip_y,
-                                "Crack lenght[mm]": self.nodemap_file.cracklength,
-                                "Area PZ[mm²]": area_pz,
-                                "COG_X[mm]": cog_x,
-                                "COG_Y[mm]": cog_y,
-                                "Contour lenght[mm]": contour_lenght_pz,
-                                "Angle[°]": angle_ct_to_cog,
-                                "Epsmax[%]": self.nodemap_file.eps_vm.max(),
-                                "Threshold": self.strain_treshold,
-                                "X_min[mm]": self.nodemap_file.coor_x.min(),
-                                "X_max[mm]": self.nodemap_file.coor_x.max(),
-                                "Y_min[mm]": self.nodemap_file.coor_y.min(),
-                                "Y_max[mm]": self.nodemap_file.coor_y.max(),
-                                "Pixelsize": pixelsize,
-                                "Height": pz_height,
-                                "Lenght": contour_lenght_pz,
-                                "Secondary crack": sec_crack,
-                                "Largest Contour [px]": contour_to_analyze,
-                                "Ext_Bottom": (x_bottom, y_bottom),
-                                "Ext_Top": (x_top, y_top),
-                                "Ext_Left": (x_left, y_left),
-                                "Ext_Right": (x_right, y_right),
-                                "Largest contour [mm]": (
-                                    pixel_to_x_coords,
-                                    pixel_to_y_coords,
-                                ),
-                            }
-                        }
-                    )
-                    self.nodemap_to_results.update(
-                        {f"{self.nodemap_name}": self.key_to_results}
-                    )
-
-                self.is_contour_detected = np.any(self.contour_detected_list)
-
-                print(f"Stored data for {self.nodemap_name}")
-                print("-------------------------------------")
-
-                if self.specimen_type == "MT":
-                    self.key_to_results.update(
-                        {
-                            f"{item}": {
-                                "Cycles": self.cycles,
-                                "Filename": f"{self.nodemap_folder_id}_{self.nodemap_name}",
-                                "Crack Tip X[mm]": self.crack_tip_x,
-                                "Crack Tip Y[mm]": self.crack_tip_y,
-                                "Crack lenght[mm]": self.nodemap_file.cracklength,
-                                "Area PZ[mm²]": area_pz,
-                                "COG_X[mm]": cog_x,
-                                "COG_Y[mm]": cog_y,
-                                "Contour lenght[mm]": contour_lenght_pz,
-                                "Angle[°]": angle_ct_to_cog,
-                                "Epsmax[%]": self.nodemap_file.eps_vm.max(),
-                                "Threshold": self.strain_treshold,
-                                "X_min[mm]": self.nodemap_file.coor_x.min(),
-                                "X_max[mm]": self.nodemap_file.coor_x.max(),
-                                "Y_min[mm]": self.nodemap_file.coor_y.min(),
-                                "Y_max[mm]": self.nodemap_file.coor_y.max(),
-                                "Pixelsize": pixelsize,
-                                "Height": pz_height,
-                                "Lenght": contour_lenght_pz,
-                                "Secondary crack": sec_crack,
-                                "Largest Contour [px]": contour_to_analyze,
-                                "Ext_Bottom": (x_bottom, y_bottom),
-                                "Ext_Top": (x_top, y_top),
-                                "Ext_Left": (x_left, y_left),
-                                "Ext_Right": (x_right, y_right),
-                                "Largest contour [mm]": (
-                                    pixel_to_x_coords,
-                                    pixel_to_y_coords,
-                                ),
-                            }
-                        }
-                    )
-                    self.nodemap_to_results.update(
-                        {
-                            f"{self.nodemap_folder_id}_{self.nodemap_name}": self.key_to_results
-                        }
-                    )
-
-                if self.specimen_type == "FE":
-                    self.key_to_results.update(
-                        {
-                            f"{item}": {
-                                "Cycles": self.cycles,
-                                "Filename": f"{self.nodemap_name}",
-                                "Crack Tip X[mm]": self.crack_tip_x,
-                                "Crack Tip Y[mm]": self.crack_tip_y,
-                                "Crack lenght[mm]": self.nodemap_file.cracklength,
-                                "Area PZ[mm²]": area_pz,
-                                "COG_X[mm]": cog_x,
-                                "COG_Y[mm]": cog_y,
-                                "Contour lenght[mm]": contour_lenght_pz,
-                                "Angle[°]": angle_ct_to_cog,
-                                "Epsmax[%]": self.nodemap_file.eps_vm.max(),
-                                "Threshold": self.strain_treshold,
-                                "X_min[mm]": self.nodemap_file.coor_x.min(),
-                                "X_max[mm]": self.nodemap_file.coor_x.max(),
-                                "Y_min[mm]": self.nodemap_file.coor_y.min(),
-                                "Y_max[mm]": self.nodemap_file.coor_y.max(),
-                                "Pixelsize": pixelsize,
-                                "Height": pz_height,
-                                "Lenght": contour_lenght_pz,
-                                "Secondary crack": sec_crack,
-                                "Largest Contour [px]": contour_to_analyze,
-                                "Ext_Bottom": (x_bottom, y_bottom),
-                                "Ext_Top": (x_top, y_top),
-                                "Ext_Left": (x_left, y_left),
-                                "Ext_Right": (x_right, y_right),
-                                "Largest contour [mm]": (
-                                    pixel_to_x_coords,
-                                    pixel_to_y_coords,
-                                ),
-                            }
-                        }
-                    )
-                    self.nodemap_to_results.update(
-                        {f"{self.nodemap_name}": self.key_to_results}
-                    )
-
-                self.is_contour_detected = np.any(self.contour_detected_list)
-
-                print(f"Stored data for {self.nodemap_name}")
-                print("-------------------------------------")
-
-        return self.nodemap_to_results
\ No newline at end of file
+        descriptors = [
+            "Area PZ[mm²]",
+            "Height",
+            "Lenght",
+            "Contour lenght[mm]",
+            "COG_X[mm]",
+            "COG_Y[mm]",
+        ]
+        state = [
+            "strain_treshold",
+            "key_to_contour",
+            "list_of_contours",
+            "secondary_crack_treshold",
+            "key_to_results",
+            "nodemap_to_results",
+            "contour_detected_list",
+            "is_contour_detected",
+        ]
+        saved_state = {k: getattr(self, k) for k in state if hasattr(self, k)}
+
+        rows = []
+        for strain_treshold in strain_tresholds:
+            self.find_contours(
+                strain_treshold=strain_treshold, which_contours=which_contours
+            )
+            self.evaluate_contours(
+                which_contours=which_contours,
+                secondary_crack_treshold=secondary_crack_treshold,
+            )
+            for item in which_contours:
+                results = self.key_to_results.get(item, {})
+                row = {
+                    "Filename": self.nodemap_name,
+                    "Contour": item,
+                    "Threshold": strain_treshold,
+                }
+                row.update({k: results.get(k, np.nan) for k in descriptors})
+                rows.append(row)
+
+        for k, v in saved_state.items():
+            setattr(self, k, v)
+
+        return pd.DataFrame(rows)
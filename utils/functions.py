@@ -1,43 +1,110 @@
 import pandas as pd
 import csv
 from collections import namedtuple
+import itertools
 import os
 import numpy as np
 import pickle
 import json
 
-
-def data_input_from_csv_fe(csv_filepath: str = None):
+# columns of the crack tip files - the name columns are joined with "-", the x and y columns are summed, e.g. crack
+# tip and correction
+input_format_to_columns = {
+    "fe": {
+        "name": ["Filename"],
+        "x": ["Crack Tip x [mm]"],
+        "y": ["Crack Tip y [mm]"],
+    },
+    "mt": {
+        "name": ["Folder", "Filename"],
+        "x": ["CT x [mm]"],
+        "y": ["CT y [mm]"],
+    },
+    "csv": {
+        "name": ["Filename"],
+        "x": ["CT x [mm]", "SymReg Corr x [mm]"],
+        "y": ["CT y [mm]", "SymReg Corr y [mm]"],
+    },
+}
+
+
+def load_crack_tips(
+    csv_filepath: str = None, columns: dict = None, keep_columns: bool = False
+):
     """
-    Convert data input from csv to dictionary with filenames and crack tip positions.
+    Read crack tip positions from a csv file, vectorised and by column name.
 
     Parameters
     ----------
     csv_filepath : str
             self-explaining
+    columns : dict
+            {"name": [str], "x": [str], "y": [str]} - columns forming the nodemap name, joined with "-", and columns
+            summed to the crack tip position x and y. See input_format_to_columns.
+    keep_columns : bool, default = False
+            keep the other numeric columns of the file, e.g. cycles or force
 
     Returns
     ----------
-    data_input_dict_corr : dict [filename]: tuple (float, float)
-            dict containing the filename and the respective crack tip position corrected according to rethore
+    crack_tips : pd.DataFrame
+        crack tip positions "x" and "y" indexed by the nodemap name, in the order of the file
+
+    """
+
+    csv_file = pd.read_csv(csv_filepath, skipinitialspace=True)
+    csv_file.columns = csv_file.columns.str.strip()
+
+    names = None
+    for column in columns["name"]:
+        name = csv_file[column].astype(str).str.strip()
+        names = name if names is None else names + "-" + name
+
+    crack_tips = pd.DataFrame(
+        {
+            "x": csv_file[columns["x"]].sum(axis=1, min_count=1).to_numpy(),
+            "y": csv_file[columns["y"]].sum(axis=1, min_count=1).to_numpy(),
+        },
+        index=pd.Index(names, name="Filename"),
+    )
+    if keep_columns:
+        used = set(columns["name"] + columns["x"] + columns["y"])
+        for column in csv_file.select_dtypes("number").columns:
+            if column not in used and not column.startswith("Unnamed"):
+                crack_tips[column] = csv_file[column].to_numpy()
+    return crack_tips
+
+
+def crack_tips_to_dict(crack_tips: pd.DataFrame = None):
+    """
+    Convert the crack tip positions of load_crack_tips to the dictionary [filename]: tuple (float, float) used by the
+    analysis. For duplicated names, the last position is kept.
+    """
 
-    data_input_dict_uncorr : dict [filename]: tuple (float, float)
-    dict containing the filename and the respective crack tip position by line intercept method
+    return dict(
+        zip(crack_tips.index, zip(crack_tips["x"].tolist(), crack_tips["y"].tolist()))
+    )
 
 
+def data_input_from_csv_fe(csv_filepath: str = None):
     """
+    Convert data input from csv to dictionary with filenames and crack tip positions.
 
-    csv_file = pd.read_csv(csv_filepath)
+    Parameters
+    ----------
+    csv_filepath : str
+            self-explaining
 
-    csv_file = csv_file.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-    csv_file.rename(columns=lambda x: x.strip(), inplace=True)
+    Returns
+    ----------
+    data_input_dict : dict [filename]: tuple (float, float)
+            dict containing the filename and the respective crack tip position
 
-    # convert to dict and return
-    csv_input_dict_corr = {}
-    for index, row in csv_file.iterrows():
-        csv_input_dict_corr.update({row[0]: (row[1], row[2])})
 
-    return csv_input_dict_corr
+    """
+
+    return crack_tips_to_dict(
+        load_crack_tips(csv_filepath, columns=input_format_to_columns["fe"])
+    )
 
 
 def data_input_from_csv_mt(csv_filepath: str = None):
@@ -51,29 +118,15 @@ def data_input_from_csv_mt(csv_filepath: str = None):
 
     Returns
     ----------
-    data_input_dict_corr : dict [filename]: tuple (float, float,)
-            dict containing the filename and the respective crack tip position corrected according to rethore
-
-    data_input_dict_uncorr : dict [filename]: tuple (float, float,)
-    dict containing the filename and the respective crack tip position by line intercept method
+    data_input_dict_uncorr : dict [folder-filename]: tuple (float, float)
+            dict containing the folder and filename and the respective crack tip position by line intercept method
 
 
     """
 
-    csv_file = pd.read_csv(csv_filepath)
-
-    csv_file = csv_file.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-    csv_file.rename(columns=lambda x: x.strip(), inplace=True)
-
-    # convert to dict and return
-    csv_input_dict_corr = {}
-    csv_input_dict_uncorr = {}
-    for index, row in csv_file.iterrows():
-        csv_input_dict_corr.update({row[1]: (row[2] + row[4], row[3] + row[5], row[6])})
-        csv_input_dict_uncorr.update({f"{row[6]}-{row[1]}": (row[2], row[3])})
-
-    # return {'Uncorrected': csv_input_dict_corr, 'Corrected': csv_input_dict_uncorr}
-    return csv_input_dict_uncorr
+    return crack_tips_to_dict(
+        load_crack_tips(csv_filepath, columns=input_format_to_columns["mt"])
+    )
 
 
 def data_input_from_csv(csv_filepath: str = None):
@@ -90,26 +143,12 @@ def data_input_from_csv(csv_filepath: str = None):
     data_input_dict_corr : dict [filename]: tuple (float, float)
             dict containing the filename and the respective crack tip position corrected according to rethore
 
-    data_input_dict_uncorr : dict [filename]: tuple (float, float)
-    dict containing the filename and the respective crack tip position by line intercept method
-
 
     """
 
-    csv_file = pd.read_csv(csv_filepath)
-
-    csv_file = csv_file.apply(lambda x: x.str.strip() if x.dtype == "object" else x)
-    csv_file.rename(columns=lambda x: x.strip(), inplace=True)
-
-    # convert to dict and return
-    csv_input_dict_corr = {}
-    csv_input_dict_uncorr = {}
-    for index, row in csv_file.iterrows():
-        csv_input_dict_corr.update({row[1]: (row[2] + row[4], row[3] + row[5])})
-        csv_input_dict_uncorr.update({row[1]: (row[2], row[3])})
-
-    # return {'Uncorrected': csv_input_dict_corr, 'Corrected': csv_input_dict_uncorr}
-    return csv_input_dict_corr
+    return crack_tips_to_dict(
+        load_crack_tips(csv_filepath, columns=input_format_to_columns["csv"])
+    )
 
 
 def load_from_pickle(dict_path):
@@ -151,6 +190,15 @@ def data_input_from_dict(dict_filepath: str = None):
     return csv_input_dict
 
 
+# readers of the crack tip input by input format
+input_format_to_loader = {
+    "csv": data_input_from_csv,
+    "mt": data_input_from_csv_mt,
+    "fe": data_input_from_csv_fe,
+    "dict": data_input_from_dict,
+}
+
+
 def sum_results(
     specimen_name: str = "not defined",
     side: str = None,
@@ -253,12 +301,152 @@ def json_output(
         json.dump(which, handle)
 
 
-def filter_data_input(data_in: dict = None, limit: tuple = (None, None)):
+def columnar_output(
+    specimen_name: str = "not defined",
+    side: str = None,
+    result_path: str = None,
+    which: dict = None,
+):
+    """
+
+    Columnar output of the same results as pickle_output, readable column by column without loading everything.
+    The scalar descriptors are written to {specimen_name}_{side}_Descriptors.parquet, one row per nodemap and
+    contour. The extreme points are split into _X and _Y columns. The largest contour of each row is written to
+    {specimen_name}_{side}_Contours.arrow (Arrow IPC, uncompressed, so it can be memory mapped) as list columns X and
+    Y, i.e. flat float32 coordinate arrays indexed by offsets. Requires pyarrow.
+
+    Parameters
+    ----------
+    specimen_name : str
+            self-explaining
+    side : str
+            side, has to be "left" or "right"
+    result_path: str
+            output folder
+    which: dict
+            object as passed to pickle_output - {specimen: {nodemap: {contour: results}}}
+
+    Returns
+    ----------
+    descriptor_file, contour_file : str
+        paths of the written files
+
+    """
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = []
+    contour_keys = {"Nodemap": [], "Contour": []}
+    x_coords, y_coords, offsets = [], [], [0]
+
+    for specimen, nodemap_to_results in which.items():
+        for nodemap_name, key_to_results in nodemap_to_results.items():
+            for contour, results in key_to_results.items():
+                row = {
+                    "Specimen": specimen,
+                    "Nodemap": nodemap_name,
+                    "Contour": contour,
+                }
+                for k, v in results.items():
+                    if k in ["Largest Contour [px]", "Largest contour [mm]"]:
+                        continue
+                    if isinstance(v, tuple):
+                        row[f"{k}_X[mm]"], row[f"{k}_Y[mm]"] = v
+                    else:
+                        row[k] = v
+                rows.append(row)
+
+                x, y = results["Largest contour [mm]"]
+                contour_keys["Nodemap"].append(nodemap_name)
+                contour_keys["Contour"].append(contour)
+                x_coords.append(np.asarray(x, dtype=np.float32))
+                y_coords.append(np.asarray(y, dtype=np.float32))
+                offsets.append(offsets[-1] + len(x))
+
+    descriptor_file = os.path.join(
+        result_path, f"{specimen_name}_{side}_Descriptors.parquet"
+    )
+    pq.write_table(pa.Table.from_pandas(pd.DataFrame(rows)), descriptor_file)
+
+    offsets = pa.array(offsets, type=pa.int64())
+    contours = pa.table(
+        {
+            "Nodemap": contour_keys["Nodemap"],
+            "Contour": contour_keys["Contour"],
+            "X": pa.LargeListArray.from_arrays(
+                offsets, np.concatenate(x_coords or [np.empty(0, np.float32)])
+            ),
+            "Y": pa.LargeListArray.from_arrays(
+                offsets, np.concatenate(y_coords or [np.empty(0, np.float32)])
+            ),
+        }
+    )
+    contour_file = os.path.join(result_path, f"{specimen_name}_{side}_Contours.arrow")
+    with pa.OSFile(contour_file, "wb") as sink:
+        with pa.ipc.new_file(sink, contours.schema) as writer:
+            writer.write_table(contours)
+
+    return descriptor_file, contour_file
+
+
+def load_contours(contour_file: str = None):
+    """
+    Memory map the contour table written by columnar_output. Only the accessed contours are read from disk.
 
-    if isinstance(data_in, dict):
-        dict_filtered = {}
-        for k, v in data_in.items():
-            if abs(v[0]) > limit[0] and abs(v[0]) < limit[1]:
-                dict_filtered.update({k: v})
+    Parameters
+    ----------
+    contour_file : str
+            path of the .arrow file
+
+    Returns
+    ----------
+    contours : pyarrow.Table
+        columns Nodemap, Contour, X and Y. The coordinates of row i are contours["X"][i].values, or
+        contours["X"].combine_chunks().values for all coordinates as one flat array.
+
+    """
+
+    import pyarrow as pa
+
+    return pa.ipc.open_file(pa.memory_map(contour_file, "r")).read_all()
+
+
+def filter_data_input(data_in=None, limit: tuple = (None, None)):
+    """
+    Keep the nodemaps with the crack tip position abs(x) strictly within the limits.
+
+    Parameters
+    ----------
+    data_in : dict [filename]: tuple (float, float) or pd.DataFrame
+            crack tip positions as returned by the data_input_from_* functions or by load_crack_tips
+    limit : tuple (float, float)
+            lower and upper limit of abs(x), None for no limit
+
+    Returns
+    ----------
+    data_filtered : dict or pd.DataFrame
+        the filtered crack tip positions, same type as data_in
+
+    """
 
-        return dict_filtered
+    if isinstance(data_in, pd.DataFrame):
+        x = data_in["x"].to_numpy(dtype=float)
+    else:
+        # the x column of the dict, read in one pass - a DataFrame of the tuples takes longer than the filter itself
+        x = np.fromiter(
+            (position[0] for position in data_in.values()),
+            dtype=float,
+            count=len(data_in),
+        )
+
+    inside = np.ones(len(x), dtype=bool)
+    if limit[0] is not None:
+        inside &= np.abs(x) > limit[0]
+    if limit[1] is not None:
+        inside &= np.abs(x) < limit[1]
+
+    if isinstance(data_in, pd.DataFrame):
+        return data_in[inside]
+    # the items are selected by the same mask, without a Python comparison per nodemap
+    return dict(itertools.compress(data_in.items(), inside))
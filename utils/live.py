@@ -0,0 +1,256 @@
+import os
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from utils.batch import is_plotted, process_nodemap
+from utils.data_processing import Data_Processing
+from utils.functions import pickle_output
+from utils.manifest import Result_Manifest
+from utils.nodemap_cache import Nodemap_Cache
+from utils.render import Render_Queue
+from utils.result_writer import Result_Sink
+
+
+def _stamp(file_path: str):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def run_live(
+    input_file: str = None,
+    input_loader=None,
+    specimen_name: str = "not defined",
+    side: str = None,
+    specimen_type: str = None,
+    mask_parameters: dict = None,
+    evaluate_parameters: dict = None,
+    plot_contour_parameters: dict = None,
+    plot_nodemap_parameters: dict = None,
+    key_index: str = "Filename",
+    workers: int = 2,
+    nodemap_cache: Nodemap_Cache = None,
+    poll_interval: float = 5.0,
+    idle_timeout: float = None,
+    plot_every: int = 1,
+    plot_nodemaps: list = None,
+    defer_plots: bool = False,
+    threads: int = 1,
+    max_retries: int = 3,
+):
+    """
+    Evaluate the nodemaps of a running test as they arrive. The nodemap folder and the crack tip input file are
+    polled. A nodemap is processed as soon as it is complete on disk - size and modification time unchanged between
+    two polls - and its crack tip position is given in the input file. The summary row is appended to the summary
+    file immediately. A small pool of worker processes is kept alive for the whole run, so their triangulation and
+    interpolation caches stay warm between stages. Every processed nodemap is recorded in the manifest of run_batch,
+    so a restarted live run or a later run_batch(resume=True) does not process it again.
+
+    A nodemap whose processing fails is logged with its traceback and retried on a later poll, e.g. if it was
+    complete on disk but not yet readable. An input file that cannot be read is treated as not ready yet.
+
+    Stop with Ctrl+C, the pickle of all results is written on exit.
+
+    Parameters
+    ----------
+    input_file : str
+            file containing the crack tip positions, re-read whenever it changes
+    input_loader : callable
+            function reading input_file, e.g. data_input_from_csv
+    specimen_name, side, specimen_type : str
+            see Data_Processing
+    mask_parameters, evaluate_parameters, plot_contour_parameters, plot_nodemap_parameters : dict
+            see batch.process_nodemap
+    key_index : str, default = "Filename"
+            see batch.run_batch
+    workers : int, default = 2
+            number of worker processes. 1 runs in the current process.
+    nodemap_cache : Nodemap_Cache, default = None
+            binary cache of the parsed nodemaps, see Data_Processing
+    poll_interval : float, default = 5.0
+            seconds between two polls of the folder. New nodemaps are picked up after one to two intervals.
+    idle_timeout : float, default = None
+            stop if no nodemap arrived and none is running for the given seconds. If None, run until interrupted.
+    plot_every, plot_nodemaps : default = 1, None
+            see batch.run_batch, counted in the order of arrival
+    defer_plots : bool, default = False
+            queue the plots instead of drawing them, see batch.run_batch. Draw them with pz_render.py, also while
+            the test is running.
+    threads : int, default = 1
+            number of threads within each nodemap, see Data_Processing. Reduces the latency of single large stages.
+    max_retries : int, default = 3
+            number of retries of a failed nodemap, it is skipped for the rest of the run afterwards
+
+    Returns
+    ----------
+    nodemap_to_results : dict
+        results of all nodemaps
+
+    """
+
+    paths = Data_Processing(specimen_name=specimen_name, side=side)
+    summary_file = os.path.join(
+        paths.output_path_results, f"{specimen_name}_{side}_Summary.csv"
+    )
+    manifest = Result_Manifest(
+        os.path.join(
+            paths.output_path_pickle, f"{specimen_name}_{side}_Manifest.pickle"
+        )
+    )
+
+    queue = Render_Queue.of_specimen(specimen_name, side) if defer_plots else None
+    data_input = {}
+    input_stamp = None
+    name_to_stamp = {}
+    submitted = set()
+    name_to_failures = {}
+    future_to_task = {}
+    sum_nodemaps_to_results = {}
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    # rows are flushed one by one, the summary is always up to date
+    sink = Result_Sink(file_path=summary_file, key_index=key_index, buffer_size=1)
+
+    def collect(nodemap_to_results, res_dict):
+        sum_nodemaps_to_results.update(nodemap_to_results)
+        sink.write(res_dict)
+
+    def fail(nodemap_name):
+        # called within the except clause, logs the traceback of the current exception
+        print(f"Processing of {nodemap_name} failed:")
+        traceback.print_exc()
+        name_to_failures[nodemap_name] = name_to_failures.get(nodemap_name, 0) + 1
+        if name_to_failures[nodemap_name] > max_retries:
+            print(f"Skipped {nodemap_name} after {max_retries} retries.")
+            return
+        # picked up again once it is unchanged between two polls
+        submitted.discard(nodemap_name)
+        name_to_stamp.pop(nodemap_name, None)
+
+    print(f"Watching {paths.nodemap_path} - stop with Ctrl+C.")
+    last_activity = time.monotonic()
+    try:
+        while True:
+            if _stamp(input_file) != input_stamp:
+                try:
+                    data_input = input_loader(input_file)
+                    input_stamp = _stamp(input_file)
+                except Exception:
+                    # e.g. written at the moment, read again on the next poll
+                    print(f"Input file {input_file} not readable yet:")
+                    traceback.print_exc()
+
+            for entry in sorted(os.scandir(paths.nodemap_path), key=lambda e: e.name):
+                nodemap_name = entry.name
+                if (
+                    nodemap_name in submitted
+                    or nodemap_name not in data_input
+                    or not entry.is_file()
+                ):
+                    continue
+
+                # still being written if size or modification time changed since the last poll
+                stamp = _stamp(entry.path)
+                if name_to_stamp.get(nodemap_name) != stamp:
+                    name_to_stamp[nodemap_name] = stamp
+                    continue
+
+                plotted = is_plotted(
+                    len(submitted), nodemap_name, plot_every, plot_nodemaps
+                )
+                submitted.add(nodemap_name)
+                last_activity = time.monotonic()
+                task = {
+                    "nodemap_name": nodemap_name,
+                    "crack_tip": data_input[nodemap_name],
+                    "specimen_name": specimen_name,
+                    "side": side,
+                    "specimen_type": specimen_type,
+                    "mask_parameters": mask_parameters,
+                    "evaluate_parameters": evaluate_parameters,
+                    "plot_contour_parameters": (
+                        plot_contour_parameters if plotted else None
+                    ),
+                    "plot_nodemap_parameters": (
+                        plot_nodemap_parameters if plotted else None
+                    ),
+                    "nodemap_cache": nodemap_cache,
+                    "render_queue": queue.queue_path if queue is not None else None,
+                    "threads": threads,
+                }
+                parameter_hash = Result_Manifest.hash_parameters(
+                    crack_tip=task["crack_tip"],
+                    specimen_type=specimen_type,
+                    mask_parameters=mask_parameters,
+                    evaluate_parameters=evaluate_parameters,
+                )
+
+                if manifest.is_done(nodemap_name, entry.path, parameter_hash):
+                    collect(*manifest.get_results(nodemap_name))
+                elif executor is None:
+                    try:
+                        results = process_nodemap(**task)
+                    except Exception:
+                        fail(nodemap_name)
+                        continue
+                    manifest.add(nodemap_name, entry.path, parameter_hash, *results)
+                    collect(*results)
+                else:
+                    future = executor.submit(process_nodemap, **task)
+                    future_to_task[future] = (nodemap_name, entry.path, parameter_hash)
+
+            if future_to_task:
+                # returns as soon as a stage is done, at the latest after one poll interval
+                done, _ = wait(
+                    future_to_task, timeout=poll_interval, return_when=FIRST_COMPLETED
+                )
+                for future in done:
+                    nodemap_name, data_file, parameter_hash = future_to_task.pop(future)
+                    last_activity = time.monotonic()
+                    try:
+                        results = future.result()
+                    except Exception:
+                        fail(nodemap_name)
+                        continue
+                    manifest.add(nodemap_name, data_file, parameter_hash, *results)
+                    collect(*results)
+            else:
+                if (
+                    idle_timeout is not None
+                    and time.monotonic() - last_activity > idle_timeout
+                ):
+                    break
+                time.sleep(poll_interval)
+
+    except KeyboardInterrupt:
+        print("Stopped.")
+
+    finally:
+        if executor is not None:
+            for future in wait(future_to_task).done:
+                nodemap_name, data_file, parameter_hash = future_to_task[future]
+                try:
+                    results = future.result()
+                except Exception:
+                    fail(nodemap_name)
+                    continue
+                manifest.add(nodemap_name, data_file, parameter_hash, *results)
+                collect(*results)
+            executor.shutdown()
+        manifest.close()
+        sink.close()
+
+        pickle_output(
+            specimen_name=specimen_name,
+            side=side,
+            result_path=paths.output_path_pickle,
+            which={f"{specimen_name}_{side}": sum_nodemaps_to_results},
+        )
+        print(
+            f"Processed {len(sum_nodemaps_to_results)} nodemaps of {specimen_name}_{side}."
+        )
+
+    return sum_nodemaps_to_results
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import pickle
+
+
+class Result_Manifest:
+    def __init__(self, manifest_file: str = None):
+        """
+        Record of the processed nodemaps of a campaign for incremental processing. Every processed nodemap is
+        appended to the manifest file together with its results, the modification time, size and content hash of the
+        nodemap file and a hash of the analysis parameters. A nodemap is done if the parameters are unchanged and the
+        file is unchanged - checked by modification time and size first and by the content hash only if those differ.
+        Since every record is written as soon as the nodemap is processed, a crashed run resumes where it stopped.
+        Records superseded by a later record of the same nodemap are removed when the manifest is read or closed.
+
+        Parameters
+        ----------
+        manifest_file : str
+                path of the manifest. Created if it does not exist.
+
+        """
+
+        self.manifest_file = manifest_file
+        self.nodemap_to_record = {}
+        self.num_records = 0
+        self.file = None
+        self._read()
+        self.compact()
+
+    @staticmethod
+    def hash_parameters(**parameters):
+        """
+        Hash of the analysis parameters, e.g. crack tip position, mask and evaluation parameters.
+        """
+
+        return hashlib.sha1(
+            json.dumps(parameters, sort_keys=True, default=str).encode()
+        ).hexdigest()
+
+    @staticmethod
+    def hash_file(data_file: str):
+        """
+        Hash of the content of the given file.
+        """
+
+        sha = hashlib.sha1()
+        with open(data_file, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                sha.update(block)
+        return sha.hexdigest()
+
+    @staticmethod
+    def _stamp(data_file: str):
+        stat = os.stat(data_file)
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def _read(self):
+        if not os.path.exists(self.manifest_file):
+            return
+
+        with open(self.manifest_file, "rb") as handle:
+            valid_size = 0
+            while True:
+                try:
+                    record = pickle.load(handle)
+                except EOFError:
+                    break
+                except (pickle.UnpicklingError, ValueError, TypeError, AttributeError):
+                    # last record was cut off by a crash
+                    break
+                self.nodemap_to_record[record["nodemap"]] = record
+                self.num_records += 1
+                valid_size = handle.tell()
+
+        if valid_size < os.path.getsize(self.manifest_file):
+            with open(self.manifest_file, "r+b") as handle:
+                handle.truncate(valid_size)
+
+    def is_done(self, nodemap_name: str, data_file: str, parameter_hash: str):
+        """
+        Check whether the nodemap was processed with the same parameters and is unchanged since.
+
+        Parameters
+        ----------
+        nodemap_name : str
+                self-explaining
+        data_file : str
+                path of the nodemap file
+        parameter_hash : str
+                see hash_parameters
+
+        Returns
+        ----------
+        is_done : bool
+            True if the results of the manifest are valid
+
+        """
+
+        record = self.nodemap_to_record.get(nodemap_name)
+        if record is None or record["parameters"] != parameter_hash:
+            return False
+        if not os.path.exists(data_file):
+            return False
+        stamp = self._stamp(data_file)
+        if record["stamp"] == stamp:
+            return True
+        if record["content_hash"] != self.hash_file(data_file):
+            return False
+        # e.g. copied or touched - record the new stamp, so the file is not hashed again on the next run
+        self._append({**record, "stamp": stamp})
+        return True
+
+    def get_results(self, nodemap_name: str):
+        """
+        Results of a processed nodemap as returned by batch.process_nodemap.
+        """
+
+        record = self.nodemap_to_record[nodemap_name]
+        return record["nodemap_to_results"], record["res_dict"]
+
+    def add(
+        self,
+        nodemap_name: str,
+        data_file: str,
+        parameter_hash: str,
+        nodemap_to_results: dict = None,
+        res_dict: dict = None,
+    ):
+        """
+        Append a processed nodemap to the manifest.
+
+        Parameters
+        ----------
+        nodemap_name : str
+                self-explaining
+        data_file : str
+                path of the nodemap file
+        parameter_hash : str
+                see hash_parameters
+        nodemap_to_results, res_dict : dict
+                results as returned by batch.process_nodemap
+
+        """
+
+        self._append(
+            {
+                "nodemap": nodemap_name,
+                "stamp": self._stamp(data_file),
+                "content_hash": self.hash_file(data_file),
+                "parameters": parameter_hash,
+                "nodemap_to_results": nodemap_to_results,
+                "res_dict": res_dict,
+            }
+        )
+
+    def _append(self, record: dict):
+        if self.file is None:
+            self.file = open(self.manifest_file, "ab")
+        pickle.dump(record, self.file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.file.flush()
+        self.nodemap_to_record[record["nodemap"]] = record
+        self.num_records += 1
+
+    def compact(self):
+        """
+        Rewrite the manifest with the latest record of every nodemap, if it contains superseded records. The file is
+        replaced atomically, so a crash leaves either the old or the compacted manifest.
+        """
+
+        if self.num_records == len(self.nodemap_to_record):
+            return
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        temporary_file = f"{self.manifest_file}.tmp"
+        with open(temporary_file, "wb") as handle:
+            for record in self.nodemap_to_record.values():
+                pickle.dump(record, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file, self.manifest_file)
+        self.num_records = len(self.nodemap_to_record)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+        self.compact()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
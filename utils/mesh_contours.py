@@ -0,0 +1,121 @@
+import numpy as np
+
+
+def find_iso_lines(
+    triangles: np.ndarray,
+    x_coordinates: np.ndarray,
+    y_coordinates: np.ndarray,
+    values: np.ndarray,
+    level: float = 0.0,
+):
+    """
+    Iso-lines of nodal values on a triangulation (marching triangles). The values are linear within each triangle,
+    so the iso-line crosses each triangle edge with nodes on different sides of the level at most once. Only the
+    triangles crossed by the iso-line are visited, so the cost scales with the number of nodes and not with the area
+    of the specimen.
+
+    Parameters
+    ----------
+    triangles : arr (m, 3)
+            node indices of the triangles, e.g. scipy.spatial.Delaunay.simplices
+    x_coordinates, y_coordinates : arr (n,)
+            node coordinates
+    values : arr (n,)
+            nodal values
+    level : float, default = 0.0
+            value of the iso-line
+
+    Returns
+    ----------
+    iso_lines : list [arr (k, 2)]
+        polylines (x, y) of the iso-line. Closed polylines do not repeat the first point, polylines ending at the
+        boundary of the triangulation are open and are treated as closed along the boundary by polygon_properties.
+
+    """
+
+    above = values > level
+    count = above[triangles].sum(axis=1)
+    triangles = triangles[(count == 1) | (count == 2)]
+    if len(triangles) == 0:
+        return []
+
+    # exactly two edges of each remaining triangle cross the level
+    edges = np.stack(
+        (triangles[:, [0, 1]], triangles[:, [1, 2]], triangles[:, [2, 0]]), axis=1
+    )
+    crossing = above[edges[..., 0]] != above[edges[..., 1]]
+    edges = np.sort(edges[crossing].reshape(-1, 2, 2), axis=2)
+
+    # one point per crossed edge, shared by the two neighbouring triangles
+    edge_keys = edges[..., 0].astype(np.int64) * len(values) + edges[..., 1]
+    edge_keys, segments = np.unique(edge_keys, return_inverse=True)
+    segments = segments.reshape(-1, 2)
+    start, end = edge_keys // len(values), edge_keys % len(values)
+    t = (level - values[start]) / (values[end] - values[start])
+    points = np.column_stack(
+        (
+            x_coordinates[start] + t * (x_coordinates[end] - x_coordinates[start]),
+            y_coordinates[start] + t * (y_coordinates[end] - y_coordinates[start]),
+        )
+    )
+
+    # link the segments to polylines - every point belongs to two segments, or one at the boundary
+    point_to_segments = [[] for _ in range(len(points))]
+    for segment, (a, b) in enumerate(segments.tolist()):
+        point_to_segments[a].append(segment)
+        point_to_segments[b].append(segment)
+    visited = np.zeros(len(segments), dtype=bool)
+
+    boundary_points = [p for p, s in enumerate(point_to_segments) if len(s) == 1]
+    iso_lines = []
+    for first_point in boundary_points + list(range(len(points))):
+        polyline = [first_point]
+        point = first_point
+        while True:
+            open_segments = [s for s in point_to_segments[point] if not visited[s]]
+            if not open_segments:
+                break
+            segment = open_segments[0]
+            visited[segment] = True
+            a, b = segments[segment]
+            point = b if a == point else a
+            polyline.append(point)
+        if len(polyline) > 1:
+            if polyline[-1] == polyline[0]:
+                polyline = polyline[:-1]
+            iso_lines.append(points[polyline])
+    return iso_lines
+
+
+def polygon_properties(polygon: np.ndarray):
+    """
+    Area, perimeter and centroid of a closed polygon (shoelace formula).
+
+    Parameters
+    ----------
+    polygon : arr (k, 2)
+            vertices (x, y), the last vertex is connected to the first
+
+    Returns
+    ----------
+    area : float
+        enclosed area, independent of the orientation
+    perimeter : float
+        length of the closed polygon
+    centroid : tuple (float, float)
+        center of gravity of the enclosed area, mean of the vertices for degenerate polygons
+
+    """
+
+    x, y = polygon[:, 0], polygon[:, 1]
+    x_next, y_next = np.roll(x, -1), np.roll(y, -1)
+    cross = x * y_next - x_next * y
+    signed_area = cross.sum() / 2
+    perimeter = np.hypot(x_next - x, y_next - y).sum()
+    if signed_area == 0:
+        return 0.0, perimeter, (x.mean(), y.mean())
+    centroid = (
+        ((x + x_next) * cross).sum() / (6 * signed_area),
+        ((y + y_next) * cross).sum() / (6 * signed_area),
+    )
+    return abs(signed_area), perimeter, centroid
@@ -0,0 +1,237 @@
+import hashlib
+import json
+import os
+
+from crackpy.structure_elements.data_files import Nodemap
+from crackpy.fracture_analysis.data_processing import InputData
+import numpy as np
+
+NODEMAP_COLUMNS = [
+    "facet_id",
+    "coor_x",
+    "coor_y",
+    "coor_z",
+    "disp_x",
+    "disp_y",
+    "disp_z",
+    "eps_x",
+    "eps_y",
+    "eps_xy",
+    "eps_vm",
+    "sig_x",
+    "sig_y",
+    "sig_xy",
+    "sig_vm",
+]
+
+
+class Cached_Nodemap:
+    def __init__(self, data_file: str, column_to_array: dict, meta: dict):
+        """
+        Stand-in for crackpy's InputData holding the nodemap columns and metadata read from the cache. The columns are
+        read-only memory maps of the cache file.
+
+        Parameters
+        ----------
+        data_file : str
+                path of the source nodemap
+        column_to_array : dict [column]: arr
+                nodemap columns, e.g. coor_x or eps_vm
+        meta : dict [attribute]: float
+                metadata parsed from the nodemap header
+
+        """
+
+        self.data_file = data_file
+        for column in NODEMAP_COLUMNS:
+            setattr(self, column, column_to_array.get(column))
+        for attribute, value in meta.items():
+            setattr(self, attribute, value)
+
+
+class Nodemap_Cache:
+    def __init__(self, cache_path: str = None):
+        """
+        Cache of parsed text nodemaps. On first read, the nodemap is parsed with crackpy and its columns are stored as
+        a single .npy file together with the metadata header in a .json file. Later reads memory-map the .npy file
+        instead of parsing the text file again. An entry is valid as long as modification time and size of the source
+        file are unchanged.
+
+        Parameters
+        ----------
+        cache_path : str, default = None
+                folder of the cache. If None, the cache is stored in the subfolder ".nodemap_cache" of each nodemap
+                folder.
+
+        """
+
+        self.cache_path = cache_path
+
+    def entry_path(self, data_file: str):
+        """
+        Folder of the cache entry for the given nodemap file - keyed by the absolute source path.
+        """
+
+        data_file = os.path.abspath(data_file)
+        cache_path = self.cache_path or os.path.join(
+            os.path.dirname(data_file), ".nodemap_cache"
+        )
+        source_hash = hashlib.sha1(data_file.encode()).hexdigest()[:12]
+        return os.path.join(cache_path, f"{os.path.basename(data_file)}_{source_hash}")
+
+    @staticmethod
+    def _source_stamp(data_file: str):
+        stat = os.stat(data_file)
+        return {
+            "source": os.path.abspath(data_file),
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+        }
+
+    def _read_entry(self, data_file: str):
+        entry_path = self.entry_path(data_file)
+        try:
+            with open(os.path.join(entry_path, "meta.json"), "r") as meta_file:
+                entry = json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+        if entry.get("stamp") != self._source_stamp(data_file):
+            return None
+        return entry
+
+    def _write_entry(self, data_file: str, nodemap_file, meta: dict):
+        entry_path = self.entry_path(data_file)
+        os.makedirs(entry_path, exist_ok=True)
+
+        columns = [
+            column
+            for column in NODEMAP_COLUMNS
+            if getattr(nodemap_file, column, None) is not None
+            and len(getattr(nodemap_file, column)) > 0
+        ]
+        data = np.vstack(
+            [np.asarray(getattr(nodemap_file, column)) for column in columns]
+        )
+
+        # write to temporary files first, so concurrent readers never see a partly written entry
+        tmp_file = os.path.join(entry_path, f"data.npy.{os.getpid()}.tmp")
+        with open(tmp_file, "wb") as data_file_handle:
+            np.save(data_file_handle, data)
+        os.replace(tmp_file, os.path.join(entry_path, "data.npy"))
+        entry = {
+            "stamp": self._source_stamp(data_file),
+            "columns": columns,
+            "meta": meta,
+        }
+        self._write_meta(entry_path, entry)
+        return entry
+
+    @staticmethod
+    def _write_meta(entry_path: str, entry: dict):
+        tmp_file = os.path.join(entry_path, f"meta.json.{os.getpid()}.tmp")
+        with open(tmp_file, "w") as meta_file:
+            json.dump(entry, meta_file, indent=1)
+        os.replace(tmp_file, os.path.join(entry_path, "meta.json"))
+
+    @staticmethod
+    def _meta_attributes(meta_keywords: dict = None):
+        meta_attributes = list(InputData().meta_attributes)
+        if meta_keywords is not None:
+            meta_attributes += [k for k in meta_keywords if k not in meta_attributes]
+        return meta_attributes
+
+    def load(
+        self, nodemap_name: str = None, nodemap_path: str = None, meta_keywords=None
+    ):
+        """
+        Load a nodemap from the cache or parse and cache it.
+
+        Parameters
+        ----------
+        nodemap_name : str
+                self-explaining
+        nodemap_path : str
+                folder containing the nodemap
+        meta_keywords : dict, default = None
+                metadata keywords passed to crackpy's InputData
+
+        Returns
+        ----------
+        nodemap_file : Cached_Nodemap
+            nodemap columns and metadata, same attributes as crackpy's InputData
+
+        """
+
+        data_file = os.path.join(nodemap_path, nodemap_name)
+        meta_attributes = self._meta_attributes(meta_keywords)
+        entry = self._read_entry(data_file)
+
+        if entry is None:
+            # InputData reads either the given keywords or its default attributes. It consumes the given dict, so
+            # pass a copy.
+            read_attributes = (
+                list(meta_keywords)
+                if meta_keywords is not None
+                else InputData().meta_attributes
+            )
+            nodemap_file = InputData(
+                Nodemap(name=nodemap_name, folder=nodemap_path),
+                meta_keywords=(
+                    dict(meta_keywords) if meta_keywords is not None else None
+                ),
+            )
+            meta = {k: getattr(nodemap_file, k, None) for k in read_attributes}
+            entry = self._write_entry(data_file, nodemap_file, meta)
+
+        elif any(k not in entry["meta"] for k in meta_attributes):
+            # header was cached with other keywords - reading the header alone is cheap
+            header = InputData()
+            header.set_data_file(data_file)
+            missing = {
+                k: (meta_keywords or {}).get(k, k)
+                for k in meta_attributes
+                if k not in entry["meta"]
+            }
+            for k in missing:
+                setattr(header, k, None)
+            header.read_header(meta_attributes_to_keywords=dict(missing))
+            entry["meta"].update({k: getattr(header, k) for k in missing})
+            self._write_meta(self.entry_path(data_file), entry)
+
+        data = np.load(
+            os.path.join(self.entry_path(data_file), "data.npy"), mmap_mode="r"
+        )
+        column_to_array = {
+            column: data[idx] for idx, column in enumerate(entry["columns"])
+        }
+        return Cached_Nodemap(
+            data_file=data_file, column_to_array=column_to_array, meta=entry["meta"]
+        )
+
+
+def convert_nodemaps(
+    nodemap_path: str = None, cache_path: str = None, meta_keywords: dict = None
+):
+    """
+    Convert all text nodemaps within a folder into the binary nodemap cache.
+
+    Parameters
+    ----------
+    nodemap_path : str
+            folder containing the nodemaps
+    cache_path : str, default = None
+            see Nodemap_Cache
+    meta_keywords : dict, default = None
+            metadata keywords passed to crackpy's InputData
+
+    """
+
+    nodemap_cache = Nodemap_Cache(cache_path=cache_path)
+    for nodemap_name in sorted(os.listdir(nodemap_path)):
+        if nodemap_name.endswith(".txt"):
+            nodemap_cache.load(
+                nodemap_name=nodemap_name,
+                nodemap_path=nodemap_path,
+                meta_keywords=meta_keywords,
+            )
+            print(f"Cached {nodemap_name}")
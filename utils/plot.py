@@ -1,37 +1,236 @@
 import numpy as np
+import matplotlib
+
+# figures are only saved - non-interactive backend, no display needed
+matplotlib.use("Agg")
+
 import matplotlib.pyplot as plt
 import os
 import seaborn as sns
-import cv2
 from mpl_toolkits.axes_grid1 import make_axes_locatable
-from matplotlib import pyplot as plt, cm
-from matplotlib import tri
+from matplotlib import pyplot as plt, cm, tri
 from matplotlib.colors import ListedColormap
 
 from utils.data_processing import Data_Processing
 
+extreme_points = ["Ext_Bottom", "Ext_Top", "Ext_Left", "Ext_Right"]
+
+
+def plot_window(contours: dict = None, window_x: tuple = None, window_y: tuple = None):
+    """Bounds (x_min, x_max, y_min, y_max) in mm of the nodemap plots of all given contours, see
+    Plotter.plot_contour_on_nodemap. None if no window is given, the whole nodemap is drawn then.
+    """
+
+    if window_x is None or window_y is None or not contours:
+        return None
+    return (
+        min(results["Ext_Left"][0] for results in contours.values()) - window_x[0],
+        max(results["Ext_Right"][0] for results in contours.values()) + window_x[1],
+        min(results["Ext_Bottom"][1] for results in contours.values()) - window_y[1],
+        max(results["Ext_Top"][1] for results in contours.values()) + window_y[0],
+    )
+
+
+def window_triangulation(
+    triangulation: tri.Triangulation, x_lim: tuple = None, y_lim: tuple = None
+):
+    """Triangulation with all triangles outside the window masked, so tricontourf only draws the triangles within
+    the window. Points and triangles are shared with the given triangulation, e.g. the cached triangulation of the
+    nodemap, which is not modified.
+
+    Parameters
+    ----------
+    triangulation : matplotlib.tri.Triangulation
+            triangulation of the nodes
+    x_lim, y_lim : tuple (float, float)
+            window in mm. A triangle is kept if it overlaps the window.
+
+    Returns
+    ----------
+    triangulation : matplotlib.tri.Triangulation
+        masked triangulation
+
+    """
+
+    x_nodes = triangulation.x[triangulation.triangles]
+    y_nodes = triangulation.y[triangulation.triangles]
+    in_window = (
+        (x_nodes.max(axis=1) >= x_lim[0])
+        & (x_nodes.min(axis=1) <= x_lim[1])
+        & (y_nodes.max(axis=1) >= y_lim[0])
+        & (y_nodes.min(axis=1) <= y_lim[1])
+    )
+    return tri.Triangulation(
+        triangulation.x,
+        triangulation.y,
+        triangles=triangulation.triangles,
+        mask=~in_window,
+    )
+
+
+def render_background(
+    Result: Data_Processing,
+    contours: dict = None,
+    window_x: tuple = None,
+    window_y: tuple = None,
+    background_step: float = 0.05,
+    max_points: int = 1 << 20,
+):
+    """Strain field of an analyzed nodemap on a regular grid, cropped to the window of the nodemap plots - the
+    background of deferred plots, see render_payload. The interpolation weights are not cached, see
+    Triangulation_Cache.interpolate_tiled, so the background does not fill the cache of the analysis.
+
+    Parameters
+    ----------
+    Result : Data_Processing
+            analyzed nodemap, before release
+    contours : dict [str]: dict
+            contours of the payload, see render_payload
+    window_x, window_y : tuple (float, float), default = None
+            window around the extreme points of the contours, see Plotter.plot_contour_on_nodemap. If None, the whole
+            nodemap is kept.
+    background_step : float, default = 0.05
+            spacing in mm of the regular grid the strain field is interpolated to
+    max_points : int, default = 2**20
+            maximum number of grid points. The spacing is widened for larger windows, e.g. the whole nodemap.
+
+    Returns
+    ----------
+    background : tuple (arr, arr, arr) or None
+        x_int, y_int and the strain field in % as float32. None if no contour is given.
+
+    """
+
+    if not contours:
+        return None
+    x_coordinates = Result.nodemap_file.coor_x
+    y_coordinates = Result.nodemap_file.coor_y
+    x_min, x_max = x_coordinates.min(), x_coordinates.max()
+    y_min, y_max = y_coordinates.min(), y_coordinates.max()
+    window = plot_window(contours, window_x, window_y)
+    if window is not None:
+        # one grid point beyond the window, so the strain field covers the whole plot
+        x_min = max(x_min, window[0] - background_step)
+        x_max = min(x_max, window[1] + background_step)
+        y_min = max(y_min, window[2] - background_step)
+        y_max = min(y_max, window[3] + background_step)
+    step = max(background_step, np.sqrt((x_max - x_min) * (y_max - y_min) / max_points))
+    x_int = np.arange(x_min, x_max, step)
+    y_int = np.arange(y_min, y_max, step)
+    strains = Result.triangulation_cache.interpolate_tiled(
+        x_coordinates,
+        y_coordinates,
+        Result.nodemap_file.eps_vm * 100,
+        x_int,
+        y_int,
+        out=np.empty((len(y_int), len(x_int)), dtype=np.float32),
+    )
+    return x_int.astype(np.float32), y_int.astype(np.float32), strains
+
+
+def render_payload(
+    Result: Data_Processing,
+    which_contours=None,
+    plot_nodemap_parameters: dict = None,
+    background_step: float = 0.05,
+):
+    """Everything the Plotter needs from an analyzed nodemap - contours, extreme points, crack tip and a downsampled
+    strain field - as plain arrays. The payload is small and can be pickled, so the figures can be drawn later or in
+    another process while the analysis itself is released.
+
+    Parameters
+    ----------
+    Result : Data_Processing
+            analyzed nodemap, after evaluate_contours
+    which_contours : list [str]
+            contours to be plotted. Can only be "Whole", "Upper" or "Lower"
+    plot_nodemap_parameters : dict, default = None
+            parameters of Plotter.plot_contour_on_nodemap. The strain field is only gridded if given, cropped to
+            window_x and window_y, see render_background. Plots drawn directly from the analysis do not need it.
+    background_step : float, default = 0.05
+            see render_background
+
+    Returns
+    ----------
+    payload : dict
+        see Plotter
+
+    """
+
+    if which_contours is None:
+        which_contours = ["Whole"]
+
+    nodemap_name = Result.nodemap_name
+    if Result.specimen_type == "MT":
+        nodemap_name = f"{Result.nodemap_folder_id}_{Result.nodemap_name}"
+
+    key_to_results = (
+        Result.nodemap_to_results.get(nodemap_name, {})
+        if np.any(Result.is_contour_detected)
+        else {}
+    )
+    contours = {}
+    for item in which_contours:
+        if item not in key_to_results:
+            continue
+        x_coords, y_coords = key_to_results[item]["Largest contour [mm]"]
+        contours[item] = {
+            "Largest contour [mm]": (
+                np.asarray(x_coords, dtype=np.float32),
+                np.asarray(y_coords, dtype=np.float32),
+            )
+        }
+        contours[item].update(
+            {ext: tuple(key_to_results[item][ext]) for ext in extreme_points}
+        )
+
+    background = None
+    if plot_nodemap_parameters is not None:
+        background = render_background(
+            Result,
+            contours,
+            window_x=plot_nodemap_parameters.get("window_x"),
+            window_y=plot_nodemap_parameters.get("window_y"),
+            background_step=background_step,
+        )
+
+    return {
+        "nodemap_name": nodemap_name,
+        "crack_tip": (Result.crack_tip_x, Result.crack_tip_y),
+        "output_path_contours": Result.output_path_contours,
+        "output_path_nodemaps": Result.output_path_nodemaps,
+        "contours": contours,
+        "background": background,
+    }
+
 
 class Plotter:
-    def __init__(self, Result: Data_Processing, which_contours=None):
+    def __init__(
+        self, Result: Data_Processing = None, which_contours=None, payload: dict = None
+    ):
         """Plotter - self explaining .
 
         Parameters
         ----------
+        Result : Data_Processing, default = None
+                analyzed nodemap. Only needed if no payload is given.
         which_contours : list [str]
                 list of contours to be evaluated. Can only be "Whole", "Upper" or "Lower"
-
-        plot_nodemap : bool, default = True
-                plot the nodemap underneath
-        plot_extreme_points : bool, default = True
-                plot the detected extreme points
+        payload : dict, default = None
+                see render_payload. Plots from the payload instead of the analysis, e.g. in a separate process.
+                If no payload is given, the nodemap is drawn on the cached triangulation of the analysis.
 
         """
 
         if which_contours is None:
             which_contours = ["Whole"]
-        self.list_of_contours = which_contours
+        if payload is None:
+            payload = render_payload(Result, which_contours=which_contours)
+        self.list_of_contours = [
+            item for item in which_contours if item in payload["contours"]
+        ]
+        self.payload = payload
         self.analysis = Result
-        # self.plot_nodemap = plot_nodemap
 
     def plot_contour(
         self,
@@ -39,6 +238,8 @@ class Plotter:
         plot_extreme_points: True = bool,
         window_x: tuple = (3, 3),
         window_y: tuple = (3, 3),
+        dpi: int = 300,
+        file_format: str = "png",
     ):
         """Plotter - self explaining .
 
@@ -54,21 +255,22 @@ class Plotter:
             window around left and right extreme x coordinates to set plot x_lim around
         window_y : tuple (float, float)
             window around top and bottom extreme y coordinates to set plot y_lim around
+        dpi : int, default = 300
+            resolution of the saved figure
+        file_format : str, default = "png"
+            format of the saved figure, e.g. "png", "jpg" or "pdf"
         """
 
         colorpalette = sns.color_palette("colorblind")
+        nodemap_name = self.payload["nodemap_name"]
 
-        if self.analysis.specimen_type == "MT":
-            self.analysis.nodemap_name = (
-                f"{self.analysis.nodemap_folder_id}_{self.analysis.nodemap_name}"
-            )
-
-        if np.any(self.analysis.is_contour_detected):
+        if self.list_of_contours:
 
             self.plot_contour = plot_contour
             self.plot_extreme_points = plot_extreme_points
 
             for item in self.list_of_contours:
+                results = self.payload["contours"][item]
                 fig, axs = plt.subplots(
                     1,
                     1,
@@ -80,101 +282,74 @@ class Plotter:
                 )
 
                 if np.any(plot_contour):
-                    empty_image = np.zeros(
-                        self.analysis.griddata[0].shape, dtype=np.uint8
+                    # the contour in mm as a single closed polyline
+                    x_coords, y_coords = results["Largest contour [mm]"]
+                    axs.plot(
+                        np.append(x_coords, x_coords[:1]),
+                        np.append(y_coords, y_coords[:1]),
+                        color="k",
+                        linewidth=1.5,
                     )
-                    empty_image.fill(255)
-
-                    contour_to_plot = self.analysis.nodemap_to_results[
-                        self.analysis.nodemap_name
-                    ][item]["Largest Contour [px]"]
-                    img_contour = cv2.drawContours(
-                        empty_image, contour_to_plot, -1, (0, 255, 255), 6
-                    )
-                    axs.imshow(
-                        np.flipud(img_contour),
-                        extent=[
-                            self.analysis.nodemap_file.coor_x.min(),
-                            self.analysis.nodemap_file.coor_x.max(),
-                            self.analysis.nodemap_file.coor_y.min(),
-                            self.analysis.nodemap_file.coor_y.max(),
-                        ],
-                        cmap="gray",
-                    )
-                    sns.scatterplot(
-                        x=[self.analysis.crack_tip_x],
-                        y=[self.analysis.crack_tip_y],
+                    axs.scatter(
+                        [self.payload["crack_tip"][0]],
+                        [self.payload["crack_tip"][1]],
                         marker="X",
-                        ax=axs,
                         zorder=1,
-                        label='Crack Tip'
+                        label="Crack Tip",
                     )
 
                 if np.any(plot_extreme_points):
-                    for idx, ext in enumerate(
-                        ["Ext_Bottom", "Ext_Top", "Ext_Left", "Ext_Right"]
-                    ):
-                        x_coords, y_coords = self.analysis.nodemap_to_results[
-                            self.analysis.nodemap_name
-                        ][item][ext]
-                        sns.scatterplot(
-                            x=[x_coords],
-                            y=[y_coords],
+                    for idx, ext in enumerate(extreme_points):
+                        x_coords, y_coords = results[ext]
+                        axs.scatter(
+                            [x_coords],
+                            [y_coords],
                             color=colorpalette[idx],
-                            ax=axs,
                             edgecolor="k",
                             zorder=2,
-                            label=ext
+                            label=ext,
                         )
 
                 axs.set_xlim(
-                    self.analysis.nodemap_to_results[self.analysis.nodemap_name][item][
-                        "Ext_Left"
-                    ][0]
-                    - window_x[0],
-                    self.analysis.nodemap_to_results[self.analysis.nodemap_name][item][
-                        "Ext_Right"
-                    ][0]
-                    + window_x[1],
+                    results["Ext_Left"][0] - window_x[0],
+                    results["Ext_Right"][0] + window_x[1],
                 )
                 axs.set_ylim(
-                    self.analysis.nodemap_to_results[self.analysis.nodemap_name][item][
-                        "Ext_Top"
-                    ][1]
-                    - window_y[0],
-                    self.analysis.nodemap_to_results[self.analysis.nodemap_name][item][
-                        "Ext_Bottom"
-                    ][1]
-                    + window_y[1],
+                    results["Ext_Top"][1] - window_y[0],
+                    results["Ext_Bottom"][1] + window_y[1],
                 )
                 axs.set_xlabel(r"$\it x$ [mm]")
                 axs.set_ylabel(r"$\it y$ [mm]")
 
                 handles, labels = axs.get_legend_handles_labels()
-                axs.legend(handles, labels, bbox_to_anchor=(0, 1.02, 1, 0.2), loc="lower left",
-                                 mode="expand", borderaxespad=0, ncol=2)
+                axs.legend(
+                    handles,
+                    labels,
+                    bbox_to_anchor=(0, 1.02, 1, 0.2),
+                    loc="lower left",
+                    mode="expand",
+                    borderaxespad=0,
+                    ncol=2,
+                )
 
                 plt.tight_layout()
 
-                output_name = f"{self.analysis.nodemap_name}.png"
+                output_name = f"{nodemap_name}.{file_format}"
+                output_path = os.path.join(
+                    self.payload["output_path_contours"], f"{item}"
+                )
 
-                if not os.path.exists(
-                    os.path.join(self.analysis.output_path_contours, f"{item}")
-                ):
-                    os.mkdir(
-                        os.path.join(self.analysis.output_path_contours, f"{item}")
-                    )
+                if not os.path.exists(output_path):
+                    os.mkdir(output_path)
 
-                save = os.path.join(
-                    self.analysis.output_path_contours, f"{item}", output_name
-                )
-                plt.savefig(save, dpi=300, bbox_inches="tight")
+                save = os.path.join(output_path, output_name)
+                plt.savefig(save, dpi=dpi, bbox_inches="tight")
                 plt.clf()
                 plt.close()
-                print(f"Plotted contour for {self.analysis.nodemap_name}.")
+                print(f"Plotted contour for {nodemap_name}.")
 
         else:
-            print(f"No contour plotted for {self.analysis.nodemap_name}.")
+            print(f"No contour plotted for {nodemap_name}.")
 
     def plot_contour_on_nodemap(
         self,
@@ -182,11 +357,45 @@ class Plotter:
         num_colors: int = 120,
         num_colorbars: int = 10,
         colormap: str = "viridis",
+        window_x: tuple = None,
+        window_y: tuple = None,
+        dpi: int = 300,
+        file_format: str = "png",
     ):
+        """Plot the contour on the strain field of the nodemap.
+
+        Parameters
+        ----------
+        strain_treshold : float, default = 0.68
+                upper limit of the color scale
+        num_colors, num_colorbars : int
+                number of color levels and of colorbar ticks
+        colormap : str, default = "viridis"
+                matplotlib colormap
+        window_x, window_y : tuple (float, float), default = None
+                window around the extreme points of the contour, see plot_contour. Only the triangles, or the grid
+                points of the payload, within the window are drawn. If None, the whole strain field is drawn.
+        dpi : int, default = 300
+                resolution of the saved figure
+        file_format : str, default = "png"
+                format of the saved figure
+        """
 
-        if np.any(self.analysis.is_contour_detected):
+        nodemap_name = self.payload["nodemap_name"]
+
+        if self.list_of_contours:
+
+            background = self.payload["background"]
+            if background is None:
+                # drawn directly from the analysis on the cached triangulation of the nodes
+                triangulation = self.analysis.triangulation_cache.get_triangulation(
+                    self.analysis.nodemap_file.coor_x,
+                    self.analysis.nodemap_file.coor_y,
+                )
+                strains = self.analysis.nodemap_file.eps_vm * 100
 
             for item in self.list_of_contours:
+                results = self.payload["contours"][item]
                 fig, axs = plt.subplots(
                     1,
                     1,
@@ -211,31 +420,63 @@ class Plotter:
 
                 # plot nodemap
 
-                triangulation = tri.Triangulation(
-                    x=self.analysis.nodemap_file.coor_x,
-                    y=self.analysis.nodemap_file.coor_y,
-                )
-                plot = axs.tricontourf(
-                    triangulation,
-                    (self.analysis.nodemap_file.eps_vm * 100),
-                    contour_vector,
-                    extend="max",
-                    cmap=cmap_list,
-                )
+                x_lim, y_lim = None, None
+                if window_x is not None and window_y is not None:
+                    x_lim = (
+                        results["Ext_Left"][0] - window_x[0],
+                        results["Ext_Right"][0] + window_x[1],
+                    )
+                    y_lim = (
+                        results["Ext_Bottom"][1] - window_y[1],
+                        results["Ext_Top"][1] + window_y[0],
+                    )
+                    axs.set_xlim(*x_lim)
+                    axs.set_ylim(*y_lim)
+
+                if background is None:
+                    plot = axs.tricontourf(
+                        (
+                            window_triangulation(triangulation, x_lim, y_lim)
+                            if x_lim is not None
+                            else triangulation
+                        ),
+                        strains,
+                        contour_vector,
+                        extend="max",
+                        cmap=cmap_list,
+                    )
+                else:
+                    x_int, y_int, grid_strains = background
+                    if x_lim is not None:
+                        # only draw the grid points within the window
+                        columns = slice(
+                            max(np.searchsorted(x_int, x_lim[0]) - 1, 0),
+                            np.searchsorted(x_int, x_lim[1]) + 1,
+                        )
+                        rows = slice(
+                            max(np.searchsorted(y_int, y_lim[0]) - 1, 0),
+                            np.searchsorted(y_int, y_lim[1]) + 1,
+                        )
+                        x_int, y_int = x_int[columns], y_int[rows]
+                        grid_strains = grid_strains[rows, columns]
+                    plot = axs.contourf(
+                        x_int,
+                        y_int,
+                        grid_strains,
+                        contour_vector,
+                        extend="max",
+                        cmap=cmap_list,
+                    )
 
                 # add contour
 
-                contour_to_plot = self.analysis.nodemap_to_results[
-                    self.analysis.nodemap_name
-                ][item]["Largest contour [mm]"]
+                contour_to_plot = results["Largest contour [mm]"]
 
-                sns.scatterplot(
-                    x=contour_to_plot[0],
-                    y=contour_to_plot[1],
-                    s=1,
+                axs.plot(
+                    np.append(contour_to_plot[0], contour_to_plot[0][:1]),
+                    np.append(contour_to_plot[1], contour_to_plot[1][:1]),
                     color="k",
-                    ax=axs,
-                    edgecolor=None,
+                    linewidth=0.8,
                 )
 
                 divider = make_axes_locatable(axs)
@@ -257,22 +498,19 @@ class Plotter:
                 axs.set_aspect("equal")
                 plt.tight_layout()
 
-                output_name = f"{self.analysis.nodemap_name}.png"
+                output_name = f"{nodemap_name}.{file_format}"
+                output_path = os.path.join(
+                    self.payload["output_path_nodemaps"], f"{item}"
+                )
 
-                if not os.path.exists(
-                    os.path.join(self.analysis.output_path_nodemaps, f"{item}")
-                ):
-                    os.mkdir(
-                        os.path.join(self.analysis.output_path_nodemaps, f"{item}")
-                    )
+                if not os.path.exists(output_path):
+                    os.mkdir(output_path)
 
-                save = os.path.join(
-                    self.analysis.output_path_nodemaps, f"{item}", output_name
-                )
-                plt.savefig(save, dpi=300, bbox_inches="tight")
+                save = os.path.join(output_path, output_name)
+                plt.savefig(save, dpi=dpi, bbox_inches="tight")
                 plt.clf()
                 plt.close()
-                print(f"Plotted nodemap for {self.analysis.nodemap_name}.")
+                print(f"Plotted nodemap for {nodemap_name}.")
 
         else:
-            print(f"No contour plotted for {self.analysis.nodemap_name}.")
+            print(f"No contour plotted for {nodemap_name}.")
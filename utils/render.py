@@ -0,0 +1,225 @@
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.data_processing import Data_Processing
+from utils.plot import Plotter, render_payload
+
+
+class Render_Queue:
+    def __init__(self, queue_path: str = None):
+        """
+        Folder of render payloads waiting to be plotted. Every entry is a pickle holding the payload of one nodemap
+        (see plot.render_payload) and the parameters of the requested plots. Entries are written atomically, so the
+        queue can be consumed by another process while the analysis is still running.
+
+        Parameters
+        ----------
+        queue_path : str
+                folder of the queue. Created with the first entry.
+
+        """
+
+        self.queue_path = queue_path
+
+    @classmethod
+    def of_specimen(cls, specimen_name: str = None, side: str = None):
+        """
+        Default queue of a specimen, 01_Plots/00_Render_Queue next to the plots.
+        """
+
+        paths = Data_Processing(specimen_name=specimen_name, side=side)
+        return cls(os.path.join(paths.output_path_image, "00_Render_Queue"))
+
+    def entry_path(self, nodemap_name: str):
+        return os.path.join(self.queue_path, f"{nodemap_name}.pickle")
+
+    def put(
+        self,
+        nodemap_name: str,
+        payload: dict,
+        which_contours=None,
+        plot_contour_parameters: dict = None,
+        plot_nodemap_parameters: dict = None,
+    ):
+        """
+        Add the payload of a nodemap to the queue, an existing entry of the nodemap is replaced.
+
+        Parameters
+        ----------
+        nodemap_name : str
+                name of the entry, the name of the nodemap file
+        payload : dict
+                see plot.render_payload
+        which_contours : list [str]
+                contours to be plotted
+        plot_contour_parameters, plot_nodemap_parameters : dict, default = None
+                keyword arguments passed to Plotter.plot_contour and Plotter.plot_contour_on_nodemap. The respective
+                plot is skipped if None.
+
+        """
+
+        os.makedirs(self.queue_path, exist_ok=True)
+        entry = {
+            "payload": payload,
+            "which_contours": which_contours,
+            "plot_contour_parameters": plot_contour_parameters,
+            "plot_nodemap_parameters": plot_nodemap_parameters,
+        }
+        entry_path = self.entry_path(nodemap_name)
+        with open(f"{entry_path}.tmp", "wb") as handle:
+            pickle.dump(entry, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(f"{entry_path}.tmp", entry_path)
+
+    def get(self, nodemap_name: str):
+        with open(self.entry_path(nodemap_name), "rb") as handle:
+            return pickle.load(handle)
+
+    def remove(self, nodemap_name: str):
+        os.remove(self.entry_path(nodemap_name))
+
+    def names(self):
+        """
+        Names of the queued nodemaps in alphabetical order.
+        """
+
+        if not os.path.exists(self.queue_path):
+            return []
+        return sorted(
+            name[: -len(".pickle")]
+            for name in os.listdir(self.queue_path)
+            if name.endswith(".pickle")
+        )
+
+    def __len__(self):
+        return len(self.names())
+
+
+def queue_plots(
+    Result: Data_Processing,
+    queue: Render_Queue,
+    which_contours=None,
+    plot_contour_parameters: dict = None,
+    plot_nodemap_parameters: dict = None,
+    background_step: float = 0.05,
+):
+    """
+    Queue the plots of an analyzed nodemap instead of drawing them. The strain field is only kept in the payload if
+    the nodemap is plotted and is restricted to the window of the nodemap plot.
+
+    Parameters
+    ----------
+    Result : Data_Processing
+            analyzed nodemap, after evaluate_contours
+    queue : Render_Queue
+            self-explaining
+    which_contours, plot_contour_parameters, plot_nodemap_parameters :
+            see Render_Queue.put
+    background_step : float, default = 0.05
+            see plot.render_payload
+
+    """
+
+    payload = render_payload(
+        Result,
+        which_contours=which_contours,
+        plot_nodemap_parameters=plot_nodemap_parameters,
+        background_step=background_step,
+    )
+    queue.put(
+        Result.nodemap_name,
+        payload,
+        which_contours=which_contours,
+        plot_contour_parameters=plot_contour_parameters,
+        plot_nodemap_parameters=plot_nodemap_parameters,
+    )
+
+
+def render_entry(
+    queue_path: str, nodemap_name: str, keep: bool = False, **plot_parameters
+):
+    """
+    Draw the plots of a queued nodemap and remove it from the queue.
+
+    Parameters
+    ----------
+    queue_path : str
+            folder of the queue
+    nodemap_name : str
+            name of the entry
+    keep : bool, default = False
+            keep the entry in the queue
+    plot_parameters :
+            overwrite parameters of both plots, e.g. dpi or file_format
+
+    Returns
+    ----------
+    nodemap_name : str
+        self-explaining
+
+    """
+
+    queue = Render_Queue(queue_path)
+    entry = queue.get(nodemap_name)
+
+    plotter = Plotter(which_contours=entry["which_contours"], payload=entry["payload"])
+    if entry["plot_contour_parameters"] is not None:
+        plotter.plot_contour(**{**entry["plot_contour_parameters"], **plot_parameters})
+    if entry["plot_nodemap_parameters"] is not None:
+        plotter.plot_contour_on_nodemap(
+            **{**entry["plot_nodemap_parameters"], **plot_parameters}
+        )
+
+    if not keep:
+        queue.remove(nodemap_name)
+    return nodemap_name
+
+
+def render_queue(
+    queue: Render_Queue,
+    nodemap_names: list = None,
+    workers: int = 1,
+    keep: bool = False,
+    **plot_parameters,
+):
+    """
+    Draw the queued plots.
+
+    Parameters
+    ----------
+    queue : Render_Queue
+            self-explaining
+    nodemap_names : list [str], default = None
+            only draw the given nodemaps. If None, the whole queue is drawn.
+    workers : int, default = 1
+            number of worker processes. 1 draws in the current process.
+    keep : bool, default = False
+            keep the entries in the queue, e.g. to draw them again with other parameters
+    plot_parameters :
+            see render_entry
+
+    Returns
+    ----------
+    rendered : list [str]
+        names of the drawn nodemaps
+
+    """
+
+    names = queue.names()
+    if nodemap_names is not None:
+        names = [name for name in names if name in nodemap_names]
+
+    if workers == 1:
+        return [
+            render_entry(queue.queue_path, name, keep=keep, **plot_parameters)
+            for name in names
+        ]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                render_entry, queue.queue_path, name, keep=keep, **plot_parameters
+            )
+            for name in names
+        ]
+        return [future.result() for future in futures]
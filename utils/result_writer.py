@@ -1,6 +1,7 @@
 import numpy as np
 import os
 import csv
+import threading
 
 from utils.data_processing import Data_Processing
 
@@ -11,60 +12,69 @@ class Result_Writer:
 
         self.analysis = Result
 
+    def get_results_row(self):
+        """
+        Collect the scalar descriptors of the analyzed nodemap as one row of the summary.
+
+        Returns
+        ----------
+        res_dict : dict
+            dictionary containing the scalar descriptors of the whole contour plus area, contour length and center of
+            gravity of the upper and lower contour if available. None if no contour was detected.
+
+        """
+
+        if not np.any(self.analysis.is_contour_detected):
+            return None
+
+        res_dict = {
+            k: v
+            for k, v in self.analysis.key_to_results["Whole"].items()
+            if isinstance(v, (int, str, float))
+        }
+        res_dict.pop("Secondary crack", None)
+
+        # update with analysis from lower and upper area segmentation if avaiable. only add area, circumferential lenght,
+        # and center of gravity coordinates
+
+        for item in [
+            item
+            for item in self.analysis.key_to_results.keys()
+            if item not in ["Whole"]
+        ]:
+            res_dict.update(
+                {
+                    f"{item}_Area PZ[mm²]": self.analysis.key_to_results[item][
+                        "Area PZ[mm²]"
+                    ]
+                }
+            )
+            res_dict.update(
+                {
+                    f"{item}_Contour lenght[mm]": self.analysis.key_to_results[item][
+                        "Contour lenght[mm]"
+                    ]
+                }
+            )
+            res_dict.update(
+                {f"{item}_COG_X[mm]": self.analysis.key_to_results[item]["COG_X[mm]"]}
+            )
+            res_dict.update(
+                {f"{item}_COG_Y[mm]": self.analysis.key_to_results[item]["COG_Y[mm]"]}
+            )
+
+        return res_dict
+
     def write_to_csv(self):
         """
         Write analyzed data to .csv and analysis parameter to .txt .
 
         """
 
-        analysis = self.analysis
         result_path = self.analysis.output_path_results
+        res_dict = self.get_results_row()
 
-        if np.any(self.analysis.is_contour_detected):
-
-            res_dict = {
-                k: v
-                for k, v in self.analysis.key_to_results["Whole"].items()
-                if isinstance(v, (int, str, float))
-            }
-            res_dict.pop("Secondary crack", None)
-
-            # update with analysis from lower and upper area segmentation if avaiable. only add area, circumferential lenght,
-            # and center of gravity coordinates
-
-            for item in [
-                item
-                for item in self.analysis.key_to_results.keys()
-                if item not in ["Whole"]
-            ]:
-                res_dict.update(
-                    {
-                        f"{item}_Area PZ[mm²]": self.analysis.key_to_results[item][
-                            "Area PZ[mm²]"
-                        ]
-                    }
-                )
-                res_dict.update(
-                    {
-                        f"{item}_Contour lenght[mm]": self.analysis.key_to_results[
-                            item
-                        ]["Contour lenght[mm]"]
-                    }
-                )
-                res_dict.update(
-                    {
-                        f"{item}_COG_X[mm]": self.analysis.key_to_results[item][
-                            "COG_X[mm]"
-                        ]
-                    }
-                )
-                res_dict.update(
-                    {
-                        f"{item}_COG_Y[mm]": self.analysis.key_to_results[item][
-                            "COG_Y[mm]"
-                        ]
-                    }
-                )
+        if res_dict is not None:
 
             with open(
                 os.path.join(result_path, f"{self.analysis.nodemap_name}.csv"), "w"
@@ -76,4 +86,165 @@ class Result_Writer:
             print(f"Wrote results for {self.analysis.nodemap_name}")
             print(f"-------------------------------------------------")
         else:
-            print(f"No results written for {self.analysis.nodemap_name}.")
\ No newline at end of file
+            print(f"No results written for {self.analysis.nodemap_name}.")
+
+
+class Result_Sink:
+    def __init__(
+        self, file_path: str = None, key_index: str = None, buffer_size: int = 100
+    ):
+        """
+        Streaming summary file. Rows of Result_Writer.get_results_row are buffered and appended to a single open
+        .csv or .parquet file in batches, so the summary exists as soon as the last row is written - no single files
+        per nodemap and no second pass with sum_results. Writing is guarded by a lock, so threads may share one sink.
+        With worker processes, the rows are returned to the parent process, which owns the sink (see run_batch).
+
+        Parameters
+        ----------
+        file_path : str
+                summary file. The format is chosen by the suffix, ".parquet" requires pyarrow.
+        key_index : str, default = None
+                column that is written as first column in addition, like the index written by sum_results. Only
+                used for .csv files.
+        buffer_size : int, default = 100
+                number of rows written at once
+
+        """
+
+        self.file_path = file_path
+        self.key_index = key_index
+        self.buffer_size = buffer_size
+        self.is_parquet = file_path.endswith(".parquet")
+
+        self.lock = threading.Lock()
+        self.buffer = []
+        self.columns = None
+        self.columns_changed = False
+        self.num_rows = 0
+
+        if self.is_parquet:
+            self.part_files = []
+            self.writer = None
+        else:
+            self.file = open(file_path, "w", newline="")
+            self.writer = csv.writer(self.file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def write(self, res_dict: dict = None):
+        """
+        Add a row to the summary. None, as returned by get_results_row if no contour was detected, is skipped.
+        """
+
+        if res_dict is None:
+            return
+        with self.lock:
+            self.buffer.append(res_dict)
+            if len(self.buffer) >= self.buffer_size:
+                self._flush()
+
+    def flush(self):
+        with self.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self.buffer:
+            return
+
+        columns = list(self.columns or [])
+        for row in self.buffer:
+            columns += [k for k in row if k not in columns]
+        is_new_file = self.columns is None
+        self.columns_changed |= not is_new_file and columns != self.columns
+        self.columns = columns
+
+        if self.is_parquet:
+            self._flush_parquet()
+        else:
+            if is_new_file:
+                self.writer.writerow(self._index_column() + self.columns)
+            for row in self.buffer:
+                self.writer.writerow(
+                    [row.get(self.key_index) for _ in self._index_column()]
+                    + [row.get(k) for k in self.columns]
+                )
+            self.file.flush()
+
+        self.num_rows += len(self.buffer)
+        self.buffer = []
+
+    def _index_column(self):
+        return [self.key_index] if self.key_index is not None else []
+
+    def _flush_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pylist(
+            [{k: row.get(k) for k in self.columns} for row in self.buffer]
+        )
+        if self.writer is not None and table.schema.names != self.writer.schema.names:
+            # new columns - continue in a new part, the parts are merged on close
+            self.writer.close()
+            self.writer = None
+        if self.writer is None:
+            self.part_files.append(f"{self.file_path}.part{len(self.part_files)}")
+            self.writer = pq.ParquetWriter(self.part_files[-1], table.schema)
+        self.writer.write_table(table.cast(self.writer.schema, safe=False))
+
+    def close(self):
+        """
+        Write the remaining rows and close the file.
+
+        Returns
+        ----------
+        num_rows : int
+            number of rows written
+
+        """
+
+        with self.lock:
+            self._flush()
+            if self.is_parquet:
+                self._close_parquet()
+            else:
+                self.file.close()
+                if self.columns_changed:
+                    self._rewrite_csv_header()
+        return self.num_rows
+
+    def _close_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        if len(self.part_files) == 1:
+            os.replace(self.part_files[0], self.file_path)
+        elif self.part_files:
+            table = pa.concat_tables(
+                [pq.read_table(part_file) for part_file in self.part_files],
+                promote_options="permissive",
+            )
+            pq.write_table(table.select(self.columns), self.file_path)
+            for part_file in self.part_files:
+                os.remove(part_file)
+        self.part_files = []
+
+    def _rewrite_csv_header(self):
+        # rows written before a column was added are shorter - only the header has to be completed, new columns are
+        # always appended at the end
+        tmp_file = f"{self.file_path}.tmp"
+        with open(self.file_path, "r", newline="") as source, open(
+            tmp_file, "w", newline=""
+        ) as target:
+            source.readline()
+            csv.writer(target).writerow(self._index_column() + self.columns)
+            for line in source:
+                target.write(line)
+        os.replace(tmp_file, self.file_path)
@@ -0,0 +1,257 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.catalogue import build_catalogue
+from utils.data_processing import Data_Processing
+from utils.functions import (
+    crack_tips_to_dict,
+    data_input_from_dict,
+    input_format_to_columns,
+    load_crack_tips,
+)
+
+# header keywords of the stage metadata per specimen type, as read in Data_Processing.mask_data
+specimen_type_to_meta_keywords = {
+    "Biax": {
+        "cycles": "experimental_data_cycles",
+        "force": "experimental_data_load_main_axis_fy",
+        "cracklength": "experimental_data_crack_tip_x_right",
+        "max_load": "experimental_data_min_or_max",
+    },
+    "MT": {"cycles": "cycles", "force": "force", "cracklength": "cracklength"},
+    "FE": {},
+}
+
+
+def read_stage_metadata(
+    nodemap_path: str = None,
+    nodemap_names: list = None,
+    specimen_type: str = None,
+    workers: int = 1,
+):
+    """
+    Read cycles, force and crack length from the headers of the nodemaps, see catalogue.build_catalogue. Only the
+    header is read, not the data. For Biax, the column "max_load" is 1 for stages at maximum load and 0 otherwise.
+
+    Parameters
+    ----------
+    nodemap_path : str
+            folder containing the nodemaps
+    nodemap_names : list [str]
+            self-explaining
+    specimen_type : str
+            "Biax", "MT" or "FE", see specimen_type_to_meta_keywords
+    workers : int, default = 1
+            number of worker processes reading the headers
+
+    Returns
+    ----------
+    metadata : pd.DataFrame
+        metadata indexed by the nodemap name, NaN for missing nodemaps or keywords
+
+    """
+
+    meta_keywords = specimen_type_to_meta_keywords[specimen_type]
+    catalogue = build_catalogue(
+        nodemap_path=nodemap_path,
+        nodemap_names=nodemap_names,
+        keywords=list(meta_keywords.values()),
+        workers=workers,
+    )
+    metadata = pd.DataFrame(index=catalogue.index)
+    for attribute, keyword in meta_keywords.items():
+        if attribute == "max_load":
+            metadata[attribute] = (catalogue[keyword] == "MAX_LOAD").astype(float)
+            metadata.loc[catalogue[keyword].isna(), attribute] = np.nan
+        else:
+            metadata[attribute] = pd.to_numeric(catalogue[keyword], errors="coerce")
+    return metadata
+
+
+class Stage_Index:
+    def __init__(self, stages: pd.DataFrame = None):
+        """
+        Index of the stages of a campaign - crack tip position and metadata of every nodemap - for fast selection
+        without opening any nodemap. Range queries use sorted copies of the queried columns, which are built on first
+        use.
+
+        Parameters
+        ----------
+        stages : pd.DataFrame
+                one row per nodemap indexed by the nodemap name with the columns "stage" (position in the input),
+                "x", "y" and the metadata, see build
+
+        """
+
+        self.stages = stages
+        self.column_to_sorted = {}
+
+    @classmethod
+    def build(cls, crack_tips: pd.DataFrame = None, metadata: pd.DataFrame = None):
+        """
+        Build the index from the crack tip positions and the metadata of the nodemaps.
+
+        Parameters
+        ----------
+        crack_tips : pd.DataFrame
+                as returned by functions.load_crack_tips
+        metadata : pd.DataFrame, default = None
+                as returned by read_stage_metadata. Columns also given in crack_tips are taken from metadata.
+
+        """
+
+        stages = crack_tips.copy()
+        if metadata is not None:
+            stages = stages.drop(columns=metadata.columns, errors="ignore").join(
+                metadata
+            )
+        stages.insert(0, "stage", np.arange(len(stages)))
+        return cls(stages)
+
+    @classmethod
+    def load(cls, index_file: str = None):
+        return cls(pd.read_pickle(index_file))
+
+    def save(self, index_file: str = None):
+        tmp_file = f"{index_file}.{os.getpid()}.tmp"
+        self.stages.to_pickle(tmp_file)
+        os.replace(tmp_file, index_file)
+
+    def __len__(self):
+        return len(self.stages)
+
+    def _sorted(self, column: str):
+        if column not in self.column_to_sorted:
+            values = self.stages[column].to_numpy(dtype=float)
+            order = np.argsort(values, kind="stable")
+            # NaN is sorted to the end and never within a range
+            num_valid = np.count_nonzero(~np.isnan(values))
+            self.column_to_sorted[column] = (
+                order[:num_valid],
+                values[order[:num_valid]],
+            )
+        return self.column_to_sorted[column]
+
+    def select(self, stride: int = None, order_by: str = "stage", **column_to_range):
+        """
+        Select stages by ranges of any numeric column and sample every stride-th of them.
+
+        Example: index.select(cycles=(1e5, 2e5), force=(14000, None), stride=10)
+
+        Parameters
+        ----------
+        stride : int, default = None
+                only every stride-th of the selected stages in the order of order_by
+        order_by : str, default = "stage"
+                column defining the order of the selection, by default the order of the input
+        column_to_range : tuple (float, float)
+                inclusive lower and upper limit per column, None for no limit
+
+        Returns
+        ----------
+        selection : pd.DataFrame
+            selected rows of the index
+
+        """
+
+        positions = None
+        for column, (lower, upper) in column_to_range.items():
+            order, values = self._sorted(column)
+            start = 0 if lower is None else np.searchsorted(values, lower, "left")
+            stop = (
+                len(values)
+                if upper is None
+                else np.searchsorted(values, upper, "right")
+            )
+            in_range = np.sort(order[start:stop])
+            positions = (
+                in_range
+                if positions is None
+                else np.intersect1d(positions, in_range, assume_unique=True)
+            )
+
+        if positions is None:
+            positions = np.arange(len(self.stages))
+        if order_by != "stage":
+            positions = positions[
+                np.argsort(self.stages[order_by].to_numpy()[positions], kind="stable")
+            ]
+        if stride is not None:
+            positions = positions[::stride]
+
+        return self.stages.iloc[positions]
+
+    @staticmethod
+    def to_data_input(selection: pd.DataFrame = None):
+        """
+        Crack tip positions of the selection as used by the analysis, see functions.crack_tips_to_dict.
+        """
+
+        return crack_tips_to_dict(selection)
+
+
+def load_stage_index(
+    input_file: str = None,
+    input_format: str = "csv",
+    specimen_name: str = "not defined",
+    side: str = None,
+    specimen_type: str = None,
+    rebuild: bool = False,
+    workers: int = 1,
+):
+    """
+    Load the stage index of a specimen, {specimen_name}_{side}_Stage_Index.pickle next to the pickle of the results.
+    The index is built and saved if it does not exist, if the input file is newer or if rebuild is set. Building
+    reads the header of every nodemap once.
+
+    Parameters
+    ----------
+    input_file : str
+            file containing the crack tip positions
+    input_format : str, default = "csv"
+            "csv", "mt", "fe" or "dict", see functions.input_format_to_columns and functions.data_input_from_dict
+    specimen_name, side, specimen_type : str
+            see Data_Processing
+    rebuild : bool, default = False
+            self-explaining
+    workers : int, default = 1
+            see read_stage_metadata
+
+    Returns
+    ----------
+    stage_index : Stage_Index
+        self-explaining
+
+    """
+
+    paths = Data_Processing(specimen_name=specimen_name, side=side)
+    index_file = os.path.join(
+        paths.output_path_pickle, f"{specimen_name}_{side}_Stage_Index.pickle"
+    )
+
+    if (
+        not rebuild
+        and os.path.exists(index_file)
+        and os.path.getmtime(index_file) >= os.path.getmtime(input_file)
+    ):
+        return Stage_Index.load(index_file)
+
+    if input_format == "dict":
+        crack_tips = pd.DataFrame.from_dict(
+            data_input_from_dict(input_file), orient="index", columns=["x", "y"]
+        ).rename_axis("Filename")
+    else:
+        crack_tips = load_crack_tips(
+            input_file, columns=input_format_to_columns[input_format], keep_columns=True
+        )
+    metadata = read_stage_metadata(
+        nodemap_path=paths.nodemap_path,
+        nodemap_names=list(crack_tips.index),
+        specimen_type=specimen_type,
+        workers=workers,
+    )
+    stage_index = Stage_Index.build(crack_tips, metadata)
+    stage_index.save(index_file)
+    return stage_index
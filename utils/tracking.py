@@ -0,0 +1,111 @@
+import numpy as np
+
+from utils.data_processing import Data_Processing
+
+
+class Stage_Tracker:
+    def __init__(self, margin: float = 1.0, border_pixels: int = 2):
+        """
+        Warm start of the contour search for stages processed one after another. Consecutive stages of a fatigue test
+        have nearly identical plastic zones that move with the crack tip. The bounds of the contours of a stage,
+        relative to its crack tip and widened by a margin, are used as region of interest of the next stage (see
+        Data_Processing.mask_data), so only a small part of the nodemap is gridded and searched. The region follows
+        the crack tip advance, since it is given relative to the crack tip.
+
+        If a contour of the next stage touches a side where the region cuts the nodemap, the plastic zone may be
+        clipped and the stage has to be analyzed again on the full window - see is_clipped. Contours completely
+        outside the region, e.g. distant secondary cracks, are not found.
+
+        Parameters
+        ----------
+        margin : float, default = 1.0
+                widening of the contour bounds of the previous stage in mm on every side
+        border_pixels : int, default = 2
+                a contour closer than the given number of grid points to a cut side of the region is clipped
+
+        """
+
+        self.margin = margin
+        self.border_pixels = border_pixels
+        self.bounds = None
+
+    def roi(self):
+        """
+        Region of interest of the next stage relative to its crack tip, (x_min, x_max, y_min, y_max) in mm - the
+        contour bounds of the previous stage and the crack tip, widened by the margin. None for the first stage or
+        after a stage without contour, the full window is analyzed then.
+        """
+
+        if self.bounds is None:
+            return None
+        x_min, x_max, y_min, y_max = self.bounds
+        # the plastic zone starts at the crack tip, so the region always includes the crack tip and the margin
+        return (
+            min(x_min, 0) - self.margin,
+            max(x_max, 0) + self.margin,
+            min(y_min, 0) - self.margin,
+            max(y_max, 0) + self.margin,
+        )
+
+    @staticmethod
+    def contour_bounds(analysis: Data_Processing):
+        """
+        Bounds of all evaluated contours in mm, (x_min, x_max, y_min, y_max). None if no contour was detected.
+        """
+
+        if not analysis.key_to_results:
+            return None
+        # top and bottom follow the rows of the grid, so both extreme points are compared on each axis
+        x_coords = [
+            result[ext][0]
+            for result in analysis.key_to_results.values()
+            for ext in ("Ext_Left", "Ext_Right")
+        ]
+        y_coords = [
+            result[ext][1]
+            for result in analysis.key_to_results.values()
+            for ext in ("Ext_Bottom", "Ext_Top")
+        ]
+        return min(x_coords), max(x_coords), min(y_coords), max(y_coords)
+
+    def is_clipped(self, analysis: Data_Processing):
+        """
+        Whether the contours of a stage analyzed with a region of interest may be clipped by it - no contour was
+        detected or a contour touches a side where the region cuts the nodemap.
+        """
+
+        if analysis.roi_bounds is None:
+            return False
+        bounds = self.contour_bounds(analysis)
+        if bounds is None:
+            return True
+
+        x_int = analysis.griddata[0][0]
+        if len(x_int) < 2:
+            # no grid spacing to compare against, analyze the full window
+            return True
+        tolerance = self.border_pixels * (x_int[1] - x_int[0])
+        roi_min_x, roi_max_x, roi_min_y, roi_max_y = analysis.roi_bounds
+        x_min, x_max, y_min, y_max = bounds
+        return (
+            (roi_min_x is not None and x_min - roi_min_x < tolerance)
+            or (roi_max_x is not None and roi_max_x - x_max < tolerance)
+            or (roi_min_y is not None and y_min - roi_min_y < tolerance)
+            or (roi_max_y is not None and roi_max_y - y_max < tolerance)
+        )
+
+    def update(self, analysis: Data_Processing):
+        """
+        Take the contour bounds of an analyzed stage, relative to its crack tip, for the region of the next stage.
+        """
+
+        bounds = self.contour_bounds(analysis)
+        if bounds is None:
+            self.bounds = None
+            return
+        crack_tip_x, crack_tip_y = abs(analysis.crack_tip_x), analysis.crack_tip_y
+        self.bounds = tuple(
+            np.subtract(
+                bounds, (crack_tip_x, crack_tip_x, crack_tip_y, crack_tip_y)
+            ).tolist()
+        )
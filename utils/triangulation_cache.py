@@ -0,0 +1,390 @@
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from matplotlib import tri
+from scipy.spatial import Delaunay
+import numpy as np
+
+
+class Triangulation_Cache:
+    def __init__(
+        self,
+        max_size: int = 8,
+        max_bytes: int = 256 << 20,
+        block_size: int = 1 << 20,
+    ):
+        """
+        Least recently used cache for the Delaunay triangulation of nodemap coordinates and the barycentric
+        interpolation weights of regular grids. Nodemaps sharing the same node coordinates (e.g. FE load steps or DIC
+        stages of one camera setup) are triangulated only once. Interpolating a new strain field on a known grid is
+        reduced to a weighted sum over the three nodes of each triangle.
+
+        The weights take 36 bytes per grid point, so they are only cached for grids that are interpolated more than
+        once (see interpolate) and within max_bytes in total. Grids changing from stage to stage, e.g. with a region
+        of interest around the crack tip, are interpolated block by block without caching.
+
+        Parameters
+        ----------
+        max_size : int, default = 8
+                maximum number of triangulations kept in the cache
+        max_bytes : int, default = 256 MB
+                maximum total size of the cached interpolation weights. Larger weights are never cached.
+        block_size : int, default = 2**20
+                number of grid points processed at once. The grid is handled in blocks of rows, so no temporary array
+                of the size of the whole grid is created besides the weights themselves.
+
+        """
+
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.block_size = block_size
+        self.key_to_delaunay = OrderedDict()
+        self.key_to_triangulation = OrderedDict()
+        self.key_to_weights = OrderedDict()
+        # keys of the grids interpolated so far, the weights are cached from the second interpolation on
+        self.seen_weights_keys = OrderedDict()
+
+    @staticmethod
+    def hash_arrays(*arrays):
+        """
+        Hash the content of the given arrays - used as cache key.
+        """
+
+        sha = hashlib.sha1()
+        for array in arrays:
+            array = np.ascontiguousarray(array, dtype=np.float64)
+            sha.update(str(array.shape).encode())
+            sha.update(array.tobytes())
+        return sha.hexdigest()
+
+    def _lookup(self, cache: OrderedDict, key):
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+        return None
+
+    def _store(self, cache: OrderedDict, key, value):
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > self.max_size:
+            cache.popitem(last=False)
+        return value
+
+    def get_delaunay(self, x_coordinates: np.ndarray, y_coordinates: np.ndarray):
+        """
+        Get the Delaunay triangulation of the node coordinates.
+
+        Returns
+        ----------
+        key : str
+            hash of the node coordinates
+        delaunay : scipy.spatial.Delaunay
+            triangulation of the nodes
+
+        """
+
+        key = self.hash_arrays(x_coordinates, y_coordinates)
+        delaunay = self._lookup(self.key_to_delaunay, key)
+        if delaunay is None:
+            delaunay = self._store(
+                self.key_to_delaunay,
+                key,
+                Delaunay(np.column_stack((x_coordinates, y_coordinates))),
+            )
+        return key, delaunay
+
+    def get_triangulation(self, x_coordinates: np.ndarray, y_coordinates: np.ndarray):
+        """
+        Get a matplotlib triangulation of the node coordinates for plotting. The triangles are taken from the cached
+        Delaunay triangulation, so no second triangulation is computed.
+        """
+
+        key, delaunay = self.get_delaunay(x_coordinates, y_coordinates)
+        triangulation = self._lookup(self.key_to_triangulation, key)
+        if triangulation is None:
+            triangulation = self._store(
+                self.key_to_triangulation,
+                key,
+                tri.Triangulation(
+                    x=x_coordinates, y=y_coordinates, triangles=delaunay.simplices
+                ),
+            )
+        return triangulation
+
+    def weights_key(
+        self,
+        x_coordinates: np.ndarray,
+        y_coordinates: np.ndarray,
+        x_int: np.ndarray,
+        y_int: np.ndarray,
+    ):
+        """
+        Cache key of the interpolation weights of a grid - hashes of the node coordinates and of the grid axes.
+        """
+
+        return (
+            self.hash_arrays(x_coordinates, y_coordinates),
+            self.hash_arrays(x_int, y_int),
+        )
+
+    def discard_weights(self, weights_key: tuple = None):
+        """
+        Remove the interpolation weights of a grid from the cache, e.g. once the stage is released.
+        """
+
+        self.key_to_weights.pop(weights_key, None)
+        self.seen_weights_keys.pop(weights_key, None)
+
+    def cached_bytes(self):
+        return sum(
+            vertices.nbytes + weights.nbytes
+            for vertices, weights in self.key_to_weights.values()
+        )
+
+    def _store_weights(self, weights_key: tuple, vertices_weights: tuple):
+        size = sum(array.nbytes for array in vertices_weights)
+        if size > self.max_bytes:
+            return vertices_weights
+        self.key_to_weights[weights_key] = vertices_weights
+        self.key_to_weights.move_to_end(weights_key)
+        while self.cached_bytes() > self.max_bytes:
+            self.key_to_weights.popitem(last=False)
+        return vertices_weights
+
+    def _is_repeated(self, weights_key: tuple):
+        """
+        Whether the weights of the grid were requested before. The keys of the last grids are remembered.
+        """
+
+        if weights_key in self.key_to_weights or weights_key in self.seen_weights_keys:
+            return True
+        self.seen_weights_keys[weights_key] = True
+        while len(self.seen_weights_keys) > 64 * self.max_size:
+            self.seen_weights_keys.popitem(last=False)
+        return False
+
+    def get_weights(
+        self,
+        x_coordinates: np.ndarray,
+        y_coordinates: np.ndarray,
+        x_int: np.ndarray,
+        y_int: np.ndarray,
+        threads: int = 1,
+    ):
+        """
+        Get the barycentric interpolation weights of the regular grid spanned by x_int and y_int. The weights are
+        cached within max_bytes. With threads > 1, the blocks of rows are processed on a thread pool - scipy and
+        numpy release the GIL.
+
+        Returns
+        ----------
+        vertices : arr (n, 3)
+            node indices of the triangle containing each grid point
+        weights : arr (n, 3)
+            barycentric weights of the grid points, NaN for grid points outside the triangulation
+
+        """
+
+        key, delaunay = self.get_delaunay(x_coordinates, y_coordinates)
+        return self._get_weights(
+            delaunay, (key, self.hash_arrays(x_int, y_int)), x_int, y_int, threads
+        )
+
+    def _get_weights(
+        self,
+        delaunay: Delaunay,
+        weights_key: tuple,
+        x_int: np.ndarray,
+        y_int: np.ndarray,
+        threads: int = 1,
+    ):
+        cached = self._lookup(self.key_to_weights, weights_key)
+        if cached is not None:
+            return cached
+
+        num_points = len(x_int) * len(y_int)
+        vertices = np.empty((num_points, 3), dtype=np.int32)
+        weights = np.empty((num_points, 3))
+
+        # the grid points are generated in blocks of rows from the axes
+        def block_weights(blocks):
+            rows, block = blocks
+            vertices[block], weights[block] = self._block_weights(
+                delaunay, x_int, y_int[rows]
+            )
+
+        self._for_each_block(
+            block_weights, self._row_blocks(x_int, y_int, threads=threads), threads
+        )
+
+        return self._store_weights(weights_key, (vertices, weights))
+
+    @staticmethod
+    def _block_weights(delaunay: Delaunay, x_int: np.ndarray, y_rows: np.ndarray):
+        """
+        Barycentric interpolation weights of the grid rows y_rows, see get_weights.
+        """
+
+        points = np.column_stack(
+            (np.tile(x_int, len(y_rows)), np.repeat(y_rows, len(x_int)))
+        )
+        simplex = delaunay.find_simplex(points)
+        transform = delaunay.transform[simplex]
+        bary = np.einsum("njk,nk->nj", transform[:, :2], points - transform[:, 2])
+        weights = np.column_stack((bary, 1 - bary.sum(axis=1)))
+        weights[simplex == -1] = np.nan
+        return delaunay.simplices[simplex], weights
+
+    def _row_blocks(
+        self,
+        x_int: np.ndarray,
+        y_int: np.ndarray,
+        block_size: int = None,
+        threads: int = 1,
+    ):
+        """
+        Blocks of grid rows with about block_size points - slice of the rows and of the flattened grid points. The
+        blocks are made small enough to give every thread at least one block.
+        """
+
+        if block_size is None:
+            block_size = self.block_size
+        block_size = min(block_size, -(-len(x_int) * len(y_int) // threads))
+        num_rows = max(1, block_size // max(1, len(x_int)))
+        for start in range(0, len(y_int), num_rows):
+            stop = min(start + num_rows, len(y_int))
+            yield slice(start, stop), slice(start * len(x_int), stop * len(x_int))
+
+    @staticmethod
+    def _for_each_block(function, blocks, threads: int = 1):
+        if threads > 1:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                list(executor.map(function, blocks))
+        else:
+            for block in blocks:
+                function(block)
+
+    def interpolate(
+        self,
+        x_coordinates: np.ndarray,
+        y_coordinates: np.ndarray,
+        values: np.ndarray,
+        x_int: np.ndarray,
+        y_int: np.ndarray,
+        threads: int = 1,
+        cache_weights: bool = True,
+        dtype=np.float64,
+    ):
+        """
+        Linear interpolation of nodal values onto the regular grid spanned by x_int and y_int. Equivalent to
+        scipy.interpolate.griddata(..., method="linear"). See get_weights for threads.
+
+        Parameters
+        ----------
+        cache_weights : bool, default = True
+                cache the interpolation weights if the grid was interpolated before, see get_weights. Otherwise, and
+                for the first interpolation of a grid, the weights are computed block by block and discarded, see
+                interpolate_tiled.
+        dtype : default = np.float64
+                dtype of the interpolated grid, e.g. np.float32 to halve its memory. The grid is written in this dtype
+                directly, without a float64 copy of the whole grid.
+
+        Returns
+        ----------
+        zi : arr (len(y_int), len(x_int))
+            interpolated values, NaN outside the convex hull of the nodes
+
+        """
+
+        key, delaunay = self.get_delaunay(x_coordinates, y_coordinates)
+        values = np.asarray(values)
+        zi = np.empty((len(y_int), len(x_int)), dtype=dtype)
+
+        weights_key = (key, self.hash_arrays(x_int, y_int)) if cache_weights else None
+        if weights_key is None or not self._is_repeated(weights_key):
+            return self._interpolate_blocks(
+                delaunay, values, x_int, y_int, zi, threads=threads
+            )
+
+        vertices, weights = self._get_weights(
+            delaunay, weights_key, x_int, y_int, threads
+        )
+        zi = zi.reshape(-1)
+
+        def block_values(blocks):
+            _, block = blocks
+            np.einsum(
+                "nj,nj->n",
+                values[vertices[block]],
+                weights[block],
+                out=zi[block],
+                casting="same_kind",
+            )
+
+        self._for_each_block(
+            block_values, self._row_blocks(x_int, y_int, threads=threads), threads
+        )
+        return zi.reshape(len(y_int), len(x_int))
+
+    def interpolate_tiled(
+        self,
+        x_coordinates: np.ndarray,
+        y_coordinates: np.ndarray,
+        values: np.ndarray,
+        x_int: np.ndarray,
+        y_int: np.ndarray,
+        out: np.ndarray,
+        block_size: int = None,
+        threads: int = 1,
+    ):
+        """
+        Linear interpolation as interpolate, written block by block of rows into out, e.g. a np.memmap. The weights
+        are not cached, so the memory is bounded by block_size and not by the size of the grid.
+
+        Parameters
+        ----------
+        out : arr (len(y_int), len(x_int))
+                array the interpolated values are written to
+        block_size : int, default = None
+                number of grid points interpolated at once. If None, the block_size of the cache.
+        threads : int, default = 1
+                see get_weights. Each thread holds the weights of one block.
+
+        Returns
+        ----------
+        out : arr (len(y_int), len(x_int))
+            interpolated values, NaN outside the convex hull of the nodes
+
+        """
+
+        _, delaunay = self.get_delaunay(x_coordinates, y_coordinates)
+        return self._interpolate_blocks(
+            delaunay, np.asarray(values), x_int, y_int, out, block_size, threads
+        )
+
+    def _interpolate_blocks(
+        self,
+        delaunay: Delaunay,
+        values: np.ndarray,
+        x_int: np.ndarray,
+        y_int: np.ndarray,
+        out: np.ndarray,
+        block_size: int = None,
+        threads: int = 1,
+    ):
+        def block_values(blocks):
+            rows, _ = blocks
+            vertices, weights = self._block_weights(delaunay, x_int, y_int[rows])
+            out[rows] = np.einsum("nj,nj->n", values[vertices], weights).reshape(
+                -1, len(x_int)
+            )
+
+        self._for_each_block(
+            block_values,
+            self._row_blocks(x_int, y_int, block_size, threads=threads),
+            threads,
+        )
+        return out
+
+
+triangulation_cache = Triangulation_Cache()